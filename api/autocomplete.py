@@ -0,0 +1,512 @@
+"""Search as you type suggestions of titles, authors, artists and albums.
+
+Suggestions come from a prefix index kept in Redis: every prefix of a
+normalized value, and of the phrases starting at its next few words, has
+a sorted set of the values it starts, scored by popularity. Values are
+added from the results of lookups and, weighted higher, from stored
+requests. Popularity decays, so that newly popular values overtake the
+ones that filled a prefix first. Answering a query is one ZREVRANGE per
+media type, in a single round trip.
+
+Prefixes with too few suggestions are filled from the upstream search of
+their media type, once a logged in user stops typing for
+AUTOCOMPLETE_REFILL_DELAY seconds and at most once per
+AUTOCOMPLETE_REFILL_TTL across workers. Refills share a token bucket and a
+daily quota, so they cannot use up the providers' own limits.
+
+``python -m api.autocomplete rebuild`` indexes every stored request.
+"""
+import argparse
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from functools import partial
+from typing import Any, Callable, Iterable, Optional
+
+import redis
+
+from api.config import Config
+from api.db import redis_client
+from api.lookup.aggregate import run_in_background
+from api.lookup.books import OpenLibraryLookup
+from api.lookup.cache import LocalCache
+from api.lookup.music import MusicLookup
+from api.lookup.ratelimit import RateLimitedError, RateLimiter
+from api.lookup.video import TVMazeLookup, VideoLookup
+
+# (field, lookup result key, request column) of the values suggested for
+# each media type.
+FIELDS = {
+    'book': (('title', 'title', 'title'), ('author', 'authors', 'authors')),
+    'movie': (('title', 'Title', 'title'),),
+    'music': (
+        ('track', 'track', 'track'),
+        ('artist', 'artist', 'artist'),
+        ('album', 'album', 'album'),
+    ),
+    'show': (('title', 'Title', 'title'),),
+}
+# Upstream searches filling the prefixes of each media type.
+REFILLS = {
+    'book': OpenLibraryLookup.search_by_title,
+    'movie': partial(VideoLookup.search_by_title, media_type='movie'),
+    'music': MusicLookup.search_for_track,
+    'show': TVMazeLookup.search_by_title,
+}
+REQUEST_WEIGHT = 5  # a stored request counts as this many lookup results
+# Scores are decayed by growing the weight of new additions instead of
+# rewriting old scores, doubling every half life from this time (2026-01-01
+# UTC). Scores are kept as log2 of the popularity, so that they grow by one
+# per half life rather than overflow.
+DECAY_EPOCH = 1767225600
+RESULTS_INDEXED = 10  # first results of a lookup added to the index
+WORD_STARTS = 3  # words of a value its phrases may start at
+MAX_VALUE_LENGTH = 200
+
+# Adds popularity 2^ARGV[1] to member ARGV[2] in each prefix set, whose
+# scores are log2 popularities, trimming a set back to its ARGV[3] best
+# members once it holds ARGV[4].
+_ADD_SCRIPT = """
+local added = tonumber(ARGV[1])
+for _, key in ipairs(KEYS) do
+    local score = tonumber(redis.call('zscore', key, ARGV[2]))
+    if score then
+        local high, low = math.max(score, added), math.min(score, added)
+        score = high + math.log(1 + 2 ^ (low - high)) / math.log(2)
+    else
+        score = added
+    end
+    redis.call('zadd', key, score, ARGV[2])
+    if redis.call('zcard', key) >= tonumber(ARGV[4]) then
+        redis.call('zremrangebyrank', key, 0, -tonumber(ARGV[3]) - 1)
+    end
+end
+"""
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def normalize(text: str) -> str:
+    """Lowercases text, strips its accents and punctuation and collapses
+    its whitespace, so that "Amélie!" is matched by "ame".
+    """
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_WORD.sub(' ', stripped.lower()).strip()
+
+
+def word_starts(value: str) -> list[str]:
+    """Returns the normalized value and the phrases starting at its next
+    words, e.g. "the empire strikes back", "empire strikes back" and
+    "strikes back".
+    """
+    words = normalize(value).split()
+    return [' '.join(words[i:]) for i in range(min(len(words), WORD_STARTS))]
+
+
+def prefixes(value: str, max_length: int) -> set[str]:
+    """Returns the prefixes, up to max_length characters, a value is
+    suggested for.
+    """
+    found = set()
+    for phrase in word_starts(value):
+        for end in range(1, min(len(phrase), max_length) + 1):
+            if phrase[end - 1] != ' ':
+                found.add(phrase[:end])
+    return found
+
+
+class Debouncer:
+    """Calls a function with the latest arguments given for a key, once
+    none were given for ``delay`` seconds, on the lookup executor.
+    """
+
+    def __init__(self, fn: Callable, delay: float) -> None:
+        self.fn = fn
+        self.delay = delay
+        self._pending = {}  # key -> (due, args)
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def call(self, key: str, *args: Any) -> None:
+        """Schedules the call for the key, replacing its pending one."""
+        with self._condition:
+            self._pending[key] = (time.monotonic() + self.delay, args)
+            # Started on first use, so that it runs in forked workers.
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='debounce', daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while True:
+                    now = time.monotonic()
+                    due = [
+                        key
+                        for key, (at, _) in self._pending.items()
+                        if at <= now
+                    ]
+                    if due:
+                        break
+                    timeout = None
+                    if self._pending:
+                        next_due = min(at for at, _ in self._pending.values())
+                        timeout = next_due - now
+                    self._condition.wait(timeout)
+                calls = [self._pending.pop(key)[1] for key in due]
+            for args in calls:
+                run_in_background(self.fn, *args)
+
+
+class SuggestionIndex:
+    """Prefix index of suggestions kept in Redis sorted sets.
+
+    Each prefix of up to ``max_prefix`` characters suggests its ``set_size``
+    most popular values, as ``{field}:{value}`` members. Its set is only
+    trimmed, back to twice that, once it holds four times as many, so a
+    new value is kept while it gains popularity. An addition weighs twice
+    as much as one made ``half_life`` seconds earlier. Queries longer
+    than ``max_prefix`` filter the suggestions of their first
+    ``max_prefix`` characters. Redis errors leave the index unchanged and
+    answer no suggestions. Each upstream search of a refill takes a call
+    from the ``budget`` limiter's 'autocomplete' bucket.
+    """
+
+    key_prefix = 'autocomplete'
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        max_prefix: int = 12,
+        set_size: int = 50,
+        half_life: float = 30 * 24 * 60 * 60,
+        refill_min_length: int = 3,
+        refill_delay: float = 0.3,
+        refill_ttl: int = 24 * 60 * 60,
+        budget: Optional[RateLimiter] = None,
+    ) -> None:
+        self.client = client
+        self.max_prefix = max_prefix
+        self.set_size = set_size
+        self.half_life = half_life
+        self._script = None
+        self.refill_min_length = refill_min_length
+        self.refill_ttl = refill_ttl
+        self.budget = budget
+        self._debouncer = Debouncer(self._refill, refill_delay)
+        # Lookups indexed lately, so that repeating a search does not
+        # inflate its results' popularity.
+        self._indexed = LocalCache(max_bytes=1 << 20, ttl=refill_ttl)
+        self._stats = Counter()
+        self._lock = threading.Lock()
+
+    def key(self, media_type: str, prefix: str) -> str:
+        return f'{self.key_prefix}:{media_type}:{prefix}'
+
+    def add(
+        self, media_type: str, values: Iterable[tuple[str, str]], weight: int
+    ) -> None:
+        """Adds values to the index, or raises their popularity.
+
+        Args:
+            media_type (str): Media type of the values
+            values (Iterable[tuple[str, str]]): (field, value) pairs
+            weight (int): Popularity added to each value
+        """
+        values = set(values)
+        score = math.log2(weight) + (
+            (time.time() - DECAY_EPOCH) / self.half_life
+        )
+        if self._script is None:
+            self._script = self.client.register_script(_ADD_SCRIPT)
+        pipe = self.client.pipeline(transaction=False)
+        for field, value in values:
+            self._script(
+                keys=[
+                    self.key(media_type, prefix)
+                    for prefix in prefixes(value, self.max_prefix)
+                ],
+                args=[
+                    score,
+                    f'{field}:{value}',
+                    2 * self.set_size,
+                    4 * self.set_size,
+                ],
+                client=pipe,
+            )
+        try:
+            pipe.execute()
+        except redis.RedisError:
+            self._count('errors')
+            return
+        self._count('values_added', len(values))
+
+    def add_results(
+        self, media_type: str, query: str, results: list[dict]
+    ) -> None:
+        """Adds the values of a lookup's first results in the background,
+        unless the same lookup was added lately.
+
+        Args:
+            media_type (str): Media type looked up
+            query (str): Searched text
+            results (list[dict]): Lookup results
+        """
+        key = f'{media_type}:{normalize(query)}'
+        if not results or self._indexed.get(key) is not None:
+            return
+        self._indexed.set(key, True, len(key))
+        values = [
+            pair
+            for result in results[:RESULTS_INDEXED]
+            for pair in _values(media_type, result.get, 1)
+        ]
+        run_in_background(self.add, media_type, values, 1)
+
+    def request_values(
+        self, requests: Iterable[Any]
+    ) -> dict[str, list[tuple[str, str]]]:
+        """Collects the values of requests for add_request_values. Called
+        before the requests are committed, so that reading them does not
+        reload them.
+
+        Args:
+            requests (Iterable[MediaRequestModel]): Requests to add
+
+        Returns:
+            dict[str, list[tuple[str, str]]]: (field, value) pairs by media
+                type
+        """
+        by_media_type = {}
+        for request in requests:
+            by_media_type.setdefault(request.media_type, []).extend(
+                _values(request.media_type, partial(getattr, request), 2)
+            )
+        return by_media_type
+
+    def add_request_values(
+        self, values: dict[str, list[tuple[str, str]]]
+    ) -> None:
+        """Adds the values of stored requests in the background, off the
+        request path. Must be called after the requests are committed.
+
+        Args:
+            values (dict[str, list[tuple[str, str]]]): Values collected by
+                request_values
+        """
+        for media_type, pairs in values.items():
+            run_in_background(self.add, media_type, pairs, REQUEST_WEIGHT)
+
+    def add_requests(self, requests: Iterable[Any]) -> None:
+        """Adds the values of stored requests, waiting for Redis.
+
+        Args:
+            requests (Iterable[MediaRequestModel]): Stored requests
+        """
+        for media_type, pairs in self.request_values(requests).items():
+            self.add(media_type, pairs, REQUEST_WEIGHT)
+
+    def suggest(
+        self, media_types: Iterable[str], text: str, limit: int
+    ) -> list[dict]:
+        """Retrieves the most popular values starting with the text, or
+        with a phrase of the text starting at one of its words.
+
+        Args:
+            media_types (Iterable[str]): Media types to suggest
+            text (str): Typed text
+            limit (int): Maximum suggestions
+
+        Returns:
+            list[dict]: Suggestions, most popular first, with their value,
+                field and media_type
+        """
+        media_types = list(media_types)
+        query = normalize(text)
+        if not query:
+            return []
+        prefix = query[:self.max_prefix].rstrip()
+        count = limit if prefix == query else self.set_size
+
+        pipe = self.client.pipeline(transaction=False)
+        for media_type in media_types:
+            pipe.zrevrange(
+                self.key(media_type, prefix), 0, count - 1, withscores=True
+            )
+        try:
+            found = pipe.execute()
+        except redis.RedisError:
+            self._count('errors')
+            return []
+
+        ranked = []
+        for media_type, members in zip(media_types, found):
+            for member, score in members:
+                field, _, value = member.partition(':')
+                if prefix != query and not any(
+                    phrase.startswith(query) for phrase in word_starts(value)
+                ):
+                    continue
+                ranked.append((score, media_type, field, value))
+        # Stable, so ties keep the order Redis returned them in.
+        ranked.sort(key=lambda suggestion: suggestion[0], reverse=True)
+        self._count('hits' if ranked else 'misses')
+        return [
+            {'value': value, 'field': field, 'media_type': media_type}
+            for _, media_type, field, value in ranked[:limit]
+        ]
+
+    def refill(
+        self, media_types: Iterable[str], text: str, user: str
+    ) -> None:
+        """Fills the text's prefix from the upstream searches once the
+        user stops typing, replacing the user's pending refill.
+
+        Args:
+            media_types (Iterable[str]): Media types to search
+            text (str): Typed text
+            user (str): Identity of the typing user
+        """
+        query = normalize(text)
+        if len(query) >= self.refill_min_length:
+            self._debouncer.call(user, tuple(media_types), query)
+
+    def _refill(self, media_types: tuple[str, ...], query: str) -> None:
+        for media_type in media_types:
+            key = f'{self.key_prefix}:refill:{media_type}:{query}'
+            try:
+                claimed = self.client.set(
+                    key, '1', nx=True, ex=self.refill_ttl
+                )
+            except redis.RedisError:
+                self._count('errors')
+                return
+            if not claimed:
+                continue
+            try:
+                if self.budget is not None:
+                    self.budget.acquire(self.key_prefix, priority=True)
+            except RateLimitedError:
+                self._count('refills_limited')
+                try:  # leave the prefix to a later refill
+                    self.client.delete(key)
+                except redis.RedisError:
+                    self._count('errors')
+                return
+            self._count('refills')
+            try:
+                results = REFILLS[media_type](query)
+            except Exception:  # rate limited, unavailable or malformed
+                self._count('refill_errors')
+                continue
+            self.add_results(media_type, query, results)
+
+    def _count(self, stat: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[stat] += amount
+
+    def stats(self) -> dict:
+        """Retrieves query hit and miss, refill and Redis error counts."""
+        with self._lock:
+            return {
+                stat: self._stats[stat]
+                for stat in (
+                    'hits',
+                    'misses',
+                    'values_added',
+                    'refills',
+                    'refills_limited',
+                    'refill_errors',
+                    'errors',
+                )
+            }
+
+
+def _values(
+    media_type: str, read: Callable[[str], Any], source: int
+) -> list[tuple[str, str]]:
+    """Returns the (field, value) pairs suggested for a lookup result or a
+    request, one per author of a book.
+
+    Args:
+        media_type (str): Media type of the item
+        read (Callable[[str], Any]): Reads a key or column of the item
+        source (int): 1 for lookup result keys, 2 for request columns
+    """
+    values = []
+    for names in FIELDS.get(media_type, ()):
+        value = read(names[source])
+        if not value or not isinstance(value, str):
+            continue
+        parts = value.split(', ') if names[0] == 'author' else [value]
+        values.extend(
+            (names[0], part.strip()[:MAX_VALUE_LENGTH])
+            for part in parts
+            if part.strip()
+        )
+    return values
+
+
+suggestion_index = SuggestionIndex(
+    redis_client,
+    max_prefix=Config.AUTOCOMPLETE_MAX_PREFIX,
+    set_size=Config.AUTOCOMPLETE_SET_SIZE,
+    half_life=Config.AUTOCOMPLETE_HALF_LIFE,
+    refill_min_length=Config.AUTOCOMPLETE_REFILL_MIN_LENGTH,
+    refill_delay=Config.AUTOCOMPLETE_REFILL_DELAY,
+    refill_ttl=Config.AUTOCOMPLETE_REFILL_TTL,
+    budget=RateLimiter(
+        redis_client,
+        {
+            SuggestionIndex.key_prefix: {
+                'rate': Config.AUTOCOMPLETE_REFILL_RATE,
+                'burst': Config.AUTOCOMPLETE_REFILL_BURST,
+                'daily': Config.AUTOCOMPLETE_REFILL_DAILY_QUOTA,
+            }
+        },
+        max_wait=0,
+    ),
+)
+
+
+def rebuild(batch_size: int = 1000) -> int:
+    """Indexes every stored request.
+
+    Args:
+        batch_size (int): Requests loaded at a time
+
+    Returns:
+        int: Number of requests indexed
+    """
+    from app import app
+    from api.models.media import MediaRequestModel
+
+    indexed = 0
+    with app.app_context():
+        query = MediaRequestModel.query.order_by(MediaRequestModel.id)
+        last_id = 0
+        while True:
+            requests = (
+                query.filter(MediaRequestModel.id > last_id)
+                .limit(batch_size)
+                .all()
+            )
+            if not requests:
+                return indexed
+            suggestion_index.add_requests(requests)
+            indexed += len(requests)
+            last_id = requests[-1].id
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('command', choices=('rebuild',))
+    parser.parse_args()
+    print(f'{rebuild()} requests indexed.')
@@ -0,0 +1,125 @@
+import threading
+import time
+from datetime import timedelta
+
+import redis
+
+from api.config import Config
+from api.db import redis_client
+
+# Records a revocation scored by the Redis server's clock, which every
+# worker shares, and drops revocations older than ARGV[1] seconds.
+_REVOKE_SCRIPT = """
+local time = redis.call('time')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+redis.call('set', KEYS[1], '', 'ex', ARGV[1])
+redis.call('zadd', KEYS[2], now, ARGV[2])
+redis.call('zremrangebyscore', KEYS[2], '-inf', now - tonumber(ARGV[1]))
+return tostring(now)
+"""
+
+
+class TokenBlocklist:
+    """Revoked jwt ids, answered from a process local copy of Redis.
+
+    Revocations are rare, so rather than a Redis round trip per
+    authenticated request each worker keeps the set of revoked token ids
+    in memory and pulls new revocations from Redis at most every
+    ``sync_interval`` seconds. A token revoked by another worker is
+    therefore accepted for at most ``sync_interval`` seconds; revocations
+    made by this worker apply immediately. A ``sync_interval`` of 0
+    checks Redis on every call.
+
+    Revocations are kept in a sorted set scored by revocation time, so a
+    sync only transfers those made since the previous one. The time is
+    taken from the Redis server when the revocation is written, not from
+    the revoking worker, so a worker whose clock is behind or a write
+    delayed by retries cannot score a revocation before a sync already
+    made.
+    """
+
+    key = 'jwt:revoked'
+    clock_skew = 1  # seconds of overlap between syncs, for clock steps
+
+    def __init__(
+        self, client: redis.Redis, ttl: timedelta, sync_interval: float
+    ) -> None:
+        self.client = client
+        self.ttl = ttl.total_seconds()
+        self.sync_interval = sync_interval
+        self._revoked: dict[str, float] = {}  # jti -> expiry timestamp
+        self._synced_at = None  # monotonic time of the last sync
+        self._synced_until = 0  # newest revocation time seen
+        self._script = None
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str) -> None:
+        """Revokes the token with the given id.
+
+        Args:
+            jti (str): Revoked token's id
+        """
+        if self._script is None:
+            self._script = self.client.register_script(_REVOKE_SCRIPT)
+        self._script(keys=[jti, self.key], args=[int(self.ttl), jti])
+        with self._lock:
+            self._revoked[jti] = time.time() + self.ttl
+
+    def is_revoked(self, jti: str) -> bool:
+        """Checks whether the token with the given id was revoked.
+
+        Args:
+            jti (str): Token id to check
+
+        Returns:
+            bool: True if the token was revoked
+        """
+        if not self.sync_interval:
+            return self.client.get(jti) is not None
+
+        if self._is_stale():
+            with self._lock:
+                if self._is_stale():
+                    self._sync()
+        return jti in self._revoked
+
+    def _is_stale(self) -> bool:
+        return (
+            self._synced_at is None
+            or time.monotonic() - self._synced_at >= self.sync_interval
+        )
+
+    def _sync(self) -> None:
+        """Pulls revocations made since the last sync, must hold the lock."""
+        now = time.time()
+        revocations = self.client.zrangebyscore(
+            self.key,
+            max(self._synced_until - self.clock_skew, now - self.ttl),
+            '+inf',
+            withscores=True,
+        )
+        for jti, revoked_at in revocations:
+            self._revoked[jti] = revoked_at + self.ttl
+            self._synced_until = max(self._synced_until, revoked_at)
+
+        self._revoked = {
+            jti: expires_at
+            for jti, expires_at in self._revoked.items()
+            if expires_at > now
+        }
+        self._synced_at = time.monotonic()
+
+    def stats(self) -> dict:
+        """Returns the number of revocations held and the sync age."""
+        synced_at = self._synced_at
+        return {
+            'revoked': len(self._revoked),
+            'seconds_since_sync': (
+                time.monotonic() - synced_at if synced_at else None
+            ),
+        }
+
+
+token_blocklist = TokenBlocklist(
+    redis_client, Config.ACCESS_EXPIRES, Config.REVOCATION_SYNC_INTERVAL
+)
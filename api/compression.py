@@ -0,0 +1,190 @@
+"""Compression of API responses and of the static frontend build.
+
+JSON responses are compressed on the fly with brotli or gzip, whichever
+the client prefers. Static files are compressed ahead of time, after
+building the frontend:
+
+    python -m api.compression frontend/build
+"""
+import argparse
+import gzip
+import mimetypes
+import os
+import re
+import sys
+
+from flask import Flask, Response, request, send_from_directory
+
+from api.config import Config
+
+try:
+    import brotli
+except ImportError:  # optional, only gzip is offered without it
+    brotli = None
+
+# Files the frontend build names by content hash, e.g. main.5e1c2a3b.js,
+# which never change under the same name.
+HASHED_FILE = re.compile(r'(^|/)static/.+\.[0-9a-f]{8,}\.')
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.html', '.js', '.json', '.map', '.svg', '.txt', '.xml'
+)
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def encodings() -> list[str]:
+    """Returns the supported content encodings, preferred first."""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def negotiate() -> str | None:
+    """Picks the content encoding for the current request.
+
+    Returns:
+        str | None: Preferred encoding the client accepts, None for none
+    """
+    return request.accept_encodings.best_match(encodings())
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compresses a response body with the given content encoding."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=Config.COMPRESSION_BROTLI_LEVEL)
+    return gzip.compress(data, compresslevel=Config.COMPRESSION_GZIP_LEVEL)
+
+
+def compress_response(response: Response) -> Response:
+    """Compresses JSON responses larger than COMPRESSION_MIN_SIZE with the
+    encoding negotiated with the client.
+
+    A compressed response's ETag is made weak, its bytes differ from the
+    uncompressed response's ones. If-None-Match uses weak comparison, so
+    the client's copy still validates.
+
+    Args:
+        response (Response): Outgoing response
+
+    Returns:
+        Response: Compressed response, or the response unchanged
+    """
+    if (
+        response.mimetype != 'application/json'
+        or response.is_streamed
+        or 'Content-Encoding' in response.headers
+    ):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < Config.COMPRESSION_MIN_SIZE:
+        return response
+    encoding = negotiate()
+    if encoding is None:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def send_static(directory: str, filename: str) -> Response:
+    """Sends a static file, or its precompressed copy if one was built and
+    the client accepts its encoding.
+
+    Hashed build files are cached by clients for a year, other files,
+    like index.html, are revalidated on every use.
+
+    Args:
+        directory (str): Static folder
+        filename (str): File path relative to the folder
+
+    Returns:
+        Response: The file
+    """
+    path = filename
+    encoding = None
+    accepted = request.accept_encodings
+    for candidate in encodings():
+        suffix = SUFFIXES[candidate]
+        if accepted[candidate] and os.path.isfile(
+            os.path.join(directory, filename + suffix)
+        ):
+            path, encoding = filename + suffix, candidate
+            break
+
+    hashed = HASHED_FILE.search(filename) is not None
+    response = send_from_directory(
+        directory,
+        path,
+        mimetype=mimetypes.guess_type(filename)[0],
+        max_age=IMMUTABLE_MAX_AGE if hashed else None,
+    )
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    if hashed:
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def initialize_compression(app: Flask) -> None:
+    """Compresses the app's JSON responses and serves its static folder
+    through send_static.
+
+    Args:
+        app (Flask): Flask application
+    """
+    app.after_request(compress_response)
+    if app.has_static_folder:
+        app.view_functions['static'] = lambda filename: send_static(
+            app.static_folder, filename
+        )
+
+
+def precompress(directory: str) -> int:
+    """Writes a gzip, and a brotli if available, copy of every static text
+    file that compression makes smaller.
+
+    Args:
+        directory (str): Static folder
+
+    Returns:
+        int: Number of compressed copies written
+    """
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as file:
+                data = file.read()
+            for encoding, suffix in SUFFIXES.items():
+                if encoding == 'br' and brotli is None:
+                    continue
+                if encoding == 'br':
+                    compressed = brotli.compress(data, quality=11)
+                else:
+                    compressed = gzip.compress(data, compresslevel=9)
+                if len(compressed) >= len(data):
+                    continue
+                with open(path + suffix, 'wb') as file:
+                    file.write(compressed)
+                written += 1
+    return written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory', help='Static folder, e.g. frontend/build')
+    args = parser.parse_args()
+    if not os.path.isdir(args.directory):
+        sys.exit(f'{args.directory} is not a directory.')
+    print(f'{precompress(args.directory)} compressed files written.')
@@ -1,6 +1,8 @@
 import os
 from datetime import timedelta
 
+from sqlalchemy.pool import NullPool
+
 
 class Config:
     """Set Flask configuration from environment variables."""
@@ -8,6 +10,23 @@ class Config:
     # General Config
     ACCESS_EXPIRES = timedelta(hours=6)  # TTL for jwt tokens
     SECRET_KEY = os.environ.get('SECRET_KEY')
+    LIST_PAGE_SIZE = int(os.environ.get('LIST_PAGE_SIZE', 50))
+    LIST_MAX_PAGE_SIZE = int(os.environ.get('LIST_MAX_PAGE_SIZE', 500))
+    BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 500))
+    BULK_LOOKUP_CONCURRENCY = int(
+        os.environ.get('BULK_LOOKUP_CONCURRENCY', 8)
+    )
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+    COMPRESSION_MIN_SIZE = int(
+        os.environ.get('COMPRESSION_MIN_SIZE', 1024)
+    )  # bytes, smaller JSON responses are sent uncompressed
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_LEVEL = int(
+        os.environ.get('COMPRESSION_BROTLI_LEVEL', 4)
+    )
+    JSON_ENCODER = os.environ.get(
+        'JSON_ENCODER', 'orjson'
+    )  # 'orjson' when installed, or 'json' for the standard library
 
     # Database Config
     uri = os.environ.get('DATABASE_URL', 'sqlite:///data.db')
@@ -16,8 +35,229 @@ class Config:
 
     SQLALCHEMY_DATABASE_URI = uri
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Database Pool Config, timeouts in seconds. Only applies to Postgres,
+    # SQLite keeps the pooling SQLAlchemy picks for it.
+    DATABASE_PGBOUNCER = os.environ.get('DATABASE_PGBOUNCER', '0') == '1'
+    DATABASE_POOL_SIZE = int(os.environ.get('DATABASE_POOL_SIZE', 5))
+    DATABASE_MAX_OVERFLOW = int(os.environ.get('DATABASE_MAX_OVERFLOW', 5))
+    DATABASE_POOL_TIMEOUT = float(os.environ.get('DATABASE_POOL_TIMEOUT', 10))
+    DATABASE_POOL_RECYCLE = int(
+        os.environ.get('DATABASE_POOL_RECYCLE', 30 * 60)
+    )  # replace connections older than this, before the server drops them
+    DATABASE_POOL_PRE_PING = (
+        os.environ.get('DATABASE_POOL_PRE_PING', '1') == '1'
+    )
+    DATABASE_STATEMENT_TIMEOUT = int(
+        os.environ.get('DATABASE_STATEMENT_TIMEOUT', 30 * 1000)
+    )  # milliseconds, 0 disables
+
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    if uri.startswith('postgresql'):
+        if DATABASE_PGBOUNCER:
+            # pgbouncer pools the server connections, keeping our own would
+            # only pin them. Its transaction pooling also rejects startup
+            # options, so set statement_timeout on the database role.
+            SQLALCHEMY_ENGINE_OPTIONS = {'poolclass': NullPool}
+        else:
+            SQLALCHEMY_ENGINE_OPTIONS = {
+                'pool_size': DATABASE_POOL_SIZE,
+                'max_overflow': DATABASE_MAX_OVERFLOW,
+                'pool_timeout': DATABASE_POOL_TIMEOUT,
+                'pool_recycle': DATABASE_POOL_RECYCLE,
+                'pool_pre_ping': DATABASE_POOL_PRE_PING,
+                'pool_use_lifo': True,  # lets surplus connections idle out
+            }
+            if DATABASE_STATEMENT_TIMEOUT:
+                SQLALCHEMY_ENGINE_OPTIONS['connect_args'] = {
+                    'options': (
+                        f'-c statement_timeout={DATABASE_STATEMENT_TIMEOUT}'
+                    )
+                }
     PROPAGATE_EXCEPTIONS = True
 
+    # Redis Config, timeouts in seconds
+    REDIS_MAX_CONNECTIONS = int(os.environ.get('REDIS_MAX_CONNECTIONS', 20))
+    REDIS_POOL_TIMEOUT = float(
+        os.environ.get('REDIS_POOL_TIMEOUT', 2)
+    )  # wait for a free connection once max connections are in use
+    REDIS_SOCKET_TIMEOUT = float(os.environ.get('REDIS_SOCKET_TIMEOUT', 1))
+    REDIS_CONNECT_TIMEOUT = float(os.environ.get('REDIS_CONNECT_TIMEOUT', 1))
+    REDIS_HEALTH_CHECK_INTERVAL = int(
+        os.environ.get('REDIS_HEALTH_CHECK_INTERVAL', 30)
+    )  # ping connections idle for longer before reusing them
+    REDIS_RETRIES = int(os.environ.get('REDIS_RETRIES', 3))
+    REDIS_RETRY_BACKOFF_BASE = float(
+        os.environ.get('REDIS_RETRY_BACKOFF_BASE', 0.05)
+    )
+    REDIS_RETRY_BACKOFF_CAP = float(
+        os.environ.get('REDIS_RETRY_BACKOFF_CAP', 0.5)
+    )
+
     # JWT Configuration
     JWT_SECRET_KEY = SECRET_KEY
     JWT_ACCESS_TOKEN_EXPIRES = ACCESS_EXPIRES
+    REVOCATION_SYNC_INTERVAL = float(
+        os.environ.get('REVOCATION_SYNC_INTERVAL', 2)
+    )  # max seconds a worker may accept a token revoked by another worker
+
+    # Lookup Config
+    LOOKUP_CONNECT_TIMEOUT = float(
+        os.environ.get('LOOKUP_CONNECT_TIMEOUT', 3.05)
+    )  # seconds to establish a connection to an upstream api
+    LOOKUP_READ_TIMEOUT = float(os.environ.get('LOOKUP_READ_TIMEOUT', 10))
+    LOOKUP_POOL_SIZE = int(os.environ.get('LOOKUP_POOL_SIZE', 10))  # per host
+    LOOKUP_POOL_TIMEOUT = float(os.environ.get('LOOKUP_POOL_TIMEOUT', 5))
+
+    # Lookup Cache Config, TTLs in seconds
+    LOOKUP_CACHE_ENABLED = os.environ.get('LOOKUP_CACHE_ENABLED', '1') == '1'
+    LOOKUP_CACHE_TTL = int(os.environ.get('LOOKUP_CACHE_TTL', 60 * 60))
+    LOOKUP_CACHE_TTLS = {  # per provider overrides
+        'www.googleapis.com': int(
+            os.environ.get('LOOKUP_CACHE_TTL_GOOGLE', 24 * 60 * 60)
+        ),
+        'api.deezer.com': int(
+            os.environ.get('LOOKUP_CACHE_TTL_DEEZER', 24 * 60 * 60)
+        ),
+        'www.omdbapi.com': int(
+            os.environ.get('LOOKUP_CACHE_TTL_OMDB', 7 * 24 * 60 * 60)
+        ),
+        'openlibrary.org': int(
+            os.environ.get('LOOKUP_CACHE_TTL_OPEN_LIBRARY', 24 * 60 * 60)
+        ),
+        'api.tvmaze.com': int(
+            os.environ.get('LOOKUP_CACHE_TTL_TVMAZE', 24 * 60 * 60)
+        ),
+    }
+    LOOKUP_CACHE_NEGATIVE_TTL = int(
+        os.environ.get('LOOKUP_CACHE_NEGATIVE_TTL', 10 * 60)
+    )
+    LOOKUP_CACHE_MAX_ENTRY_SIZE = int(
+        os.environ.get('LOOKUP_CACHE_MAX_ENTRY_SIZE', 256 * 1024)
+    )  # bytes of serialized json
+    LOOKUP_CACHE_MAX_AGE = int(
+        os.environ.get('LOOKUP_CACHE_MAX_AGE', 5 * 60)
+    )  # Cache-Control max-age of lookup responses sent to clients
+    LOOKUP_LOCAL_CACHE_TTL = int(
+        os.environ.get('LOOKUP_LOCAL_CACHE_TTL', 60)
+    )  # bounds how stale a worker's in-process copy can get
+    LOOKUP_LOCAL_CACHE_MAX_BYTES = int(
+        os.environ.get('LOOKUP_LOCAL_CACHE_MAX_BYTES', 16 * 1024 * 1024)
+    )  # 0 disables the in-process cache
+    LOOKUP_STALE_TTL = int(
+        os.environ.get('LOOKUP_STALE_TTL', 7 * 24 * 60 * 60)
+    )  # kept past the TTL, served when a provider can't be called
+
+    # Lookup Circuit Breaker Config, times in seconds
+    LOOKUP_BREAKER_ENABLED = (
+        os.environ.get('LOOKUP_BREAKER_ENABLED', '1') == '1'
+    )
+    LOOKUP_BREAKER_FAILURES = int(
+        os.environ.get('LOOKUP_BREAKER_FAILURES', 5)
+    )  # consecutive failed or slow calls that open a provider's circuit
+    LOOKUP_BREAKER_SLOW_CALL = float(
+        os.environ.get('LOOKUP_BREAKER_SLOW_CALL', 5)
+    )  # calls taking longer count as failures
+    LOOKUP_BREAKER_OPEN_SECONDS = float(
+        os.environ.get('LOOKUP_BREAKER_OPEN_SECONDS', 30)
+    )  # before a probe call is let through
+
+    # Lookup Rate Limit Config, rates in calls per second
+    LOOKUP_RATE_LIMIT_ENABLED = (
+        os.environ.get('LOOKUP_RATE_LIMIT_ENABLED', '1') == '1'
+    )
+    LOOKUP_RATE_LIMITS = {  # per provider, a daily quota of 0 is unlimited
+        'www.omdbapi.com': {
+            'rate': float(os.environ.get('LOOKUP_RATE_OMDB', 5)),
+            'burst': int(os.environ.get('LOOKUP_BURST_OMDB', 10)),
+            'daily': int(os.environ.get('LOOKUP_DAILY_QUOTA_OMDB', 1000)),
+        },
+        'www.googleapis.com': {
+            'rate': float(os.environ.get('LOOKUP_RATE_GOOGLE', 10)),
+            'burst': int(os.environ.get('LOOKUP_BURST_GOOGLE', 20)),
+            'daily': int(os.environ.get('LOOKUP_DAILY_QUOTA_GOOGLE', 0)),
+        },
+        'api.deezer.com': {
+            'rate': float(os.environ.get('LOOKUP_RATE_DEEZER', 10)),
+            'burst': int(os.environ.get('LOOKUP_BURST_DEEZER', 50)),
+            'daily': int(os.environ.get('LOOKUP_DAILY_QUOTA_DEEZER', 0)),
+        },
+        'api.tvmaze.com': {
+            'rate': float(os.environ.get('LOOKUP_RATE_TVMAZE', 2)),
+            'burst': int(os.environ.get('LOOKUP_BURST_TVMAZE', 20)),
+            'daily': int(os.environ.get('LOOKUP_DAILY_QUOTA_TVMAZE', 0)),
+        },
+    }
+    LOOKUP_RATE_RESERVE = float(
+        os.environ.get('LOOKUP_RATE_RESERVE', 0.2)
+    )  # share of burst and quota searches leave to lookups by id
+    LOOKUP_RATE_MAX_WAIT = float(
+        os.environ.get('LOOKUP_RATE_MAX_WAIT', 1)
+    )  # seconds a lookup by id waits for its provider's bucket to refill
+    LOOKUP_RATE_COOLDOWN = float(
+        os.environ.get('LOOKUP_RATE_COOLDOWN', 60)
+    )  # seconds a provider that throttled us is left alone, if it won't say
+
+    # Lookup Coalescing Config
+    LOOKUP_COALESCE_DISTRIBUTED = (
+        os.environ.get('LOOKUP_COALESCE_DISTRIBUTED', '0') == '1'
+    )  # also coalesce across workers through a Redis lock
+    LOOKUP_COALESCE_LOCK_TTL = float(
+        os.environ.get('LOOKUP_COALESCE_LOCK_TTL', 15)
+    )
+    LOOKUP_COALESCE_WAIT = float(os.environ.get('LOOKUP_COALESCE_WAIT', 10))
+
+    # Multi Provider Lookup Config, deadlines in seconds
+    LOOKUP_FANOUT_WORKERS = int(os.environ.get('LOOKUP_FANOUT_WORKERS', 16))
+    LOOKUP_PROVIDER_DEADLINES = {
+        'google_books': float(
+            os.environ.get('LOOKUP_DEADLINE_GOOGLE_BOOKS', 5)
+        ),
+        'open_library': float(
+            os.environ.get('LOOKUP_DEADLINE_OPEN_LIBRARY', 2.5)
+        ),
+        'omdb': float(os.environ.get('LOOKUP_DEADLINE_OMDB', 5)),
+        'tvmaze': float(os.environ.get('LOOKUP_DEADLINE_TVMAZE', 2.5)),
+    }
+
+    # Autocomplete Config
+    AUTOCOMPLETE_MAX_PREFIX = int(
+        os.environ.get('AUTOCOMPLETE_MAX_PREFIX', 12)
+    )  # longest prefix indexed, longer queries filter its suggestions
+    AUTOCOMPLETE_SET_SIZE = int(
+        os.environ.get('AUTOCOMPLETE_SET_SIZE', 50)
+    )  # suggestions kept per prefix
+    AUTOCOMPLETE_HALF_LIFE = float(
+        os.environ.get('AUTOCOMPLETE_HALF_LIFE', 30 * 24 * 60 * 60)
+    )  # seconds after which a value's popularity counts half
+    AUTOCOMPLETE_MAX_LIMIT = int(os.environ.get('AUTOCOMPLETE_MAX_LIMIT', 20))
+    AUTOCOMPLETE_MAX_AGE = int(
+        os.environ.get('AUTOCOMPLETE_MAX_AGE', 60)
+    )  # seconds clients may cache suggestions
+    AUTOCOMPLETE_REFILL_MIN_LENGTH = int(
+        os.environ.get('AUTOCOMPLETE_REFILL_MIN_LENGTH', 3)
+    )  # shortest prefix searched upstream when it has too few suggestions
+    AUTOCOMPLETE_REFILL_DELAY = float(
+        os.environ.get('AUTOCOMPLETE_REFILL_DELAY', 0.3)
+    )  # seconds a client must stop typing before its prefix is searched
+    AUTOCOMPLETE_REFILL_TTL = int(
+        os.environ.get('AUTOCOMPLETE_REFILL_TTL', 24 * 60 * 60)
+    )  # seconds before the same prefix is searched upstream again
+    AUTOCOMPLETE_REFILL_RATE = float(
+        os.environ.get('AUTOCOMPLETE_REFILL_RATE', 0.2)
+    )  # upstream searches a second refills may make, across workers
+    AUTOCOMPLETE_REFILL_BURST = int(
+        os.environ.get('AUTOCOMPLETE_REFILL_BURST', 10)
+    )
+    AUTOCOMPLETE_REFILL_DAILY_QUOTA = int(
+        os.environ.get('AUTOCOMPLETE_REFILL_DAILY_QUOTA', 200)
+    )
+
+    # Metrics Config
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+    METRICS_TOKEN = os.environ.get(
+        'METRICS_TOKEN'
+    )  # bearer token GET /metrics requires when set
+    METRICS_SERVER_TIMING = (
+        os.environ.get('METRICS_SERVER_TIMING', '0') == '1'
+    )  # report each response's time breakdown in a Server-Timing header
@@ -1,21 +1,108 @@
 import os
-from urllib.parse import urlparse
+import threading
+import time
+from typing import Iterable
 
 import redis
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from redis.backoff import ExponentialBackoff
+from redis.client import Pipeline
+from redis.retry import Retry
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+from api.config import Config
+from api.metrics import metrics
 
 db = SQLAlchemy()
 
-url = urlparse(os.environ.get('REDIS_URL'))
-jwt_redis_blocklist = redis.StrictRedis(
-    url.hostname,
-    url.port,
-    db=0,
-    username=url.username,
-    password=url.password,
-    decode_responses=True
-)
+_redis_pool = None
+_redis = None
+_redis_lock = threading.Lock()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self._timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self._checkouts += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+
+    def stats(self) -> dict:
+        """Returns pool occupancy and checkout wait times in seconds."""
+        with self._stats_lock:
+            checkouts = self._checkouts
+            return {
+                'size': self.size(),
+                'checked_out': self.checkedout(),
+                'overflow': self.overflow(),
+                'checkouts': checkouts,
+                'timeouts': self._timeouts,
+                'wait_seconds_total': self._wait_total,
+                'wait_seconds_max': self._wait_max,
+                'wait_seconds_mean': (
+                    self._wait_total / checkouts if checkouts else 0.0
+                ),
+            }
+
+
+class TimedRedis(redis.Redis):
+    """Redis client that records the duration of every command, and of
+    every pipeline as a whole, in the redis metrics.
+    """
+
+    def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        finally:
+            metrics.record(
+                metrics.redis, 'redis', time.perf_counter() - start, args[0]
+            )
+
+    def pipeline(self, transaction: bool = True, shard_hint=None):
+        return TimedPipeline(
+            self.connection_pool,
+            self.response_callbacks,
+            transaction,
+            shard_hint,
+        )
+
+
+class TimedPipeline(Pipeline):
+    """Pipeline recording the duration of each execution."""
+
+    def execute(self, raise_on_error: bool = True) -> list:
+        start = time.perf_counter()
+        try:
+            return super().execute(raise_on_error)
+        finally:
+            metrics.record(
+                metrics.redis,
+                'redis',
+                time.perf_counter() - start,
+                'PIPELINE',
+            )
 
 
 def initialize_db(app: Flask) -> None:
@@ -24,9 +111,136 @@ def initialize_db(app: Flask) -> None:
     Args:
         app: Flask app object
     """
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    if 'pool_size' in options:
+        options.setdefault('poolclass', TimedQueuePool)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
     db.init_app(app)
 
 
-def create_db() -> None:
-    """Creates database tables from Models"""
-    db.create_all()
+def release_connection() -> None:
+    """Ends the session's transaction and returns its connection to the
+    pool, so slow work that follows, such as an upstream lookup, does not
+    hold a database connection.
+    """
+    db.session.close()
+
+
+def db_pool_stats() -> dict:
+    """Retrieves usage of the database connection pool, must be called
+    within an app context.
+
+    Returns:
+        dict: Pool occupancy and checkout wait times, empty when the
+            engine does not pool its connections
+    """
+    pool = db.engine.pool
+    return pool.stats() if isinstance(pool, TimedQueuePool) else {}
+
+
+def get_redis() -> redis.Redis:
+    """Retrieves the Redis client, creating its connection pool on first
+    use so that importing the app never connects to Redis.
+
+    The pool is shared by every Redis user in the process. Connections
+    are checked with a PING when idle for longer than the health check
+    interval and commands failing with a connection error or timeout are
+    retried with exponential backoff.
+
+    Returns:
+        redis.Redis: Client backed by the shared connection pool
+    """
+    global _redis, _redis_pool
+    if _redis is None:
+        with _redis_lock:
+            if _redis is None:
+                _redis_pool = redis.BlockingConnectionPool.from_url(
+                    os.environ.get('REDIS_URL', 'redis://localhost:6379'),
+                    max_connections=Config.REDIS_MAX_CONNECTIONS,
+                    timeout=Config.REDIS_POOL_TIMEOUT,
+                    socket_timeout=Config.REDIS_SOCKET_TIMEOUT,
+                    socket_connect_timeout=Config.REDIS_CONNECT_TIMEOUT,
+                    socket_keepalive=True,
+                    health_check_interval=Config.REDIS_HEALTH_CHECK_INTERVAL,
+                    retry=Retry(
+                        ExponentialBackoff(
+                            cap=Config.REDIS_RETRY_BACKOFF_CAP,
+                            base=Config.REDIS_RETRY_BACKOFF_BASE,
+                        ),
+                        Config.REDIS_RETRIES,
+                    ),
+                    retry_on_error=[
+                        redis.ConnectionError,
+                        redis.TimeoutError,
+                    ],
+                    decode_responses=True,
+                )
+                client = TimedRedis if metrics.enabled else redis.Redis
+                _redis = client(connection_pool=_redis_pool)
+    return _redis
+
+
+class LazyRedis:
+    """Stand in for the Redis client that resolves it on each use, so
+    module level objects can hold a client without creating it at import.
+    """
+
+    def __getattr__(self, name: str):
+        return getattr(get_redis(), name)
+
+
+redis_client = LazyRedis()
+
+
+def get_many(keys: Iterable[str]) -> dict[str, str]:
+    """Retrieves several keys in a single round trip.
+
+    Args:
+        keys (Iterable[str]): Keys to retrieve
+
+    Returns:
+        dict[str, str]: Value of each key that exists
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+    values = redis_client.mget(keys)
+    return {
+        key: value for key, value in zip(keys, values) if value is not None
+    }
+
+
+def set_many(values: dict[str, str], ttl: int | None = None) -> None:
+    """Stores several keys in a single round trip.
+
+    Args:
+        values (dict[str, str]): Value of each key
+        ttl (:obj:'int', optional): Seconds until the keys expire
+    """
+    if not values:
+        return
+    pipe = redis_client.pipeline(transaction=False)
+    for key, value in values.items():
+        pipe.set(key, value, ex=ttl)
+    pipe.execute()
+
+
+def redis_pool_stats() -> dict:
+    """Retrieves usage of the Redis connection pool.
+
+    Returns:
+        dict: Connections opened, idle and in use, and the pool limit
+    """
+    pool = _redis_pool
+    if pool is None:
+        return {}
+    opened = len(pool._connections)
+    idle = sum(
+        connection is not None for connection in list(pool.pool.queue)
+    )
+    return {
+        'max_connections': pool.max_connections,
+        'opened': opened,
+        'idle': idle,
+        'in_use': opened - idle,
+    }
@@ -0,0 +1,315 @@
+import asyncio
+import contextvars
+import threading
+import time
+from collections import defaultdict
+from concurrent import futures
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Iterable, NamedTuple
+
+from api.config import Config
+from api.lookup.books import BookLookup, OpenLibraryLookup
+from api.lookup.util import fetch_data
+from api.lookup.video import TVMazeLookup, VideoLookup
+
+# Shared by every event loop so that a provider still running past its
+# deadline does not hold up the response while it finishes (and warms the
+# response cache) in the background.
+_executor = ThreadPoolExecutor(
+    max_workers=Config.LOOKUP_FANOUT_WORKERS, thread_name_prefix='lookup'
+)
+_stats = defaultdict(lambda: defaultdict(int))
+_stats_lock = threading.Lock()
+
+
+class Provider(NamedTuple):
+    """A lookup source queried as part of a fan-out."""
+
+    name: str
+    search: Callable[..., list[dict]]
+
+    @property
+    def deadline(self) -> float:
+        return Config.LOOKUP_PROVIDER_DEADLINES.get(
+            self.name, Config.LOOKUP_READ_TIMEOUT
+        )
+
+
+BOOK_PROVIDERS = (
+    Provider('google_books', BookLookup.search_by_title),
+    Provider('open_library', OpenLibraryLookup.search_by_title),
+)
+SHOW_PROVIDERS = (
+    Provider(
+        'omdb', partial(VideoLookup.search_by_title, media_type='series')
+    ),
+    Provider('tvmaze', TVMazeLookup.search_by_title),
+)
+
+
+def in_context(fn: Callable, *args: Any) -> Callable[[], Any]:
+    """Binds fn to its arguments and to a copy of the caller's context, so
+    the timings of a lookup run on the executor count towards the spans
+    of the request that started it.
+
+    Args:
+        fn (Callable): Function to run on the executor
+        *args: Arguments for fn
+
+    Returns:
+        Callable[[], Any]: Function to submit
+    """
+    return partial(contextvars.copy_context().run, fn, *args)
+
+
+def run_in_background(fn: Callable, *args: Any) -> futures.Future:
+    """Runs a blocking function on the shared lookup executor without
+    waiting for it, e.g. work a response does not depend on.
+
+    Args:
+        fn (Callable): Blocking function to run
+        *args: Arguments for fn
+
+    Returns:
+        futures.Future: The function's future
+    """
+    return _executor.submit(in_context(fn, *args))
+
+
+async def run_in_thread(fn: Callable, *args: Any) -> Any:
+    """Runs a blocking lookup function on the shared lookup executor.
+
+    Args:
+        fn (Callable): Blocking function to run
+        *args: Arguments for fn
+
+    Returns:
+        Any: The function's return value
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, in_context(fn, *args))
+
+
+async def fetch_data_async(url: str) -> dict:
+    """Async variant of fetch_data, sharing its connection pool and cache.
+
+    Args:
+        url (str): url to open
+
+    Returns:
+        dict: json data from url
+    """
+    return await run_in_thread(fetch_data, url)
+
+
+async def fan_out(
+    providers: Iterable[Provider], *args: Any
+) -> list[list[dict]]:
+    """Queries every provider concurrently, each within its own deadline.
+
+    Providers that fail or miss their deadline are left out of the
+    results, so a slow source degrades the response instead of blocking
+    it. If no provider succeeds the first provider's error is raised.
+
+    Args:
+        providers (Iterable[Provider]): Providers to query, in priority order
+        *args: Search arguments passed to each provider
+
+    Returns:
+        list[list[dict]]: Results of each provider that succeeded
+    """
+    providers = tuple(providers)
+    results = await asyncio.gather(
+        *(
+            asyncio.wait_for(
+                run_in_thread(provider.search, *args), provider.deadline
+            )
+            for provider in providers
+        ),
+        return_exceptions=True,
+    )
+
+    return _collect(providers, results)
+
+
+def fan_out_blocking(
+    providers: Iterable[Provider], *args: Any
+) -> list[list[dict]]:
+    """Blocking variant of fan_out that waits on the executor's futures
+    instead of running an event loop. Under gevent every request shares
+    one thread, and a thread can only run one event loop at a time.
+
+    Args:
+        providers (Iterable[Provider]): Providers to query, in priority order
+        *args: Search arguments passed to each provider
+
+    Returns:
+        list[list[dict]]: Results of each provider that succeeded
+    """
+    providers = tuple(providers)
+    started = time.monotonic()
+    pending = [
+        _executor.submit(in_context(p.search, *args)) for p in providers
+    ]
+    results = []
+    for provider, future in zip(providers, pending):
+        remaining = provider.deadline - (time.monotonic() - started)
+        try:
+            results.append(future.result(timeout=max(remaining, 0)))
+        except Exception as error:
+            results.append(error)
+    return _collect(providers, results)
+
+
+def _collect(providers: tuple, results: list) -> list[list[dict]]:
+    """Counts each provider's outcome and keeps the successful results."""
+    succeeded, errors = [], []
+    for provider, result in zip(providers, results):
+        if isinstance(result, (asyncio.TimeoutError, futures.TimeoutError)):
+            _count(provider.name, 'timeouts')
+            errors.append(result)
+        elif isinstance(result, Exception):
+            _count(provider.name, 'errors')
+            errors.append(result)
+        else:
+            _count(provider.name, 'successes')
+            succeeded.append(result)
+
+    if not succeeded and errors:
+        raise errors[0]
+    return succeeded
+
+
+async def map_concurrently(
+    fn: Callable, items: Iterable, limit: int
+) -> list:
+    """Calls fn on every item concurrently, at most limit at a time.
+
+    Args:
+        fn (Callable): Blocking function to call with each item
+        items (Iterable): Arguments for fn
+        limit (int): Maximum concurrent calls
+
+    Returns:
+        list: fn's result, or the exception it raised, for each item
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def call(item: Any) -> Any:
+        async with semaphore:
+            return await run_in_thread(fn, item)
+
+    return await asyncio.gather(
+        *(call(item) for item in items), return_exceptions=True
+    )
+
+
+def lookup_all(fn: Callable, items: Iterable, limit: int = 8) -> list:
+    """Blocking variant of map_concurrently for the resources, see
+    fan_out_blocking for why it does not run an event loop.
+
+    Args:
+        fn (Callable): Blocking function to call with each item
+        items (Iterable): Arguments for fn
+        limit (int): Maximum concurrent calls
+
+    Returns:
+        list: fn's result, or the exception it raised, for each item
+    """
+    items = list(items)
+    results = [None] * len(items)
+    running = {}  # future -> item index
+    for index, item in enumerate(items):
+        if len(running) >= limit:
+            _wait_one(running, results)
+        running[_executor.submit(in_context(fn, item))] = index
+    while running:
+        _wait_one(running, results)
+    return results
+
+
+def _wait_one(running: dict, results: list) -> None:
+    """Waits for a running call to finish and stores its outcome."""
+    done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+    for future in done:
+        index = running.pop(future)
+        error = future.exception()
+        results[index] = error if error is not None else future.result()
+
+
+def merge(results: Iterable[list[dict]], id_fields: tuple) -> list[dict]:
+    """Merges result lists, dropping items that share an id with an earlier
+    item. Earlier lists take precedence.
+
+    Args:
+        results (Iterable[list[dict]]): Result lists in priority order
+        id_fields (tuple): Fields that identify an item, e.g. isbn_13
+
+    Returns:
+        list[dict]: Merged, deduplicated results
+    """
+    seen, merged = set(), []
+    for result in results:
+        for item in result:
+            ids = {
+                (field, item[field]) for field in id_fields if item.get(field)
+            }
+            if ids & seen:
+                continue
+            seen |= ids
+            merged.append(item)
+    return merged
+
+
+async def search_books_async(title: str) -> list[dict]:
+    """Searches every book provider for the given title.
+
+    Args:
+        title (str): Title to search with
+
+    Returns:
+        list[dict]: Books found, deduplicated by ISBN
+    """
+    results = await fan_out(BOOK_PROVIDERS, title)
+    return merge(results, ('isbn_13', 'isbn_10'))
+
+
+async def search_shows_async(title: str) -> list[dict]:
+    """Searches every TV show provider for the given title.
+
+    Args:
+        title (str): Title to search with
+
+    Returns:
+        list[dict]: Shows found, deduplicated by IMDB id
+    """
+    results = await fan_out(SHOW_PROVIDERS, title)
+    return merge(results, ('imdbID',))
+
+
+def search_books(title: str) -> list[dict]:
+    """Blocking variant of search_books_async for the resources."""
+    results = fan_out_blocking(BOOK_PROVIDERS, title)
+    return merge(results, ('isbn_13', 'isbn_10'))
+
+
+def search_shows(title: str) -> list[dict]:
+    """Blocking variant of search_shows_async for the resources."""
+    results = fan_out_blocking(SHOW_PROVIDERS, title)
+    return merge(results, ('imdbID',))
+
+
+def _count(provider: str, stat: str) -> None:
+    with _stats_lock:
+        _stats[provider][stat] += 1
+
+
+def fanout_stats() -> dict[str, dict]:
+    """Retrieves success, error and deadline miss counts by provider.
+
+    Returns:
+        dict[str, dict]: Counters keyed by provider name
+    """
+    with _stats_lock:
+        return {name: dict(counts) for name, counts in _stats.items()}
@@ -23,7 +23,7 @@ class BookLookup:
 
         book_list = []
         if json_values:
-            for book in json_values['items']:
+            for book in json_values.get('items', []):
                 release_date = book['volumeInfo'].get('publishedDate')
                 if (
                     str(year) in release_date
@@ -49,7 +49,7 @@ class BookLookup:
 
         book_list = []
         if json_values:
-            for book in json_values['items']:
+            for book in json_values.get('items', []):
                 if 'en' in book['volumeInfo']['language']:
                     book_list.append(cls.parse_book_data(book, json=True))
 
@@ -71,7 +71,7 @@ class BookLookup:
 
         book_list = []
         if json_values:
-            for book in json_values['items']:
+            for book in json_values.get('items', []):
                 if 'en' in book['volumeInfo']['language']:
                     book_list.append(cls.parse_book_data(book, json=True))
 
@@ -89,10 +89,10 @@ class BookLookup:
         """
         url = f'{cls.base_url}?q=isbn:{isbn}'
 
-        json_values = fetch_data(url)
+        json_values = fetch_data(url, priority=True)
 
         book = None
-        if json_values:
+        if json_values.get('items'):
             book = cls.parse_book_data(json_values['items'][0])
         return book
 
@@ -132,3 +132,61 @@ class BookLookup:
         }
 
         return book
+
+
+class OpenLibraryLookup:
+    base_url = 'https://openlibrary.org/search.json'
+    fields = 'title,subtitle,author_name,first_publish_year,isbn,language'
+
+    @classmethod
+    def search_by_title(cls, title: str) -> list[dict]:
+        """Retrieves books with the given title.
+
+        Args:
+            title (str): Title to search with
+
+        Returns:
+            list[dict]: Books with the given title.
+        """
+        url = (
+            f'{cls.base_url}?title={sanitize(title)}'
+            f'&fields={cls.fields}&limit=20'
+        )
+
+        json_values = fetch_data(url)
+
+        book_list = []
+        for book in json_values.get('docs', []):
+            languages = book.get('language')
+            if book.get('isbn') and (not languages or 'eng' in languages):
+                book_list.append(cls.parse_book_data(book))
+
+        return book_list
+
+    @classmethod
+    def parse_book_data(cls, book_data: dict) -> dict:
+        """Parses api response data into the same format as BookLookup.
+
+        Args:
+            book_data (dict): The response data to parse.
+
+        Returns:
+            dict: Parsed book data
+        """
+        isbn_10, isbn_13 = None, None
+        for isbn in book_data.get('isbn', []):
+            if len(isbn) == 13 and isbn_13 is None:
+                isbn_13 = isbn
+            elif len(isbn) == 10 and isbn_10 is None:
+                isbn_10 = isbn
+
+        release_year = book_data.get('first_publish_year')
+
+        return {
+            'title': book_data.get('title'),
+            'subtitle': book_data.get('subtitle'),
+            'authors': ', '.join(book_data.get('author_name', [])),
+            'release_date': str(release_year) if release_year else None,
+            'isbn_10': isbn_10,
+            'isbn_13': isbn_13,
+        }
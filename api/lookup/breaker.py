@@ -0,0 +1,176 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+from urllib.error import HTTPError
+
+from api.lookup.ratelimit import RateLimitedError
+
+CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open."""
+
+    def __init__(self, provider: str, retry_after: Optional[float]) -> None:
+        super().__init__(f'{provider} is unavailable.')
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+def is_failure(error: Exception) -> bool:
+    """Whether an error says the provider is unhealthy: connection errors,
+    timeouts, server errors and malformed responses. Client errors and
+    rate limits say nothing about its health.
+    """
+    if isinstance(error, RateLimitedError):
+        return False
+    if isinstance(error, HTTPError):
+        return error.code >= 500
+    return isinstance(error, (OSError, ValueError))
+
+
+class _Circuit:
+    """State of one provider's circuit."""
+
+    def __init__(self) -> None:
+        self.state = CLOSED
+        self.failures = 0  # consecutive
+        self.opened_at = 0.0
+        self.probing = False
+        self.stats = defaultdict(int)
+
+
+class CircuitBreaker:
+    """Per provider circuit breakers, kept by each worker process.
+
+    A provider's circuit opens after ``failures`` consecutive failed or
+    slow calls (taking ``slow_call`` seconds or more), failing calls fast
+    with CircuitOpenError rather than letting each wait out the socket
+    timeout. After ``open_seconds`` it is half open: a single probe call
+    is let through, closing the circuit if it succeeds and opening it
+    again if not.
+    """
+
+    def __init__(
+        self,
+        failures: int = 5,
+        slow_call: float = 5,
+        open_seconds: float = 30,
+        enabled: bool = True,
+    ) -> None:
+        self.failures = failures
+        self.slow_call = slow_call
+        self.open_seconds = open_seconds
+        self.enabled = enabled
+        self._circuits = defaultdict(_Circuit)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def call(self, provider: str) -> Iterator[Callable[[], None]]:
+        """Guards a call to the provider made in the with block, recording
+        its outcome and duration.
+
+        Yields a function to call when the upstream request starts, so
+        that waiting before it, e.g. for the rate limit, does not count
+        towards a slow call.
+
+        Args:
+            provider (str): Provider (upstream host) to call
+
+        Raises:
+            CircuitOpenError: The provider's circuit is open
+        """
+        if not self.enabled:
+            yield lambda: None
+            return
+        probe = self._admit(provider)
+        start = time.monotonic()
+
+        def started() -> None:
+            nonlocal start
+            start = time.monotonic()
+
+        # Also the outcome of a call interrupted by a BaseException, e.g.
+        # a gevent Timeout, so that a probe never stays in flight.
+        outcome = 'failures'
+        try:
+            yield started
+            if time.monotonic() - start >= self.slow_call:
+                outcome = 'slow_calls'
+            else:
+                outcome = 'successes'
+        except Exception as error:
+            if isinstance(error, RateLimitedError):
+                outcome = None
+            elif not is_failure(error):
+                # the provider answered, e.g. with a client error
+                outcome = 'successes'
+            raise
+        finally:
+            self._record(provider, probe, outcome)
+
+    def _admit(self, provider: str) -> bool:
+        """Lets a call through, returns whether it is the half open probe.
+
+        Raises:
+            CircuitOpenError: The call is not let through
+        """
+        with self._lock:
+            circuit = self._circuits[provider]
+            if circuit.state == CLOSED:
+                return False
+            remaining = (
+                circuit.opened_at + self.open_seconds - time.monotonic()
+            )
+            if remaining <= 0 and not circuit.probing:
+                circuit.state, circuit.probing = HALF_OPEN, True
+                circuit.stats['probes'] += 1
+                return True
+            circuit.stats['rejected'] += 1
+        raise CircuitOpenError(provider, max(remaining, 1))
+
+    def _record(
+        self, provider: str, probe: bool, outcome: Optional[str]
+    ) -> None:
+        """Updates the circuit with a call's outcome, None when the call
+        says nothing about the provider's health.
+        """
+        with self._lock:
+            circuit = self._circuits[provider]
+            if probe:
+                circuit.probing = False
+            if outcome is None:
+                if probe:
+                    circuit.state = OPEN  # probe again on the next call
+                return
+            circuit.stats[outcome] += 1
+            if outcome == 'successes':
+                circuit.failures = 0
+                circuit.state = CLOSED
+                return
+            circuit.failures += 1
+            if probe or (
+                circuit.state == CLOSED and circuit.failures >= self.failures
+            ):
+                circuit.state = OPEN
+                circuit.opened_at = time.monotonic()
+                circuit.stats['opens'] += 1
+
+    def stats(self) -> dict[str, dict]:
+        """Returns each provider's circuit state, as 0 closed, 1 half open
+        or 2 open, and its call counters.
+
+        Returns:
+            dict[str, dict]: State and counters keyed by provider
+        """
+        with self._lock:
+            return {
+                provider: {
+                    **circuit.stats,
+                    'state': circuit.state,
+                    'consecutive_failures': circuit.failures,
+                }
+                for provider, circuit in self._circuits.items()
+            }
@@ -0,0 +1,321 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import redis
+
+# Query parameters that never change the upstream response (credentials)
+# and are left out of cache keys.
+_IGNORED_PARAMS = {'apikey', 'key'}
+
+
+def response_kind(data: dict | list) -> str:
+    """Classifies an upstream response for caching.
+
+    Args:
+        data (dict | list): Decoded upstream response
+
+    Returns:
+        str: 'found', 'not_found' (cached briefly) or 'error' (not cached)
+    """
+    if isinstance(data, list):  # TVMaze
+        return 'found' if data else 'not_found'
+    if data.get('Response') == 'False':  # OMDb
+        error = data.get('Error', '').lower()
+        if 'not found' in error or 'incorrect imdb id' in error:
+            return 'not_found'
+        return 'error'
+    if 'error' in data:  # Deezer, 800 is "no data"
+        error = data['error']
+        if isinstance(error, dict) and error.get('code') == 800:
+            return 'not_found'
+        return 'error'
+    if (
+        data.get('totalItems') == 0  # Google Books
+        or data.get('data') == []  # Deezer searches
+        or data.get('docs') == []  # Open Library
+    ):
+        return 'not_found'
+    return 'found'
+
+
+class LocalCache:
+    """Thread safe in-process LRU cache with per entry TTLs.
+
+    The cache is bounded by ``max_bytes``, the summed serialized size of
+    its entries. The least recently used entries are evicted to make room
+    for new ones. Cached values are shared between threads and must be
+    treated as read only.
+    """
+
+    def __init__(self, max_bytes: int, ttl: int) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = defaultdict(int)
+
+    def get(self, key: str) -> dict | None:
+        """Retrieves the value for the key if present and not expired.
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            dict | None: Cached value if found else None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            expires_at, size, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._size -= size
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+
+    def set(
+        self, key: str, value: dict, size: int, ttl: float | None = None
+    ) -> None:
+        """Stores the value, evicting least recently used entries if needed.
+
+        Args:
+            key (str): Cache key
+            value (dict): Value to cache
+            size (int): Approximate size of the value in bytes
+            ttl (:obj:'float', optional): Seconds to keep the entry, capped
+                at the cache's own TTL
+        """
+        if size > self.max_bytes:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+
+            while self._entries and self._size + size > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self._stats['evictions'] += 1
+
+            self._entries[key] = (time.monotonic() + ttl, size, value)
+            self._size += size
+
+    def clear(self) -> None:
+        """Removes every entry from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        """Returns hit, miss and eviction counters and current usage."""
+        with self._lock:
+            return {
+                **self._stats,
+                'entries': len(self._entries),
+                'size_bytes': self._size,
+                'max_bytes': self.max_bytes,
+            }
+
+
+class ResponseCache:
+    """Read-through cache of upstream json responses kept in Redis.
+
+    Responses are keyed by provider (the upstream host) and a normalized
+    form of the request url, so trivially different urls for the same
+    query share an entry. "Not found" responses are cached with a shorter
+    TTL and upstream errors are never cached.
+
+    When given a LocalCache it is checked before Redis, making the cache
+    two tiered: process memory, then Redis.
+
+    Entries are kept in Redis for ``stale_ttl`` seconds past their TTL,
+    for get_stale to serve when the provider cannot be called. Each value
+    is stored behind the time it stops being fresh and a newline.
+    """
+
+    key_prefix = 'lookup'
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        default_ttl: int,
+        ttls: dict[str, int] | None = None,
+        negative_ttl: int = 300,
+        max_entry_size: int = 256 * 1024,
+        enabled: bool = True,
+        local: LocalCache | None = None,
+        stale_ttl: int = 0,
+    ) -> None:
+        self.client = client
+        self.local = local
+        self.stale_ttl = stale_ttl
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+        self.negative_ttl = negative_ttl
+        self.max_entry_size = max_entry_size
+        self.enabled = enabled
+        self._stats = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def provider(url: str) -> str:
+        """Returns the provider (upstream host) the url belongs to."""
+        return (urlsplit(url).hostname or '').lower()
+
+    def key(self, url: str) -> str:
+        """Builds the cache key for the given url.
+
+        Args:
+            url (str): Upstream url
+
+        Returns:
+            str: provider namespaced cache key
+        """
+        parts = urlsplit(url)
+        path = '/'.join(filter(None, parts.path.split('/')))
+        params = sorted(
+            (name, ' '.join(value.replace('+', ' ').lower().split()))
+            for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if name.lower() not in _IGNORED_PARAMS
+        )
+        normalized = f'{path}?{urlencode(params)}'
+        digest = hashlib.sha1(normalized.encode()).hexdigest()
+        return f'{self.key_prefix}:{self.provider(url)}:{digest}'
+
+    def get(self, url: str) -> dict | None:
+        """Retrieves the cached response for the given url.
+
+        Args:
+            url (str): Upstream url
+
+        Returns:
+            dict | None: Cached response data if cached else None
+        """
+        if not self.enabled:
+            return None
+        provider, key = self.provider(url), self.key(url)
+        if self.local is not None:
+            data = self.local.get(key)
+            if data is not None:
+                self._count(provider, 'local_hits')
+                return data
+
+        try:
+            value = self.client.get(key)
+        except redis.RedisError:
+            self._count(provider, 'errors')
+            return None
+
+        fresh_until, data = self._decode(value)
+        if data is None or fresh_until < time.time():
+            self._count(provider, 'misses')
+            return None
+        self._count(provider, 'hits')
+        if self.local is not None:
+            # Kept only while fresh, the entry may be about to go stale.
+            self.local.set(key, data, len(value), fresh_until - time.time())
+        return data
+
+    def get_stale(self, url: str) -> dict | None:
+        """Retrieves the cached response for the given url, even if its
+        TTL is over, to use when the provider cannot be called.
+
+        Args:
+            url (str): Upstream url
+
+        Returns:
+            dict | None: Cached response data if cached else None
+        """
+        if not self.enabled:
+            return None
+        provider = self.provider(url)
+        try:
+            value = self.client.get(self.key(url))
+        except redis.RedisError:
+            self._count(provider, 'errors')
+            return None
+        _, data = self._decode(value)
+        if data is not None:
+            self._count(provider, 'stale_hits')
+        return data
+
+    @staticmethod
+    def _decode(value: str | None) -> tuple[float, dict | None]:
+        """Splits a stored value into its fresh until time and its data,
+        entries stored without a time are fresh until they expire.
+        """
+        if value is None:
+            return 0, None
+        fresh_until, _, data = value.partition('\n')
+        if not data:
+            return float('inf'), json.loads(fresh_until)
+        return float(fresh_until), json.loads(data)
+
+    def set(self, url: str, data: dict) -> None:
+        """Caches the response for the given url if it is cacheable.
+
+        Args:
+            url (str): Upstream url
+            data (dict): Decoded upstream response
+        """
+        if not self.enabled:
+            return
+        provider = self.provider(url)
+        kind = response_kind(data)
+        if kind == 'error':
+            return
+
+        value = json.dumps(data, separators=(',', ':'))
+        if len(value) > self.max_entry_size:
+            self._count(provider, 'too_large')
+            return
+
+        if kind == 'not_found':
+            ttl = self.negative_ttl
+        else:
+            ttl = self.ttls.get(provider, self.default_ttl)
+        key = self.key(url)
+        if self.local is not None:
+            self.local.set(key, data, len(value), ttl)
+        try:
+            self.client.set(
+                key,
+                f'{time.time() + ttl:.0f}\n{value}',
+                ex=ttl + self.stale_ttl,
+            )
+        except redis.RedisError:
+            self._count(provider, 'errors')
+            return
+        self._count(
+            provider, 'negative_stores' if kind == 'not_found' else 'stores'
+        )
+
+    def _count(self, provider: str, stat: str) -> None:
+        with self._lock:
+            self._stats[provider][stat] += 1
+
+    def stats(self) -> dict[str, dict]:
+        """Returns the cache counters for each provider.
+
+        Returns:
+            dict[str, dict]: hits, misses, stores and errors by provider
+        """
+        with self._lock:
+            return {
+                provider: dict(counts)
+                for provider, counts in self._stats.items()
+            }
@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Optional
+from uuid import uuid4
+
+import redis
+
+# Deletes the lock only if it is still held by the given token.
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class _Call:
+    """An in-flight call that other threads can wait on."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into a single execution.
+
+    Threads calling ``do`` with a key that is already in flight wait for
+    the running call and share its result (or exception) instead of
+    repeating it. With a Redis client the deduplication also spans
+    workers: one worker takes a short lived Redis lock for the key while
+    the others poll ``shared_result`` until it yields the leader's result.
+    """
+
+    key_prefix = 'lookup:lock'
+
+    def __init__(
+        self,
+        client: Optional[redis.Redis] = None,
+        lock_ttl: float = 15,
+        wait_timeout: float = 10,
+        poll_interval: float = 0.05,
+    ) -> None:
+        self.client = client
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = defaultdict(int)
+
+    def do(
+        self,
+        key: str,
+        fn: Callable[[], Any],
+        shared_result: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        """Runs fn once for all concurrent callers with the same key.
+
+        Args:
+            key (str): Identifies identical calls
+            fn (Callable): Performs the call
+            shared_result (:obj:'Callable', optional): Returns the result
+                stored by another worker's call or None if not yet there,
+                enables cross worker coalescing.
+
+        Returns:
+            Any: The result of fn
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            self._stats['leaders' if leader else 'coalesced'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run(key, fn, shared_result)
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def _run(
+        self,
+        key: str,
+        fn: Callable[[], Any],
+        shared_result: Optional[Callable[[], Any]],
+    ) -> Any:
+        """Runs fn, coordinating with other workers through Redis."""
+        if self.client is None or shared_result is None:
+            return fn()
+
+        lock_key, token = f'{self.key_prefix}:{key}', uuid4().hex
+        try:
+            acquired = self.client.set(
+                lock_key, token, nx=True, px=int(self.lock_ttl * 1000)
+            )
+        except redis.RedisError:
+            self._count('lock_errors')
+            return fn()
+
+        if acquired:
+            try:
+                return fn()
+            finally:
+                try:
+                    self.client.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+                except redis.RedisError:
+                    self._count('lock_errors')
+
+        self._count('remote_waits')
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            result = shared_result()
+            if result is not None:
+                self._count('remote_coalesced')
+                return result
+            try:
+                if not self.client.exists(lock_key):
+                    break  # leader finished without a shareable result
+            except redis.RedisError:
+                self._count('lock_errors')
+                break
+        return fn()
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def stats(self) -> dict:
+        """Returns counts of led, coalesced and remotely coalesced calls."""
+        with self._lock:
+            return {
+                **self._stats,
+                'in_flight': len(self._calls),
+            }
@@ -24,10 +24,10 @@ class MusicLookup:
         else:
             url = f'{cls.base_url}/track/{deezer_id}'
 
-        json_values = fetch_data(sanitize(url))
+        json_values = fetch_data(sanitize(url), priority=True)
 
         music = None
-        if json_values:
+        if json_values and 'error' not in json_values:
             if media_type == 'album':
                 music = cls._parse_album_data(json_values)
             else:
@@ -64,7 +64,7 @@ class MusicLookup:
         track_list = []
 
         if json_values:
-            for track in json_values['data']:
+            for track in json_values.get('data', []):
                 track_list.append(cls._parse_track_data(track, json=True))
 
         return track_list
@@ -92,7 +92,7 @@ class MusicLookup:
 
         album_list = []
         if json_values:
-            for album in json_values['data']:
+            for album in json_values.get('data', []):
                 album_list.append(cls._parse_album_data(album))
         return album_list
 
@@ -112,7 +112,7 @@ class MusicLookup:
 
         track_list = []
         if json_values:
-            for track in json_values['data']:
+            for track in json_values.get('data', []):
                 track_list.append(cls._parse_track_data(track, json=True))
         return track_list
 
@@ -0,0 +1,260 @@
+import http.client
+import io
+import ssl
+import threading
+from collections import deque
+from urllib.error import HTTPError
+from urllib.parse import urljoin, urlsplit
+
+# Errors raised when a kept-alive connection was closed by the remote host
+# while it sat idle in the pool. The request is retried once on a fresh
+# connection when one of these is raised on a reused connection.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+_REDIRECT_CODES = (301, 302, 303, 307, 308)
+_MAX_REDIRECTS = 3
+
+
+class PoolTimeoutError(TimeoutError):
+    """Raised when no connection to a host frees up in time."""
+
+
+class _HostPool:
+    """Bounded set of keep-alive connections to a single scheme/host/port."""
+
+    def __init__(
+        self,
+        scheme: str,
+        host: str,
+        port: int | None,
+        maxsize: int,
+        ssl_context: ssl.SSLContext,
+    ) -> None:
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.name = f'{host}:{port}' if port else host
+        self.ssl_context = ssl_context
+        self.idle = deque()
+        self.slots = threading.BoundedSemaphore(maxsize)
+        self.lock = threading.Lock()
+        self.maxsize = maxsize
+        self.in_use = 0
+        self.stats = {
+            'requests': 0,
+            'connections_created': 0,
+            'connections_reused': 0,
+            'connections_discarded': 0,
+            'errors': 0,
+            'pool_timeouts': 0,
+        }
+
+    def new_connection(
+        self, connect_timeout: float, read_timeout: float
+    ) -> http.client.HTTPConnection:
+        """Opens a new connection, applying the read timeout once connected.
+
+        Args:
+            connect_timeout (float): Seconds to wait for TCP/TLS setup
+            read_timeout (float): Seconds to wait on each socket read
+
+        Returns:
+            http.client.HTTPConnection: The connected connection
+        """
+        if self.scheme == 'https':
+            conn = http.client.HTTPSConnection(
+                self.host,
+                self.port,
+                timeout=connect_timeout,
+                context=self.ssl_context,
+            )
+        else:
+            conn = http.client.HTTPConnection(
+                self.host, self.port, timeout=connect_timeout
+            )
+        conn.connect()
+        conn.sock.settimeout(read_timeout)
+        self.count('connections_created')
+        return conn
+
+    def count(self, stat: str, amount: int = 1) -> None:
+        """Increments one of the pool's counters."""
+        with self.lock:
+            self.stats[stat] += amount
+
+    def snapshot(self) -> dict:
+        """Returns a copy of the pool's counters and current usage."""
+        with self.lock:
+            return {
+                **self.stats,
+                'in_use': self.in_use,
+                'idle': len(self.idle),
+                'maxsize': self.maxsize,
+            }
+
+
+class ConnectionPool:
+    """Thread safe keep-alive HTTP(S) connection pool, bounded per host.
+
+    Connections are reused across requests to the same host, avoiding a
+    TCP and TLS handshake per lookup. At most ``maxsize`` connections are
+    open to any one host; callers wait up to ``block_timeout`` seconds for
+    one to free up before a PoolTimeoutError is raised.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10,
+        block_timeout: float = 5,
+    ) -> None:
+        self.maxsize = maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.block_timeout = block_timeout
+        self._ssl_context = ssl.create_default_context()
+        self._hosts: dict[tuple, _HostPool] = {}
+        self._lock = threading.Lock()
+
+    def _host_pool(self, scheme: str, host: str, port: int) -> _HostPool:
+        key = (scheme, host, port)
+        with self._lock:
+            pool = self._hosts.get(key)
+            if pool is None:
+                pool = _HostPool(
+                    scheme, host, port, self.maxsize, self._ssl_context
+                )
+                self._hosts[key] = pool
+        return pool
+
+    def request(
+        self, url: str, headers: dict | None = None
+    ) -> tuple[int, bytes]:
+        """Performs a GET request, following redirects.
+
+        Args:
+            url (str): url to open
+            headers (:obj:'dict', optional): Extra request headers
+
+        Raises:
+            HTTPError: The server answered with an error status
+            PoolTimeoutError: No connection to the host freed up in time
+
+        Returns:
+            tuple[int, bytes]: HTTP status code, response body
+        """
+        for _ in range(_MAX_REDIRECTS + 1):
+            status, body, location = self._request(url, headers or {})
+            if location is None:
+                return status, body
+            url = urljoin(url, location)
+        raise HTTPError(url, status, 'Too many redirects', None, None)
+
+    def _request(
+        self, url: str, headers: dict
+    ) -> tuple[int, bytes, str | None]:
+        parts = urlsplit(url)
+        pool = self._host_pool(parts.scheme, parts.hostname, parts.port)
+        path = parts.path or '/'
+        if parts.query:
+            path = f'{path}?{parts.query}'
+
+        if not pool.slots.acquire(timeout=self.block_timeout):
+            pool.count('pool_timeouts')
+            raise PoolTimeoutError(
+                f'No connection to {parts.hostname} available '
+                f'after {self.block_timeout}s.'
+            )
+        with pool.lock:
+            pool.in_use += 1
+            pool.stats['requests'] += 1
+        try:
+            response, body = self._send(pool, path, headers)
+        finally:
+            with pool.lock:
+                pool.in_use -= 1
+            pool.slots.release()
+
+        if response.status in _REDIRECT_CODES:
+            return response.status, body, response.getheader('Location')
+        if response.status >= 400:
+            raise HTTPError(
+                url,
+                response.status,
+                response.reason,
+                response.headers,
+                io.BytesIO(body),
+            )
+        return response.status, body, None
+
+    def _send(
+        self, pool: _HostPool, path: str, headers: dict
+    ) -> tuple[http.client.HTTPResponse, bytes]:
+        """Sends the request on an idle connection, or a new one if none.
+
+        A reused connection that turns out to have been closed by the
+        server is discarded and the request is retried on a new one.
+        """
+        try:
+            conn, reused = pool.idle.pop(), True
+        except IndexError:
+            conn, reused = None, False
+
+        while True:
+            try:
+                if conn is None:
+                    conn = pool.new_connection(
+                        self.connect_timeout, self.read_timeout
+                    )
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+                break
+            except _STALE_CONNECTION_ERRORS:
+                if conn is not None:
+                    conn.close()
+                if not reused:
+                    pool.count('errors')
+                    raise
+                pool.count('connections_discarded')
+                conn, reused = None, False
+            except Exception:
+                if conn is not None:
+                    conn.close()
+                pool.count('errors')
+                raise
+
+        if reused:
+            pool.count('connections_reused')
+        if response.will_close:
+            conn.close()
+        else:
+            pool.idle.append(conn)
+        return response, body
+
+    def stats(self) -> dict[str, dict]:
+        """Returns per host connection metrics.
+
+        Returns:
+            dict[str, dict]: Counters and usage keyed by host
+        """
+        with self._lock:
+            pools = list(self._hosts.values())
+        return {pool.name: pool.snapshot() for pool in pools}
+
+    def clear(self) -> None:
+        """Closes every idle connection held by the pool."""
+        with self._lock:
+            pools = list(self._hosts.values())
+        for pool in pools:
+            while pool.idle:
+                try:
+                    pool.idle.pop().close()
+                except IndexError:
+                    break
@@ -0,0 +1,262 @@
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+import redis
+
+# Takes a token from the provider's bucket, refilled at ARGV[2] tokens a
+# second up to ARGV[3], leaving at least ARGV[4] tokens in it, and counts
+# the call against the day's quota, kept under ARGV[1] followed by the UTC
+# date, unless ARGV[5] calls were made already. Times come from the Redis
+# server's clock, so that workers with skewed clocks agree on the buckets
+# and the day. Returns {allowed, milliseconds to wait, reason}.
+_ACQUIRE_SCRIPT = """
+local function date(days)
+    -- Civil date of a day count since 1970-01-01, Howard Hinnant's
+    -- days_from_civil inverse.
+    local z = days + 719468
+    local era = math.floor(z / 146097)
+    local doe = z - era * 146097
+    local yoe = math.floor((doe - math.floor(doe / 1460)
+        + math.floor(doe / 36524) - math.floor(doe / 146096)) / 365)
+    local doy = doe - (365 * yoe + math.floor(yoe / 4)
+        - math.floor(yoe / 100))
+    local mp = math.floor((5 * doy + 2) / 153)
+    local d = doy - math.floor((153 * mp + 2) / 5) + 1
+    local m = mp < 10 and mp + 3 or mp - 9
+    local y = yoe + era * 400 + (m <= 2 and 1 or 0)
+    return string.format('%04d-%02d-%02d', y, m, d)
+end
+
+local blocked = redis.call('pttl', KEYS[2])
+if blocked > 0 then
+    return {0, blocked, 'blocked'}
+end
+local time = redis.call('time')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local day = math.floor(now / 86400)
+local used = ARGV[1] .. date(day)
+local quota = tonumber(ARGV[5])
+if quota >= 0 and tonumber(redis.call('get', used) or '0') >= quota then
+    local reset = math.ceil(((day + 1) * 86400 - now) * 1000)
+    return {0, reset, 'quota_exhausted'}
+end
+local rate = tonumber(ARGV[2])
+if rate > 0 then
+    local burst, floor = tonumber(ARGV[3]), tonumber(ARGV[4])
+    local bucket = redis.call('hmget', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(bucket[1]) or burst
+    local updated = tonumber(bucket[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+    if tokens < floor + 1 then
+        local wait = math.ceil((floor + 1 - tokens) / rate * 1000)
+        return {0, wait, 'rate_limited'}
+    end
+    redis.call('hset', KEYS[1], 'tokens', tokens - 1, 'updated', now)
+    redis.call('expire', KEYS[1], math.ceil(burst / rate) + 1)
+end
+if quota >= 0 then
+    redis.call('incr', used)
+    redis.call('expire', used, 2 * 24 * 60 * 60)
+end
+return {1, 0, 'ok'}
+"""
+
+
+class RateLimitedError(Exception):
+    """Raised when a provider may not be called, because its rate limit
+    or daily quota is used up or because it throttled a previous call.
+    """
+
+    def __init__(self, provider: str, retry_after: Optional[float]) -> None:
+        super().__init__(f'{provider} is rate limited.')
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+def seconds_until_reset() -> float:
+    """Returns the seconds until daily quotas reset, at midnight UTC."""
+    now = datetime.now(timezone.utc)
+    midnight = datetime.combine(
+        now.date() + timedelta(days=1), datetime.min.time(), timezone.utc
+    )
+    return (midnight - now).total_seconds()
+
+
+def upstream_throttle(
+    status: int, headers: Any, data: Any, cooldown: float
+) -> Optional[float]:
+    """Recognizes a provider's response to going over its limits: HTTP 429,
+    OMDb's "Request limit reached!", Google's rate and daily limit errors
+    and Deezer's quota error.
+
+    Args:
+        status (int): HTTP status code
+        headers (Any): Response headers, None if not available
+        data (Any): Decoded response body, None if not json
+        cooldown (float): Seconds to wait when the provider does not say
+
+    Returns:
+        float | None: Seconds to wait before calling the provider again,
+            None if the response is not throttled
+    """
+    throttled, daily = status == 429, False
+    if isinstance(data, dict):
+        error = data.get('error')
+        if 'limit reached' in str(data.get('Error', '')).lower():  # OMDb
+            throttled = daily = True
+        elif isinstance(error, dict) and error.get('code') == 4:  # Deezer
+            throttled = True
+        elif isinstance(error, dict):  # Google
+            reasons = {e.get('reason') for e in error.get('errors', [])}
+            if reasons & {'rateLimitExceeded', 'userRateLimitExceeded'}:
+                throttled = True
+            if 'dailyLimitExceeded' in reasons:
+                throttled = daily = True
+    if not throttled:
+        return None
+
+    retry_after = headers.get('Retry-After') if headers else None
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return seconds_until_reset() if daily else cooldown
+
+
+class RateLimiter:
+    """Token bucket rate limits and daily quotas of the upstream
+    providers, kept in Redis so that every worker shares them.
+
+    Each provider's bucket holds up to ``burst`` calls and refills at
+    ``rate`` calls a second. Priority calls, the lookups by id that add a
+    request, may empty the bucket and use the whole daily quota, others
+    leave the ``reserve`` fraction of both for them. A provider that
+    throttles a call anyway is not called again until it says, or
+    ``cooldown`` seconds. Calls are let through when Redis is unavailable.
+    """
+
+    key_prefix = 'ratelimit'
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        limits: dict[str, dict],
+        reserve: float = 0.2,
+        max_wait: float = 1,
+        cooldown: float = 60,
+        enabled: bool = True,
+    ) -> None:
+        self.client = client
+        self.limits = limits
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.cooldown = cooldown
+        self.enabled = enabled
+        self._script = None
+        self._stats = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    def keys(self, provider: str) -> list[str]:
+        """Returns the provider's bucket and block keys."""
+        return [
+            f'{self.key_prefix}:{provider}:bucket',
+            f'{self.key_prefix}:{provider}:blocked',
+        ]
+
+    def day_prefix(self, provider: str) -> str:
+        """Returns the prefix of the provider's daily usage keys, which
+        end in the UTC date.
+        """
+        return f'{self.key_prefix}:{provider}:day:'
+
+    def acquire(self, provider: str, priority: bool = False) -> None:
+        """Takes a call from the provider's budget. Priority calls wait up
+        to ``max_wait`` seconds for the bucket to refill.
+
+        Args:
+            provider (str): Provider (upstream host) to call
+            priority (:obj:'bool', optional): Call adds a request
+
+        Raises:
+            RateLimitedError: The provider may not be called now
+        """
+        if not self.enabled:
+            return
+        limit = self.limits.get(provider, {})
+        rate, burst = limit.get('rate', 0), limit.get('burst', 0)
+        daily = limit.get('daily', 0)
+        floor, quota = 0, daily if daily else -1
+        if not priority:
+            floor = burst * self.reserve
+            quota = int(daily * (1 - self.reserve)) if daily else -1
+
+        if self._script is None:
+            self._script = self.client.register_script(_ACQUIRE_SCRIPT)
+        deadline = time.monotonic() + (self.max_wait if priority else 0)
+        while True:
+            try:
+                allowed, wait, reason = self._script(
+                    keys=self.keys(provider),
+                    args=[
+                        self.day_prefix(provider), rate, burst, floor, quota
+                    ],
+                )
+            except redis.RedisError:
+                self._count(provider, 'errors')
+                return
+            if allowed:
+                self._count(provider, 'allowed')
+                return
+
+            retry_after = wait / 1000
+            late = time.monotonic() + retry_after > deadline
+            if reason != 'rate_limited' or late:
+                self._count(provider, reason)
+                raise RateLimitedError(provider, retry_after)
+            self._count(provider, 'waits')
+            time.sleep(retry_after)
+
+    def check(
+        self, provider: str, status: int, headers: Any, data: Any
+    ) -> None:
+        """Stops calling a provider for a while if its response says it
+        throttled the call.
+
+        Args:
+            provider (str): Provider (upstream host) that was called
+            status (int): HTTP status code
+            headers (Any): Response headers, None if not available
+            data (Any): Decoded response body, None if not json
+
+        Raises:
+            RateLimitedError: The provider throttled the call
+        """
+        seconds = upstream_throttle(status, headers, data, self.cooldown)
+        if seconds is None:
+            return
+        self._count(provider, 'throttled')
+        if self.enabled:
+            try:
+                self.client.set(
+                    self.keys(provider)[1], '1', px=max(int(seconds * 1000), 1)
+                )
+            except redis.RedisError:
+                self._count(provider, 'errors')
+        raise RateLimitedError(provider, seconds)
+
+    def _count(self, provider: str, stat: str) -> None:
+        with self._lock:
+            self._stats[provider][stat] += 1
+
+    def stats(self) -> dict[str, dict]:
+        """Returns calls allowed, waited for and refused by provider.
+
+        Returns:
+            dict[str, dict]: Counters keyed by provider
+        """
+        with self._lock:
+            return {
+                provider: dict(counts)
+                for provider, counts in self._stats.items()
+            }
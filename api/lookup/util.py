@@ -1,19 +1,200 @@
 import json
 import re
-import urllib.request as ur
 from datetime import date
+from urllib.error import HTTPError
 
+from api.config import Config
+from api.db import redis_client
+from api.lookup.breaker import CircuitBreaker, CircuitOpenError
+from api.lookup.cache import LocalCache, ResponseCache
+from api.lookup.coalesce import SingleFlight
+from api.lookup.pool import ConnectionPool
+from api.lookup.ratelimit import RateLimitedError, RateLimiter
+from api.metrics import metrics
 
-def fetch_data(url: str) -> dict:
-    """Retrieves json data from given url
+_pool = ConnectionPool(
+    maxsize=Config.LOOKUP_POOL_SIZE,
+    connect_timeout=Config.LOOKUP_CONNECT_TIMEOUT,
+    read_timeout=Config.LOOKUP_READ_TIMEOUT,
+    block_timeout=Config.LOOKUP_POOL_TIMEOUT,
+)
+_local_cache = (
+    LocalCache(
+        max_bytes=Config.LOOKUP_LOCAL_CACHE_MAX_BYTES,
+        ttl=Config.LOOKUP_LOCAL_CACHE_TTL,
+    )
+    if Config.LOOKUP_LOCAL_CACHE_MAX_BYTES
+    else None
+)
+_cache = ResponseCache(
+    redis_client,
+    default_ttl=Config.LOOKUP_CACHE_TTL,
+    ttls=Config.LOOKUP_CACHE_TTLS,
+    negative_ttl=Config.LOOKUP_CACHE_NEGATIVE_TTL,
+    max_entry_size=Config.LOOKUP_CACHE_MAX_ENTRY_SIZE,
+    enabled=Config.LOOKUP_CACHE_ENABLED,
+    local=_local_cache,
+    stale_ttl=Config.LOOKUP_STALE_TTL,
+)
+_breaker = CircuitBreaker(
+    failures=Config.LOOKUP_BREAKER_FAILURES,
+    slow_call=Config.LOOKUP_BREAKER_SLOW_CALL,
+    open_seconds=Config.LOOKUP_BREAKER_OPEN_SECONDS,
+    enabled=Config.LOOKUP_BREAKER_ENABLED,
+)
+_limiter = RateLimiter(
+    redis_client,
+    Config.LOOKUP_RATE_LIMITS,
+    reserve=Config.LOOKUP_RATE_RESERVE,
+    max_wait=Config.LOOKUP_RATE_MAX_WAIT,
+    cooldown=Config.LOOKUP_RATE_COOLDOWN,
+    enabled=Config.LOOKUP_RATE_LIMIT_ENABLED,
+)
+_flights = SingleFlight(
+    redis_client if Config.LOOKUP_COALESCE_DISTRIBUTED else None,
+    lock_ttl=Config.LOOKUP_COALESCE_LOCK_TTL,
+    wait_timeout=Config.LOOKUP_COALESCE_WAIT,
+)
+
+
+def fetch_data(url: str, priority: bool = False) -> dict:
+    """Retrieves json data from given url, served from the response cache
+    when an identical request was made recently. Concurrent identical
+    requests share a single upstream call.
+
+    Args:
+        url (str): url to open
+        priority (:obj:'bool', optional): The lookup adds a request, it
+            may use the budget searches leave to lookups
+
+    Raises:
+        RateLimitedError: The provider may not be called now and the
+            response was never cached
+        CircuitOpenError: The provider is failing and the response was
+            never cached
+
+    Returns:
+        dict: json data from url
+    """
+    data = _cache.get(url)
+    if data is None:
+        data = _flights.do(
+            _cache.key(url),
+            lambda: _download(url, priority),
+            shared_result=lambda: _cache.get(url),
+        )
+    return data
+
+
+def _download(url: str, priority: bool) -> dict:
+    """Retrieves json data from the upstream api and caches it. While the
+    provider can't be called, because it is rate limited, its circuit is
+    open or it fails, the last cached response is served even if its TTL
+    is over.
+
+    Args:
+        url (str): url to open
+        priority (bool): The lookup adds a request
+
+    Returns:
+        dict: json data from url
+    """
+    try:
+        data = _call_provider(url, priority)
+    except (CircuitOpenError, RateLimitedError, OSError, ValueError):
+        data = _cache.get_stale(url)
+        if data is None:
+            raise
+        return data
+    _cache.set(url, data)
+    return data
+
+
+def _call_provider(url: str, priority: bool) -> dict:
+    """Calls the upstream api within its provider's rate limit and circuit
+    breaker.
 
     Args:
         url (str): url to open
+        priority (bool): The lookup adds a request
 
     Returns:
         dict: json data from url
     """
-    return json.loads(ur.urlopen(url).read())
+    provider = _cache.provider(url)
+    with _breaker.call(provider) as started:
+        _limiter.acquire(provider, priority)
+        started()
+        with metrics.timed(metrics.upstream, 'upstream', provider):
+            try:
+                _, body = _pool.request(
+                    url, headers={'Accept': 'application/json'}
+                )
+            except HTTPError as error:
+                try:
+                    data = json.loads(error.read())
+                except ValueError:
+                    data = None
+                _limiter.check(provider, error.code, error.headers, data)
+                raise
+        data = json.loads(body)
+        _limiter.check(provider, 200, None, data)
+    return data
+
+
+def connection_stats() -> dict[str, dict]:
+    """Retrieves connection metrics for each upstream host.
+
+    Returns:
+        dict[str, dict]: Request, connection and pool usage counts by host
+    """
+    return _pool.stats()
+
+
+def cache_stats() -> dict[str, dict]:
+    """Retrieves response cache counters for each upstream provider.
+
+    Returns:
+        dict[str, dict]: Cache hits, misses and stores by provider
+    """
+    return _cache.stats()
+
+
+def rate_limit_stats() -> dict[str, dict]:
+    """Retrieves rate limiter counters for each upstream provider.
+
+    Returns:
+        dict[str, dict]: Calls allowed, waited for and refused by provider
+    """
+    return _limiter.stats()
+
+
+def breaker_stats() -> dict[str, dict]:
+    """Retrieves circuit breaker state and counters for each provider.
+
+    Returns:
+        dict[str, dict]: Circuit state (0 closed, 1 half open, 2 open),
+            calls, failures and rejections by provider
+    """
+    return _breaker.stats()
+
+
+def local_cache_stats() -> dict:
+    """Retrieves usage and eviction counters of the in-process cache.
+
+    Returns:
+        dict: Hits, misses, evictions, expirations and memory usage
+    """
+    return _local_cache.stats() if _local_cache is not None else {}
+
+
+def coalesce_stats() -> dict:
+    """Retrieves request coalescing counters.
+
+    Returns:
+        dict: Calls led, coalesced in process and coalesced across workers
+    """
+    return _flights.stats()
 
 
 def sanitize(data: str) -> str:
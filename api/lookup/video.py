@@ -1,6 +1,6 @@
 import os
 
-from api.lookup.util import fetch_data
+from api.lookup.util import fetch_data, sanitize
 
 
 class VideoLookup:
@@ -23,14 +23,14 @@ class VideoLookup:
             list[dict]: Movies with given title and release year.
         """
         url = (
-            f'{cls.base_url}?s={title}&y={year}'
+            f'{cls.base_url}?s={sanitize(title)}&y={year}'
             f'&type={_type}&apikey={cls.api_key}'
         )
 
         json_values = fetch_data(url)
 
         videos = []
-        if json_values['Response'] == 'True':
+        if json_values.get('Response') == 'True':
             videos = json_values['Search']
         return videos
 
@@ -46,13 +46,14 @@ class VideoLookup:
             list[dict]: Movies/Shows with given title.
         """
         url = (
-            f'{cls.base_url}?s={title}&type={media_type}&apikey={cls.api_key}'
+            f'{cls.base_url}?s={sanitize(title)}&type={media_type}'
+            f'&apikey={cls.api_key}'
         )
 
         json_values = fetch_data(url)
 
         videos = []
-        if json_values['Response'] == 'True':
+        if json_values.get('Response') == 'True':
             videos = json_values['Search']
         return videos
 
@@ -68,12 +69,48 @@ class VideoLookup:
         """
         url = f'{cls.base_url}?i={imdb_id}&apikey={cls.api_key}'
 
-        json_values = fetch_data(url)
+        json_values = fetch_data(url, priority=True)
 
         video = None
-        if json_values['Response'] == 'True':
+        if json_values.get('Response') == 'True':
             video = {
                 'title': json_values['Title'],
                 'year': json_values['Year'],
             }
         return video
+
+
+class TVMazeLookup:
+    base_url = 'https://api.tvmaze.com'
+
+    @classmethod
+    def search_by_title(cls, title: str) -> list[dict]:
+        """Retrieves list of shows with the given title, in the same
+        format as VideoLookup's OMDb results.
+
+        Args:
+            title (str): show title to search for
+
+        Returns:
+            list[dict]: Shows with given title that have an imdb id.
+        """
+        url = f'{cls.base_url}/search/shows?q={sanitize(title)}'
+
+        json_values = fetch_data(url)
+
+        shows = []
+        for result in json_values:
+            show = result['show']
+            imdb_id = (show.get('externals') or {}).get('imdb')
+            if imdb_id:
+                premiered = show.get('premiered') or ''
+                shows.append(
+                    {
+                        'Title': show.get('name'),
+                        'Year': premiered[:4],
+                        'imdbID': imdb_id,
+                        'Type': 'series',
+                        'Poster': (show.get('image') or {}).get('medium'),
+                    }
+                )
+        return shows
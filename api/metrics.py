@@ -0,0 +1,303 @@
+"""Timing of requests and of the work done while handling them.
+
+Handler time, database queries and commits, Redis commands and upstream
+api calls are recorded in histograms, rendered in the Prometheus text
+format by GET /metrics. The time a request spent in each of them is also
+summed into spans, sent in a Server-Timing header when
+METRICS_SERVER_TIMING is set. Every worker process keeps its own metrics.
+
+Setting METRICS_ENABLED=0 installs none of the hooks.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from flask import Flask, Response, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from api.config import Config
+
+# Upper bounds in seconds
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1
+)
+STATEMENTS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE')
+
+
+def format_labels(names: tuple[str, ...], values: tuple) -> str:
+    """Formats label pairs as {name="value",...}, empty without labels."""
+    if not names:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value)
+            .replace('\\', '\\\\')
+            .replace('"', '\\"')
+            .replace('\n', '\\n'),
+        )
+        for name, value in zip(names, values)
+    )
+    return f'{{{pairs}}}'
+
+
+class Histogram:
+    """Thread safe histogram with fixed buckets, one series per distinct
+    combination of label values.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = REQUEST_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Records a value in the series of the given label values."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [
+                    [0] * (len(self.buckets) + 1), 0.0
+                ]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        """Returns the histogram's lines in the Prometheus text format."""
+        with self._lock:
+            series = [
+                (labels, list(counts), total)
+                for labels, (counts, total) in self._series.items()
+            ]
+        lines = [
+            f'# HELP {self.name} {self.description}',
+            f'# TYPE {self.name} histogram',
+        ]
+        names = (*self.labels, 'le')
+        for labels, counts, total in sorted(series):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                lines.append(
+                    f'{self.name}_bucket'
+                    f'{format_labels(names, (*labels, bound))} {cumulative}'
+                )
+            label_text = format_labels(self.labels, labels)
+            lines.append(f'{self.name}_sum{label_text} {total}')
+            lines.append(f'{self.name}_count{label_text} {cumulative}')
+        return lines
+
+
+class Metrics:
+    """The process' histograms and the spans of the current request."""
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.requests = Histogram(
+            'http_request_duration_seconds',
+            'Time spent handling requests.',
+            ('method', 'endpoint', 'status'),
+        )
+        self.queries = Histogram(
+            'db_query_duration_seconds',
+            'Time spent executing database statements.',
+            ('statement',),
+            QUERY_BUCKETS,
+        )
+        self.commits = Histogram(
+            'db_commit_duration_seconds',
+            'Time spent committing sessions, flushing pending changes '
+            'included.',
+            (),
+            QUERY_BUCKETS,
+        )
+        self.redis = Histogram(
+            'redis_command_duration_seconds',
+            'Time spent on Redis commands and pipelines.',
+            ('command',),
+            QUERY_BUCKETS,
+        )
+        self.upstream = Histogram(
+            'upstream_request_duration_seconds',
+            'Time spent on upstream api requests, redirects included.',
+            ('host',),
+        )
+        self._spans: ContextVar[Optional[list]] = ContextVar(
+            'spans', default=None
+        )
+
+    def record(
+        self, histogram: Histogram, span: str, seconds: float, *labels: str
+    ) -> None:
+        """Records a duration in a histogram and in the current request's
+        spans.
+
+        Args:
+            histogram (Histogram): Histogram to record the duration in
+            span (str): Span of the request the duration is added to
+            seconds (float): Duration
+            *labels (str): Label values of the histogram series
+        """
+        histogram.observe(seconds, *labels)
+        spans = self._spans.get()
+        if spans is not None:
+            spans.append((span, seconds))
+
+    @contextmanager
+    def timed(
+        self, histogram: Histogram, span: str, *labels: str
+    ) -> Iterator[None]:
+        """Records the duration of the with block, failed or not."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(
+                histogram, span, time.perf_counter() - start, *labels
+            )
+
+    def start_spans(self) -> None:
+        """Starts collecting the spans of a new request."""
+        g.metrics_spans = self._spans.set([])
+
+    def end_spans(self) -> dict[str, tuple[float, int]]:
+        """Stops collecting the current request's spans.
+
+        Returns:
+            dict[str, tuple[float, int]]: Total seconds and number of
+                operations by span
+        """
+        token = g.pop('metrics_spans', None)
+        spans = self._spans.get() or []
+        if token is not None:
+            self._spans.reset(token)
+        totals = {}
+        for span, seconds in spans:
+            total, count = totals.get(span, (0.0, 0))
+            totals[span] = (total + seconds, count + 1)
+        return totals
+
+    def render(self) -> list[str]:
+        """Returns every histogram in the Prometheus text format."""
+        lines = []
+        for histogram in (
+            self.requests,
+            self.queries,
+            self.commits,
+            self.redis,
+            self.upstream,
+        ):
+            lines.extend(histogram.render())
+        return lines
+
+
+metrics = Metrics(Config.METRICS_ENABLED)
+
+
+def _before_query(conn, cursor, statement, parameters, context, many):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_query(conn, cursor, statement, parameters, context, many):
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    verb = statement.lstrip()[:6].upper()
+    metrics.record(
+        metrics.queries,
+        'db',
+        time.perf_counter() - starts.pop(),
+        verb if verb in STATEMENTS else 'OTHER',
+    )
+
+
+def _failed_query(context) -> None:
+    conn = context.connection
+    if conn is not None and conn.info.get('query_start'):
+        conn.info['query_start'].pop()
+
+
+def _before_commit(session: Session) -> None:
+    session.info['commit_start'] = time.perf_counter()
+
+
+def _after_commit(session: Session) -> None:
+    start = session.info.pop('commit_start', None)
+    if start is not None:
+        metrics.record(metrics.commits, 'commit', time.perf_counter() - start)
+
+
+def _start_request() -> None:
+    g.metrics_start = time.perf_counter()
+    metrics.start_spans()
+
+
+def _finish_request(response: Response) -> Response:
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    metrics.requests.observe(
+        elapsed,
+        request.method,
+        request.endpoint or 'none',
+        str(response.status_code),
+    )
+    spans = metrics.end_spans()
+    if Config.METRICS_SERVER_TIMING:
+        response.headers['Server-Timing'] = ', '.join(
+            [
+                f'{span};desc="{count}x";dur={total * 1000:.1f}'
+                for span, (total, count) in spans.items()
+            ]
+            + [f'total;dur={elapsed * 1000:.1f}']
+        )
+    return response
+
+
+def _teardown_request(error: Optional[BaseException]) -> None:
+    # The request failed before its after_request functions ran.
+    if 'metrics_spans' in g:
+        metrics.end_spans()
+
+
+def initialize_metrics(app: Flask) -> None:
+    """Times the app's requests, and the database queries and commits of
+    every engine, unless METRICS_ENABLED is off. Redis commands and
+    upstream calls are timed by their clients.
+
+    Must be called before other after_request functions are registered,
+    so that the handler time includes them.
+
+    Args:
+        app (Flask): Flask application
+    """
+    if not metrics.enabled:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_query)
+    event.listen(Engine, 'after_cursor_execute', _after_query)
+    event.listen(Engine, 'handle_error', _failed_query)
+    event.listen(Session, 'before_commit', _before_commit)
+    event.listen(Session, 'after_commit', _after_commit)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_teardown_request)
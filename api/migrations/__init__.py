@@ -0,0 +1,164 @@
+"""Versioned schema migrations, applied once per deploy:
+
+    python -m api.migrations upgrade
+
+Each module in api/migrations/versions named ``NNNN_description.py``
+defines ``upgrade(conn)``. Migrations run in version order inside a
+transaction that also records the version in ``schema_migrations``.
+A migration with ``transactional = False`` (e.g. one building indexes
+with CREATE INDEX CONCURRENTLY) runs on an autocommit connection and
+must be safe to re-run if it fails part way.
+"""
+import importlib
+import pkgutil
+from datetime import datetime
+from types import ModuleType
+
+from sqlalchemy import (Column, DateTime, MetaData, String, Table, inspect,
+                        text)
+from sqlalchemy.engine import Connection, Engine
+
+from api.migrations import versions
+
+# Arbitrary key of the Postgres advisory lock held while migrating, so
+# that two deploys can not apply migrations at the same time.
+_LOCK_KEY = 7310533
+
+_metadata = MetaData()
+schema_migrations = Table(
+    'schema_migrations',
+    _metadata,
+    Column('version', String(32), primary_key=True),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+
+def available_migrations() -> list[tuple[str, ModuleType]]:
+    """Retrieves every migration module in version order.
+
+    Returns:
+        list[tuple[str, ModuleType]]: (version, module) pairs
+    """
+    migrations = []
+    for module_info in pkgutil.iter_modules(versions.__path__):
+        version = module_info.name.split('_', 1)[0]
+        module = importlib.import_module(
+            f'{versions.__name__}.{module_info.name}'
+        )
+        migrations.append((version, module))
+    return sorted(migrations, key=lambda migration: migration[0])
+
+
+def latest_version() -> str:
+    """Retrieves the version of the newest migration, i.e. of the schema
+    this code runs against once migrations are applied.
+
+    Returns:
+        str: Newest migration version
+    """
+    return available_migrations()[-1][0]
+
+
+def applied_versions(engine: Engine) -> set[str]:
+    """Retrieves the versions already applied to the database.
+
+    Args:
+        engine (Engine): Database to inspect
+
+    Returns:
+        set[str]: Applied migration versions
+    """
+    with engine.connect() as conn:
+        if not inspect(conn).has_table(schema_migrations.name):
+            return set()
+        return set(conn.execute(schema_migrations.select()).scalars())
+
+
+def upgrade(engine: Engine) -> list[str]:
+    """Applies every pending migration.
+
+    Args:
+        engine (Engine): Database to migrate
+
+    Returns:
+        list[str]: Versions that were applied
+    """
+    postgres = engine.dialect.name == 'postgresql'
+
+    # The lock connection autocommits, an open transaction on it would
+    # block concurrent index builds.
+    with engine.connect().execution_options(
+        isolation_level='AUTOCOMMIT'
+    ) as lock_conn:
+        if postgres:
+            lock_conn.execute(
+                text('SELECT pg_advisory_lock(:key)'), {'key': _LOCK_KEY}
+            )
+        try:
+            # Under the lock, concurrent runners would race to create it.
+            _metadata.create_all(engine)
+            applied = applied_versions(engine)
+            pending = [
+                (version, module)
+                for version, module in available_migrations()
+                if version not in applied
+            ]
+            for version, module in pending:
+                _apply(engine, version, module)
+        finally:
+            if postgres:
+                lock_conn.execute(
+                    text('SELECT pg_advisory_unlock(:key)'),
+                    {'key': _LOCK_KEY},
+                )
+    return [version for version, _ in pending]
+
+
+def _apply(engine: Engine, version: str, module: ModuleType) -> None:
+    """Runs a single migration and records it as applied."""
+    record = schema_migrations.insert().values(
+        version=version, applied_at=datetime.utcnow()
+    )
+    if getattr(module, 'transactional', True):
+        with engine.begin() as conn:
+            module.upgrade(conn)
+            conn.execute(record)
+    else:
+        with engine.connect() as conn:
+            module.upgrade(
+                conn.execution_options(isolation_level='AUTOCOMMIT')
+            )
+        with engine.begin() as conn:
+            conn.execute(record)
+
+
+def create_index(
+    conn: Connection,
+    name: str,
+    table: str,
+    columns: tuple[str, ...],
+    unique: bool = False,
+    using: str | None = None,
+) -> None:
+    """Creates an index if it does not exist. On Postgres the index is
+    built concurrently, without blocking writes, so the calling migration
+    must set ``transactional = False``.
+
+    Args:
+        conn (Connection): Migration connection
+        name (str): Index name
+        table (str): Table to index
+        columns (tuple[str, ...]): Indexed columns or expressions in order
+        unique (:obj:'bool', optional): Create a unique index
+        using (:obj:'str', optional): Index method, e.g. gin
+    """
+    concurrently = (
+        'CONCURRENTLY ' if conn.dialect.name == 'postgresql' else ''
+    )
+    method = f'USING {using} ' if using else ''
+    conn.execute(
+        text(
+            f'CREATE {"UNIQUE " if unique else ""}INDEX {concurrently}'
+            f'IF NOT EXISTS {name} ON {table} {method}({", ".join(columns)})'
+        )
+    )
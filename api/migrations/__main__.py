@@ -0,0 +1,48 @@
+import argparse
+import os
+
+from sqlalchemy import create_engine
+
+from api.config import Config
+from api.migrations import applied_versions, available_migrations, upgrade
+
+
+def database_url() -> str:
+    """Returns the configured database url, resolving a relative SQLite
+    path against the project root the same way Flask-SQLAlchemy does.
+    """
+    url = Config.SQLALCHEMY_DATABASE_URI
+    prefix = 'sqlite:///'
+    if url.startswith(prefix) and url != 'sqlite:///:memory:':
+        path = url[len(prefix):]
+        if not os.path.isabs(path):
+            root = os.path.dirname(
+                os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            )
+            url = prefix + os.path.join(root, path)
+    return url
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m api.migrations', description='Schema migrations.'
+    )
+    parser.add_argument(
+        'command', choices=('upgrade', 'status'), nargs='?', default='upgrade'
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(database_url())
+    if args.command == 'upgrade':
+        for version in upgrade(engine):
+            print(f'Applied migration {version}')
+        print('Database is up to date.')
+    else:
+        applied = applied_versions(engine)
+        for version, module in available_migrations():
+            state = 'applied' if version in applied else 'pending'
+            print(f'{version} {state:8} {module.__doc__.splitlines()[0]}')
+
+
+if __name__ == '__main__':
+    main()
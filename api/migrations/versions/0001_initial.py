@@ -0,0 +1,77 @@
+"""Creates the request and user tables.
+
+Tables that already exist (databases created by db.create_all before
+migrations were introduced) are left untouched.
+"""
+from sqlalchemy import (Column, Date, DateTime, ForeignKey, Integer, MetaData,
+                        String, Table)
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+Table(
+    'users',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('username', String(25)),
+    Column('password', String(50)),
+    Column('first_name', String(50)),
+    Column('last_name', String(50)),
+    Column('email', String(50)),
+    Column('user_type', String(25)),
+)
+
+Table(
+    'book_requests',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('title', String(80)),
+    Column('subtitle', String(80)),
+    Column('authors', String(80)),
+    Column('release_date', Date),
+    Column('isbn_13', String(80)),
+    Column('isbn_10', String(80)),
+    Column('book_format', String(80)),
+    Column('user_id', Integer, ForeignKey('users.id')),
+)
+
+Table(
+    'movie_requests',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('title', String(80)),
+    Column('year', Integer),
+    Column('imdb_id', String(80)),
+    Column('request_date', DateTime),
+    Column('user_id', Integer, ForeignKey('users.id')),
+)
+
+Table(
+    'show_requests',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('title', String(80)),
+    Column('year', String(80)),
+    Column('imdb_id', String(80)),
+    Column('request_date', DateTime),
+    Column('user_id', Integer, ForeignKey('users.id')),
+)
+
+Table(
+    'music',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('track', String(80)),
+    Column('release_date', Date),
+    Column('artist', String(80)),
+    Column('album', String(80)),
+    Column('deezer_id', Integer),
+    Column('music_type', String(80)),
+    Column('cover', String(160)),
+    Column('request_date', DateTime),
+    Column('user_id', Integer, ForeignKey('users.id')),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    metadata.create_all(conn, checkfirst=True)
@@ -0,0 +1,79 @@
+"""Indexes request lookup columns and enforces request uniqueness.
+
+The unique indexes fail to build if duplicate requests already exist,
+list them with e.g.
+
+    SELECT imdb_id, count(*) FROM movie_requests
+    GROUP BY imdb_id HAVING count(*) > 1;
+
+and remove the extra rows before migrating. On Postgres a failed
+concurrent build leaves an INVALID index behind that must be dropped
+before re-running.
+"""
+from sqlalchemy.engine import Connection
+
+from api.migrations import create_index
+
+transactional = False  # CREATE INDEX CONCURRENTLY
+
+INDEXES = (
+    ('ux_users_username', 'users', ('username',), True),
+    (
+        'ux_book_requests_isbn_13_format',
+        'book_requests',
+        ('isbn_13', 'book_format'),
+        True,
+    ),
+    (
+        'ux_book_requests_isbn_10_format',
+        'book_requests',
+        ('isbn_10', 'book_format'),
+        True,
+    ),
+    ('ix_book_requests_user_id_id', 'book_requests', ('user_id', 'id'), False),
+    (
+        'ix_book_requests_book_format_id',
+        'book_requests',
+        ('book_format', 'id'),
+        False,
+    ),
+    ('ux_movie_requests_imdb_id', 'movie_requests', ('imdb_id',), True),
+    (
+        'ix_movie_requests_user_id_request_date',
+        'movie_requests',
+        ('user_id', 'request_date', 'id'),
+        False,
+    ),
+    (
+        'ix_movie_requests_request_date',
+        'movie_requests',
+        ('request_date', 'id'),
+        False,
+    ),
+    ('ux_show_requests_imdb_id', 'show_requests', ('imdb_id',), True),
+    (
+        'ix_show_requests_user_id_request_date',
+        'show_requests',
+        ('user_id', 'request_date', 'id'),
+        False,
+    ),
+    (
+        'ix_show_requests_request_date',
+        'show_requests',
+        ('request_date', 'id'),
+        False,
+    ),
+    ('ux_music_deezer_id', 'music', ('deezer_id',), True),
+    (
+        'ix_music_user_id_request_date',
+        'music',
+        ('user_id', 'request_date', 'id'),
+        False,
+    ),
+    ('ix_music_request_date', 'music', ('request_date', 'id'), False),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    for name, table, columns, unique in INDEXES:
+        create_index(conn, name, table, columns, unique=unique)
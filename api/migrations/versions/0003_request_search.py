@@ -0,0 +1,95 @@
+"""Indexes the text of every request for search.
+
+Postgres gets, per request table, a GIN full text index and a pg_trgm
+trigram index on the same document expression, the searchable columns
+joined by spaces. SQLite, used in development, gets an FTS5 table kept in
+sync with the request tables by triggers. Its rowid packs the request id
+and the table, ``id * 4 + tag``.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from api.migrations import create_index
+
+transactional = False  # CREATE INDEX CONCURRENTLY
+
+# (table, searchable columns, rowid tag)
+DOCUMENTS = (
+    ('book_requests', ('title', 'subtitle', 'authors'), 0),
+    ('movie_requests', ('title',), 1),
+    ('music', ('track', 'artist', 'album'), 2),
+    ('show_requests', ('title',), 3),
+)
+
+
+def document(columns: tuple[str, ...], prefix: str = '') -> str:
+    return " || ' ' || ".join(
+        f"coalesce({prefix}{column}, '')" for column in columns
+    )
+
+
+def upgrade(conn: Connection) -> None:
+    if conn.dialect.name == 'postgresql':
+        upgrade_postgres(conn)
+    elif conn.dialect.name == 'sqlite':
+        upgrade_sqlite(conn)
+
+
+def upgrade_postgres(conn: Connection) -> None:
+    conn.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+    for table, columns, _ in DOCUMENTS:
+        create_index(
+            conn,
+            f'ix_{table}_search',
+            table,
+            (f"to_tsvector('simple', {document(columns)})",),
+            using='gin',
+        )
+        create_index(
+            conn,
+            f'ix_{table}_search_trgm',
+            table,
+            (f'({document(columns)}) gin_trgm_ops',),
+            using='gin',
+        )
+
+
+def upgrade_sqlite(conn: Connection) -> None:
+    conn.execute(
+        text(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS request_search USING fts5('
+            "document, user_id UNINDEXED, tokenize='unicode61 "
+            "remove_diacritics 2')"
+        )
+    )
+    for table, columns, tag in DOCUMENTS:
+        insert = (
+            'INSERT INTO request_search(rowid, document, user_id) '
+            f'VALUES (new.id * 4 + {tag}, {document(columns, "new.")}, '
+            'new.user_id);'
+        )
+        delete = (
+            f'DELETE FROM request_search WHERE rowid = old.id * 4 + {tag};'
+        )
+        for event, body in (
+            ('INSERT', insert),
+            ('UPDATE', delete + ' ' + insert),
+            ('DELETE', delete),
+        ):
+            conn.execute(
+                text(
+                    f'CREATE TRIGGER IF NOT EXISTS {table}_search_'
+                    f'{event.lower()} AFTER {event} ON {table} '
+                    f'BEGIN {body} END'
+                )
+            )
+
+    conn.execute(text('DELETE FROM request_search'))
+    for table, columns, tag in DOCUMENTS:
+        conn.execute(
+            text(
+                'INSERT INTO request_search(rowid, document, user_id) '
+                f'SELECT id * 4 + {tag}, {document(columns)}, user_id '
+                f'FROM {table}'
+            )
+        )
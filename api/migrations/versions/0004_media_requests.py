@@ -0,0 +1,181 @@
+"""Moves the book, movie, show and music requests into media_requests.
+
+Every request is copied into the single table with its media type, then
+the per media tables are dropped. Requests get new ids. Book requests had
+no request date, they are dated at the time of the migration. The search
+indexes of migration 0003 are rebuilt on the new table.
+"""
+from sqlalchemy import (Column, Date, DateTime, ForeignKey, Index, Integer,
+                        MetaData, String, Table, text)
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+Table('users', metadata, Column('id', Integer, primary_key=True))
+
+media_requests = Table(
+    'media_requests',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('media_type', String(10), nullable=False),
+    Column('request_date', DateTime),
+    Column('title', String(80)),
+    Column('subtitle', String(80)),
+    Column('authors', String(80)),
+    Column('isbn_13', String(80)),
+    Column('isbn_10', String(80)),
+    Column('book_format', String(80)),
+    Column('release_date', Date),
+    Column('year', String(80)),
+    Column('imdb_id', String(80)),
+    Column('track', String(80)),
+    Column('artist', String(80)),
+    Column('album', String(80)),
+    Column('deezer_id', Integer),
+    Column('music_type', String(80)),
+    Column('cover', String(160)),
+    Column('user_id', Integer, ForeignKey('users.id')),
+    Index(
+        'ix_media_requests_user_id_request_date',
+        'user_id',
+        'request_date',
+        'id',
+    ),
+    Index('ix_media_requests_request_date', 'request_date', 'id'),
+    Index(
+        'ix_media_requests_type_user_id_request_date',
+        'media_type',
+        'user_id',
+        'request_date',
+        'id',
+    ),
+    Index(
+        'ix_media_requests_type_request_date',
+        'media_type',
+        'request_date',
+        'id',
+    ),
+    Index(
+        'ux_media_requests_isbn_13_format',
+        'media_type',
+        'isbn_13',
+        'book_format',
+        unique=True,
+    ),
+    Index(
+        'ux_media_requests_isbn_10_format',
+        'media_type',
+        'isbn_10',
+        'book_format',
+        unique=True,
+    ),
+    Index('ux_media_requests_imdb_id', 'media_type', 'imdb_id', unique=True),
+    Index(
+        'ux_media_requests_deezer_id', 'media_type', 'deezer_id', unique=True
+    ),
+)
+
+# (old table, media type, columns copied, their source expressions)
+COPIES = (
+    (
+        'book_requests',
+        'book',
+        ('title', 'subtitle', 'authors', 'release_date', 'isbn_13',
+         'isbn_10', 'book_format', 'user_id', 'request_date'),
+        ('title', 'subtitle', 'authors', 'release_date', 'isbn_13',
+         'isbn_10', 'book_format', 'user_id', 'CURRENT_TIMESTAMP'),
+    ),
+    (
+        'movie_requests',
+        'movie',
+        ('title', 'year', 'imdb_id', 'user_id', 'request_date'),
+        ('title', 'CAST(year AS VARCHAR(80))', 'imdb_id', 'user_id',
+         'request_date'),
+    ),
+    (
+        'show_requests',
+        'show',
+        ('title', 'year', 'imdb_id', 'user_id', 'request_date'),
+        ('title', 'year', 'imdb_id', 'user_id', 'request_date'),
+    ),
+    (
+        'music',
+        'music',
+        ('track', 'release_date', 'artist', 'album', 'deezer_id',
+         'music_type', 'cover', 'user_id', 'request_date'),
+        ('track', 'release_date', 'artist', 'album', 'deezer_id',
+         'music_type', 'cover', 'user_id', 'request_date'),
+    ),
+)
+
+SEARCH_COLUMNS = ('title', 'subtitle', 'authors', 'track', 'artist', 'album')
+
+
+def document(prefix: str = '') -> str:
+    return " || ' ' || ".join(
+        f"coalesce({prefix}{column}, '')" for column in SEARCH_COLUMNS
+    )
+
+
+def upgrade(conn: Connection) -> None:
+    media_requests.create(conn)
+    for table, media_type, columns, sources in COPIES:
+        conn.execute(
+            text(
+                'INSERT INTO media_requests '
+                f'(media_type, {", ".join(columns)}) '
+                f"SELECT '{media_type}', {', '.join(sources)} FROM {table} "
+                'ORDER BY id'
+            )
+        )
+    for table, _, _, _ in COPIES:
+        conn.execute(text(f'DROP TABLE {table}'))
+
+    if conn.dialect.name == 'postgresql':
+        conn.execute(
+            text(
+                'CREATE INDEX ix_media_requests_search ON media_requests '
+                f"USING gin (to_tsvector('simple', {document()}))"
+            )
+        )
+        conn.execute(
+            text(
+                'CREATE INDEX ix_media_requests_search_trgm ON media_requests '
+                f'USING gin (({document()}) gin_trgm_ops)'
+            )
+        )
+    elif conn.dialect.name == 'sqlite':
+        upgrade_sqlite_search(conn)
+
+
+def upgrade_sqlite_search(conn: Connection) -> None:
+    conn.execute(text('DROP TABLE IF EXISTS request_search'))
+    conn.execute(
+        text(
+            'CREATE VIRTUAL TABLE request_search USING fts5(document, '
+            "media_type UNINDEXED, user_id UNINDEXED, tokenize='unicode61 "
+            "remove_diacritics 2')"
+        )
+    )
+    insert = (
+        'INSERT INTO request_search(rowid, document, media_type, user_id) '
+        f'VALUES (new.id, {document("new.")}, new.media_type, new.user_id);'
+    )
+    delete = 'DELETE FROM request_search WHERE rowid = old.id;'
+    for event, body in (
+        ('INSERT', insert),
+        ('UPDATE', delete + ' ' + insert),
+        ('DELETE', delete),
+    ):
+        conn.execute(
+            text(
+                f'CREATE TRIGGER media_requests_search_{event.lower()} '
+                f'AFTER {event} ON media_requests BEGIN {body} END'
+            )
+        )
+    conn.execute(
+        text(
+            'INSERT INTO request_search(rowid, document, media_type, user_id) '
+            f'SELECT id, {document()}, media_type, user_id FROM media_requests'
+        )
+    )
@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from flask_sqlalchemy import BaseQuery
+from sqlalchemy.exc import IntegrityError
+
+from api.autocomplete import suggestion_index
+from api.db import db
+from api.models.pagination import paginate
+from api.versions import change_versions
+
+MEDIA_TYPES = ('book', 'movie', 'music', 'show')
+
+
+class MediaRequestModel(db.Model):
+    """A request for any media type, stored in a single table.
+
+    Each media type is a subclass told apart by ``media_type``, so one
+    query can page through every request of a user while the subclasses
+    keep their own constructors, lookups and serialization. Columns that
+    do not apply to a media type are left empty.
+    """
+
+    __tablename__ = 'media_requests'
+    __table_args__ = (
+        db.Index(
+            'ix_media_requests_user_id_request_date',
+            'user_id',
+            'request_date',
+            'id',
+        ),
+        db.Index('ix_media_requests_request_date', 'request_date', 'id'),
+        db.Index(
+            'ix_media_requests_type_user_id_request_date',
+            'media_type',
+            'user_id',
+            'request_date',
+            'id',
+        ),
+        db.Index(
+            'ix_media_requests_type_request_date',
+            'media_type',
+            'request_date',
+            'id',
+        ),
+        # find_by_isbn matches either isbn for a format, a book request is
+        # unique per isbn and format.
+        db.Index(
+            'ux_media_requests_isbn_13_format',
+            'media_type',
+            'isbn_13',
+            'book_format',
+            unique=True,
+        ),
+        db.Index(
+            'ux_media_requests_isbn_10_format',
+            'media_type',
+            'isbn_10',
+            'book_format',
+            unique=True,
+        ),
+        db.Index(
+            'ux_media_requests_imdb_id', 'media_type', 'imdb_id', unique=True
+        ),
+        db.Index(
+            'ux_media_requests_deezer_id',
+            'media_type',
+            'deezer_id',
+            unique=True,
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    media_type = db.Column(db.String(10), nullable=False)
+    request_date = db.Column(db.DateTime)
+
+    # Books, movies and shows
+    title = db.Column(db.String(80))
+    # Books
+    subtitle = db.Column(db.String(80))
+    authors = db.Column(db.String(80))
+    isbn_13 = db.Column(db.String(80))
+    isbn_10 = db.Column(db.String(80))
+    book_format = db.Column(db.String(80))
+    # Books and music
+    release_date = db.Column(db.Date)
+    # Movies and shows
+    year = db.Column(db.String(80))
+    imdb_id = db.Column(db.String(80))
+    # Music
+    track = db.Column(db.String(80))
+    artist = db.Column(db.String(80))
+    album = db.Column(db.String(80))
+    deezer_id = db.Column(db.Integer)
+    music_type = db.Column(db.String(80))
+    cover = db.Column(db.String(160))
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    users = db.relationship('UserModel')
+
+    __mapper_args__ = {'polymorphic_on': media_type}
+
+    # (json key, column, conversion or None) of each field json() returns,
+    # in order. Declared by each media type.
+    json_fields: tuple[tuple[str, str, Callable | None], ...] = ()
+
+    def json(self) -> dict:
+        """Returns the database entry as a json formatted dictionary.
+
+        Returns:
+            dict: request's details in json format
+        """
+        request = {}
+        for key, name, convert in self.json_fields:
+            value = getattr(self, name)
+            request[key] = convert(value) if convert else value
+        return request
+
+    @classmethod
+    def row_formatter(cls, names: list[str]) -> Callable[[tuple], dict]:
+        """Builds a function formatting rows of selected columns like json(),
+        reading the columns by position rather than by name.
+
+        Args:
+            names (list[str]): Names of the row's columns, in order
+
+        Returns:
+            Callable[[tuple], dict]: Formats a row as json
+        """
+        fields = [
+            (key, names.index(name), convert)
+            for key, name, convert in cls.json_fields
+        ]
+
+        def row_json(row: tuple) -> dict:
+            return {
+                key: convert(row[i]) if convert else row[i]
+                for key, i, convert in fields
+            }
+
+        return row_json
+
+    @classmethod
+    def find_all(cls) -> list[MediaRequestModel]:
+        """Retrieves all the requests of this media type.
+
+        Returns:
+            list: All requests.
+        """
+        return cls.query.all()
+
+    @classmethod
+    def find_all_by_user(cls, user_id: int) -> list[MediaRequestModel]:
+        """Retrieves all requests of this media type by the given user.
+
+        Args:
+            user_id (int): User's id to query with.
+
+        Returns:
+            list: user's requests.
+        """
+        return cls.query.filter_by(user_id=user_id).all()
+
+    @classmethod
+    def find_page(
+        cls,
+        limit: int,
+        cursor: Optional[str] = None,
+        user_id: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        **filters: Any,
+    ) -> tuple[list[MediaRequestModel], str | None]:
+        """Retrieves a page of requests of this media type, newest first.
+        Called on MediaRequestModel it pages through every media type.
+
+        Args:
+            limit (int): Maximum requests in the page
+            cursor (:obj:'str', optional): Cursor from the previous page
+            user_id (:obj:'int', optional): Only the given user's requests
+            date_from (:obj:'datetime', optional): Requested on or after
+            date_to (:obj:'datetime', optional): Requested before
+            **filters: Column values to match, e.g. book_format, empty
+                values are ignored
+
+        Raises:
+            ValueError: The cursor is malformed
+
+        Returns:
+            tuple[list, str | None]: Requests, next page's cursor
+        """
+        query = cls._filter(user_id, date_from, date_to, **filters)
+        return paginate(query, (cls.request_date, cls.id), limit, cursor)
+
+    @classmethod
+    def find_page_json(
+        cls,
+        limit: int,
+        cursor: Optional[str] = None,
+        user_id: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        **filters: Any,
+    ) -> tuple[list[dict], str | None]:
+        """Retrieves the same page as find_page already in json format.
+        Only the serialized columns are selected and no model instances
+        are built, which makes large pages several times cheaper. Called on
+        MediaRequestModel each request also has its media_type.
+
+        Args:
+            limit (int): Maximum requests in the page
+            cursor (:obj:'str', optional): Cursor from the previous page
+            user_id (:obj:'int', optional): Only the given user's requests
+            date_from (:obj:'datetime', optional): Requested on or after
+            date_to (:obj:'datetime', optional): Requested before
+            **filters: Column values to match, e.g. book_format, empty
+                values are ignored
+
+        Raises:
+            ValueError: The cursor is malformed
+
+        Returns:
+            tuple[list[dict], str | None]: Requests in json format, next
+                page's cursor
+        """
+        # The media types the query can return, one when called on a
+        # subclass, every one on MediaRequestModel.
+        models = {
+            mapper.polymorphic_identity: mapper.class_
+            for mapper in cls.__mapper__.self_and_descendants
+            if mapper.polymorphic_identity is not None
+        }
+        names = list(
+            dict.fromkeys(
+                ('media_type', 'request_date', 'id')
+                + tuple(
+                    name
+                    for model in models.values()
+                    for _, name, _ in model.json_fields
+                )
+            )
+        )
+        query = cls._filter(user_id, date_from, date_to, **filters)
+        rows, next_cursor = paginate(
+            query.with_entities(*(getattr(cls, name) for name in names)),
+            (cls.request_date, cls.id),
+            limit,
+            cursor,
+        )
+
+        if cls.__mapper__.polymorphic_identity is not None:
+            row_json = cls.row_formatter(names)
+            return [row_json(row) for row in rows], next_cursor
+
+        formatters = {
+            media_type: model.row_formatter(names)
+            for media_type, model in models.items()
+        }
+        requests = []
+        for row in rows:
+            request = {'media_type': row[0]}
+            request.update(formatters[row[0]](row))
+            requests.append(request)
+        return requests, next_cursor
+
+    @classmethod
+    def _filter(
+        cls,
+        user_id: Optional[int],
+        date_from: Optional[datetime],
+        date_to: Optional[datetime],
+        **filters: Any,
+    ) -> BaseQuery:
+        query = cls.query
+        if user_id is not None:
+            query = query.filter_by(user_id=user_id)
+        for name, value in filters.items():
+            if value:
+                query = query.filter(getattr(cls, name) == value)
+        if date_from:
+            query = query.filter(cls.request_date >= date_from)
+        if date_to:
+            query = query.filter(cls.request_date < date_to)
+        return query
+
+    def save_to_db(self) -> None:
+        """Writes the entry to the database.
+
+        Raises:
+            IntegrityError: A request for the same media already exists.
+        """
+        # Read before the commit expires them.
+        media_type, user_id = self.media_type, self.user_id
+        suggestions = suggestion_index.request_values([self])
+        db.session.add(self)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            raise
+        change_versions.bump(media_type, user_id)
+        suggestion_index.add_request_values(suggestions)
+
+    def delete_from_db(self) -> None:
+        """Removes the entry from the database."""
+        media_type, user_id = self.media_type, self.user_id
+        db.session.delete(self)
+        db.session.commit()
+        change_versions.bump(media_type, user_id)
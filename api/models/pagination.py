@@ -0,0 +1,109 @@
+import base64
+import json
+from datetime import date, datetime
+
+from flask_sqlalchemy import BaseQuery
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(values: tuple) -> str:
+    """Encodes the sort key of the last row of a page into a cursor.
+
+    Args:
+        values (tuple): Sort column values of the row
+
+    Returns:
+        str: url safe cursor
+    """
+    data = json.dumps(
+        [
+            value.isoformat() if isinstance(value, (date, datetime)) else value
+            for value in values
+        ]
+    )
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor: str, columns: tuple) -> list:
+    """Decodes a cursor back into the sort key values.
+
+    Args:
+        cursor (str): Cursor from a previous page
+        columns (tuple): Sort columns the cursor was built from
+
+    Raises:
+        ValueError: The cursor is malformed
+
+    Returns:
+        list: Sort column values
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as error:
+        raise ValueError('Invalid cursor.') from error
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError('Invalid cursor.')
+
+    decoded = []
+    for column, value in zip(columns, values):
+        python_type = column.type.python_type
+        # Dates are encoded as iso strings, bool is a subclass of int.
+        json_type = str if python_type in (date, datetime) else python_type
+        if not isinstance(value, json_type) or isinstance(value, bool):
+            raise ValueError('Invalid cursor.')
+        if json_type is not python_type:
+            try:
+                value = python_type.fromisoformat(value)
+            except ValueError as error:
+                raise ValueError('Invalid cursor.') from error
+        decoded.append(value)
+    return decoded
+
+
+def paginate(
+    query: BaseQuery, columns: tuple, limit: int, cursor: str | None = None
+) -> tuple[list, str | None]:
+    """Retrieves a page of the query using keyset pagination.
+
+    Rows are ordered newest first by the given columns, the last of which
+    must be unique (the primary key). Rather than an OFFSET, each page
+    starts after the sort key in the cursor, so every page costs the same
+    however deep into the table it is.
+
+    Args:
+        query (BaseQuery): Filtered query to page through
+        columns (tuple): Sort columns, ending with the primary key
+        limit (int): Maximum rows in the page
+        cursor (:obj:'str', optional): Cursor returned with the previous page
+
+    Raises:
+        ValueError: The cursor is malformed
+
+    Returns:
+        tuple[list, str | None]: The page's rows, cursor for the next page
+            or None if this is the last page
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        # (a, b) < (x, y) spelled out as a < x or (a = x and b < y)
+        conditions = []
+        for i, column in enumerate(columns):
+            equal = [columns[j] == values[j] for j in range(i)]
+            conditions.append(and_(*equal, column < values[i]))
+        query = query.filter(or_(*conditions))
+
+    rows = (
+        query.order_by(*(column.desc() for column in columns))
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            tuple(getattr(last, column.key) for column in columns)
+        )
+    return rows, next_cursor
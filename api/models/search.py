@@ -0,0 +1,138 @@
+import re
+
+from sqlalchemy import Integer, bindparam, column, text
+
+from api.db import db
+from api.models.media import MediaRequestModel
+from api.models.pagination import decode_cursor, encode_cursor
+
+# Must match the document expression indexed by migration 0004.
+SEARCH_COLUMNS = ('title', 'subtitle', 'authors', 'track', 'artist', 'album')
+DOCUMENT = " || ' ' || ".join(
+    f"coalesce({name}, '')" for name in SEARCH_COLUMNS
+)
+
+_OFFSET = (column('offset', Integer),)
+
+
+def _postgres_matches(
+    query: str,
+    media_types: list[str],
+    user_id: int | None,
+    limit: int,
+    offset: int,
+) -> list[tuple[int, float]]:
+    """Ranks full text matches, falling back to trigram word similarity
+    so that misspelt and partial words still match.
+    """
+    vector = f"to_tsvector('simple', {DOCUMENT})"
+    tsquery = "websearch_to_tsquery('simple', :query)"
+    user = ' AND user_id = :user_id' if user_id is not None else ''
+    rows = db.session.execute(
+        text(
+            f'SELECT id, ts_rank({vector}, {tsquery}) '
+            f'+ word_similarity(:query, {DOCUMENT}) AS score '
+            'FROM media_requests '
+            f'WHERE ({vector} @@ {tsquery} OR :query <% ({DOCUMENT})) '
+            f'AND media_type IN :media_types{user} '
+            'ORDER BY score DESC, id LIMIT :limit OFFSET :offset'
+        ).bindparams(bindparam('media_types', expanding=True)),
+        {
+            'query': query,
+            'media_types': media_types,
+            'user_id': user_id,
+            'limit': limit,
+            'offset': offset,
+        },
+    )
+    return [(id_, score) for id_, score in rows]
+
+
+def _sqlite_matches(
+    query: str,
+    media_types: list[str],
+    user_id: int | None,
+    limit: int,
+    offset: int,
+) -> list[tuple[int, float]]:
+    """Ranks prefix matches of every query word with FTS5's bm25."""
+    words = re.findall(r'\w+', query)
+    if not words:
+        return []
+    match = ' '.join(f'"{word}"*' for word in words)
+    user = ' AND user_id = :user_id' if user_id is not None else ''
+    rows = db.session.execute(
+        text(
+            'SELECT rowid, bm25(request_search) AS rank FROM request_search '
+            'WHERE request_search MATCH :match '
+            f'AND media_type IN :media_types{user} '
+            'ORDER BY rank, rowid LIMIT :limit OFFSET :offset'
+        ).bindparams(bindparam('media_types', expanding=True)),
+        {
+            'match': match,
+            'media_types': media_types,
+            'user_id': user_id,
+            'limit': limit,
+            'offset': offset,
+        },
+    )
+    return [(rowid, -rank) for rowid, rank in rows]
+
+
+def search_requests(
+    query: str,
+    media_types: list[str],
+    limit: int,
+    cursor: str | None = None,
+    user_id: int | None = None,
+) -> tuple[list[dict], str | None]:
+    """Searches the requests' titles, authors, artists and albums.
+
+    Args:
+        query (str): Words to search for
+        media_types (list[str]): Media types to search
+        limit (int): Maximum results in the page
+        cursor (:obj:'str', optional): Cursor returned with the previous page
+        user_id (:obj:'int', optional): Only search this user's requests
+
+    Raises:
+        ValueError: The cursor is malformed
+
+    Returns:
+        tuple[list[dict], str | None]: Matching requests best first, each
+            with its media type and score, cursor for the next page or
+            None if this is the last page
+    """
+    offset = 0
+    if cursor:
+        offset = decode_cursor(cursor, _OFFSET)[0]
+        if offset < 0:
+            raise ValueError('Invalid cursor.')
+
+    if db.engine.dialect.name == 'postgresql':
+        find = _postgres_matches
+    else:
+        find = _sqlite_matches
+    matches = find(query, media_types, user_id, limit + 1, offset)
+
+    next_cursor = None
+    if len(matches) > limit:
+        matches = matches[:limit]
+        next_cursor = encode_cursor((offset + limit,))
+
+    requests = {
+        request.id: request
+        for request in MediaRequestModel.query.filter(
+            MediaRequestModel.id.in_([id_ for id_, _ in matches])
+        )
+    }
+    results = [
+        {
+            'media_type': requests[id_].media_type,
+            'score': score,
+            'request': requests[id_].json(),
+        }
+        for id_, score in matches
+        if id_ in requests
+    ]
+    return results, next_cursor
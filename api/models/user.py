@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+from sqlalchemy.exc import IntegrityError
+
 from api.db import db
 
 
 class UserModel(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (db.Index('ux_users_username', 'username', unique=True),)
 
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(25))
@@ -44,9 +47,17 @@ class UserModel(db.Model):
         }
 
     def save_to_db(self) -> None:
-        """Writes the entry to the database."""
+        """Writes the entry to the database.
+
+        Raises:
+            IntegrityError: A user with the same username already exists.
+        """
         db.session.add(self)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            raise
 
     def delete_from_db(self) -> None:
         """Removes the entry from the database."""
@@ -0,0 +1,37 @@
+from typing import Optional
+
+from flask import Response, current_app, make_response
+from flask_restful.representations.json import output_json as stdlib_json
+
+try:
+    import orjson
+except ImportError:  # optional, responses fall back to the json module
+    orjson = None
+
+
+def output_json(
+    data: object, code: int, headers: Optional[dict] = None
+) -> Response:
+    """Serializes a resource's response with the configured JSON encoder.
+
+    orjson encodes large lists of requests several times faster than the
+    standard library's json module. It is used when installed and
+    JSON_ENCODER is 'orjson', otherwise flask-restful's own encoder is.
+
+    Args:
+        data (object): Response body
+        code (int): HTTP status code
+        headers (:obj:'dict', optional): Extra response headers
+
+    Returns:
+        Response: The encoded response
+    """
+    if orjson is None or current_app.config['JSON_ENCODER'] != 'orjson':
+        return stdlib_json(data, code, headers)
+
+    option = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+    if current_app.debug:
+        option |= orjson.OPT_INDENT_2
+    response = make_response(orjson.dumps(data, option=option), code)
+    response.headers.extend(headers or {})
+    return response
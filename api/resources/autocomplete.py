@@ -0,0 +1,96 @@
+from typing import Optional, Tuple
+
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from flask_restful import Resource, reqparse
+from jwt import PyJWTError
+
+from api.autocomplete import suggestion_index
+from api.config import Config
+from api.models.media import MEDIA_TYPES
+
+
+def suggestion_limit(value: str) -> int:
+    """Parses and bounds the number of suggestions.
+
+    Args:
+        value (str): Requested number of suggestions
+
+    Raises:
+        ValueError: The number is not a positive integer
+
+    Returns:
+        int: Number of suggestions, capped at Config.AUTOCOMPLETE_MAX_LIMIT
+    """
+    limit = int(value)
+    if limit < 1:
+        raise ValueError('limit must be a positive integer.')
+    return min(limit, Config.AUTOCOMPLETE_MAX_LIMIT)
+
+
+def optional_identity() -> Optional[str]:
+    """Returns the identity of the request's access token, None when it has
+    none or an expired, revoked or malformed one.
+
+    Returns:
+        str | None: Identity of the logged in user
+    """
+    try:
+        if verify_jwt_in_request(optional=True):
+            return str(get_jwt_identity())
+    except (JWTExtendedException, PyJWTError):
+        pass
+    return None
+
+
+class Autocomplete(Resource):
+    parser = reqparse.RequestParser()
+    parser.add_argument(
+        'q',
+        type=str,
+        required=True,
+        location='args',
+        help='Search query required.',
+    )
+    parser.add_argument(
+        'media',
+        type=str,
+        location='args',
+        action='append',
+        choices=MEDIA_TYPES,
+        help='Media type to suggest, repeat for several.',
+    )
+    parser.add_argument(
+        'limit',
+        type=suggestion_limit,
+        default=10,
+        location='args',
+        help='Number of suggestions, a positive integer.',
+    )
+
+    def get(self) -> Tuple[dict, int, dict]:
+        """GET HTTP method, Suggests titles, authors, artists and albums
+        starting with the typed text, most popular first. For logged in
+        users, prefixes with too few suggestions are filled from the
+        lookups in the background.
+
+        Returns:
+            Tuple[dict, int, dict]: Suggestions, HTTP status code, headers
+        """
+        data = Autocomplete.parser.parse_args()
+        media_types = list(dict.fromkeys(data.get('media') or MEDIA_TYPES))
+
+        suggestions = suggestion_index.suggest(
+            media_types, data['q'], data['limit']
+        )
+        if len(suggestions) < data['limit']:
+            user = optional_identity()
+            if user is not None:
+                suggestion_index.refill(media_types, data['q'], user)
+
+        cache_control = f'public, max-age={Config.AUTOCOMPLETE_MAX_AGE}'
+        return (
+            {'suggestions': suggestions},
+            200,
+            {'Cache-Control': cache_control},
+        )
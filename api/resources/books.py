@@ -2,10 +2,23 @@ from typing import Tuple
 
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from flask_restful import Resource, abort, reqparse
+from sqlalchemy.exc import IntegrityError
 
+from api.autocomplete import suggestion_index
+from api.db import release_connection
+from api.lookup.aggregate import search_books
 from api.lookup.books import BookLookup
 from api.models.books import BookRequestModel
-from api.models.user import UserLevels, UserModel
+from api.resources.util import (
+    LIST_CACHE_CONTROL,
+    cache_headers,
+    cacheable,
+    can_modify,
+    is_admin,
+    list_etag,
+    not_modified,
+    page_parser,
+)
 
 
 class BookRequest(Resource):
@@ -25,11 +38,12 @@ class BookRequest(Resource):
         help='Desired Media Format Required - [ebook, audiobook]',
     )
 
+    @cacheable
     def get(self) -> Tuple[dict, int]:
         """GET HTTP method, Queries books based on given arguments.
 
         Search Types:
-            title - Searches for book based on title.
+            title - Searches every book provider based on title.
             title and year - Searches for book based title with year filter.
             author - Searches for books based on book's author
 
@@ -49,10 +63,11 @@ class BookRequest(Resource):
         if title and year:
             books = BookLookup.search_by_title_year(title, year)
         elif title:
-            books = BookLookup.search_by_title(title)
+            books = search_books(title)
         else:
             books = BookLookup.search_by_author(author)
 
+        suggestion_index.add_results('book', title or author, books)
         return {'books': books}, 200
 
     @jwt_required()
@@ -74,6 +89,7 @@ class BookRequest(Resource):
                 f'isbn {isbn} already exists.',
             )
 
+        release_connection()
         lookup = BookLookup.lookup_by_isbn(isbn)
 
         if not lookup:
@@ -82,7 +98,14 @@ class BookRequest(Resource):
         book = BookRequestModel(
             **lookup, book_format=book_format, user=get_jwt_identity()
         )
-        book.save_to_db()
+        try:
+            book.save_to_db()
+        except IntegrityError:
+            abort(
+                400,
+                message=f'Request for {book_format} with '
+                f'isbn {isbn} already exists.',
+            )
 
         return book.json(), 200
 
@@ -104,11 +127,7 @@ class BookRequest(Resource):
                 404, message=f'{book_type} request with {isbn} does not exist.'
             )
 
-        user = UserModel.find_by_id(get_jwt_identity())
-        if (
-            get_jwt_identity() is not book.user_id
-            and user.user_type is not UserLevels.ADMIN
-        ):
+        if not can_modify(book.user_id):
             abort(
                 401,
                 message='Only requesting user or admin can '
@@ -121,25 +140,41 @@ class BookRequest(Resource):
 
 
 class BookRequests(Resource):
+    parser = page_parser.copy()
+    parser.add_argument(
+        'type', type=str, location='args', help='Book format filter.'
+    )
+
     @jwt_required()
     def get(self) -> (dict[str, list[dict]], int):
-        """GET HTTP method, Retrieves a list of the user's book requests.
-        Admin retrieves all existing book requests.
+        """GET HTTP method, Retrieves a page of the user's book requests.
+        Admin retrieves all existing book requests, optionally filtered
+        by user.
 
         Returns:
-            Tuple[dict, int]: User's book requests, HTTP status code
+            Tuple[dict, int]: User's book requests and the next page's
+                cursor, HTTP status code
         """
-        user = UserModel.find_by_id(get_jwt_identity())
-        if user.user_type is UserLevels.ADMIN:
-            requests = [
-                request.json() for request in BookRequestModel.find_all()
-            ]
-        else:
-            requests = [
-                request.json()
-                for request in BookRequestModel.find_all_by_user(
-                    get_jwt_identity()
-                )
-            ]
-
-        return {'book_requests': requests}, 200
+        data = BookRequests.parser.parse_args()
+
+        user_id = data.get('user') if is_admin() else get_jwt_identity()
+
+        etag = list_etag(('book',), user_id)
+        response = not_modified(etag, LIST_CACHE_CONTROL)
+        if response is not None:
+            return response
+
+        try:
+            requests, cursor = BookRequestModel.find_page_json(
+                data['limit'],
+                cursor=data.get('cursor'),
+                user_id=user_id,
+                book_format=data.get('type'),
+            )
+        except ValueError as error:
+            abort(400, message=str(error))
+
+        return {
+            'book_requests': requests,
+            'next_cursor': cursor,
+        }, 200, cache_headers(etag, LIST_CACHE_CONTROL)
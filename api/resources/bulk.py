@@ -0,0 +1,299 @@
+from typing import Any, Hashable, Tuple
+
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_restful import Resource, abort, reqparse
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from api.autocomplete import suggestion_index
+from api.config import Config
+from api.db import db, release_connection
+from api.lookup.aggregate import lookup_all
+from api.lookup.books import BookLookup
+from api.lookup.music import MusicLookup
+from api.lookup.video import VideoLookup
+from api.models.books import BookRequestModel
+from api.models.movies import MovieRequestModel
+from api.models.music import MusicRequestModel
+from api.models.shows import ShowRequestModel
+from api.versions import change_versions
+
+
+class BulkBooks:
+    """Bulk request handling for books, unique by isbn and book format."""
+
+    @staticmethod
+    def parse(item: dict) -> Tuple[Hashable, tuple]:
+        """Validates a requested item.
+
+        Args:
+            item (dict): Requested item from the payload
+
+        Raises:
+            ValueError: The item is missing a required field
+
+        Returns:
+            Tuple[Hashable, tuple]: Item's unique key, lookup arguments
+        """
+        isbn, book_format = item.get('isbn'), item.get('book_format')
+        if not (isbn and book_format):
+            raise ValueError('isbn and book_format required.')
+        key = (str(isbn), str(book_format))
+        return key, key
+
+    @staticmethod
+    def existing(keys: set) -> set:
+        """Returns the keys that are already requested, in one query."""
+        isbns = {isbn for isbn, _ in keys}
+        rows = BookRequestModel.query.with_entities(
+            BookRequestModel.isbn_13,
+            BookRequestModel.isbn_10,
+            BookRequestModel.book_format,
+        ).filter(
+            or_(
+                BookRequestModel.isbn_13.in_(list(isbns)),
+                BookRequestModel.isbn_10.in_(list(isbns)),
+            )
+        )
+        found = set()
+        for isbn_13, isbn_10, book_format in rows:
+            found |= {(isbn_13, book_format), (isbn_10, book_format)}
+        return keys & found
+
+    @staticmethod
+    def lookup(args: tuple) -> dict | None:
+        return BookLookup.lookup_by_isbn(args[0])
+
+    @staticmethod
+    def unique_keys(args: tuple, lookup: dict) -> set:
+        """Returns every key the new request will occupy."""
+        book_format = args[1]
+        return {
+            (isbn, book_format)
+            for isbn in (lookup['isbn_13'], lookup['isbn_10'])
+            if isbn
+        } | {args}
+
+    @staticmethod
+    def build(args: tuple, lookup: dict, user_id: int) -> BookRequestModel:
+        return BookRequestModel(**lookup, book_format=args[1], user=user_id)
+
+
+class BulkMusic:
+    """Bulk request handling for music, unique by deezer id."""
+
+    @staticmethod
+    def parse(item: dict) -> Tuple[Hashable, tuple]:
+        deezer_id, music_type = item.get('id'), item.get('music_type')
+        if not (deezer_id and music_type):
+            raise ValueError('id and music_type required.')
+        try:
+            deezer_id = int(deezer_id)
+        except (TypeError, ValueError):
+            raise ValueError('id must be an integer.')
+        return deezer_id, (deezer_id, str(music_type))
+
+    @staticmethod
+    def existing(keys: set) -> set:
+        rows = MusicRequestModel.query.with_entities(
+            MusicRequestModel.deezer_id
+        ).filter(MusicRequestModel.deezer_id.in_(list(keys)))
+        return {deezer_id for deezer_id, in rows}
+
+    @staticmethod
+    def lookup(args: tuple) -> dict | None:
+        return MusicLookup.lookup_by_deezer_id(*args)
+
+    @staticmethod
+    def unique_keys(args: tuple, lookup: dict) -> set:
+        return {args[0]}
+
+    @staticmethod
+    def build(args: tuple, lookup: dict, user_id: int) -> MusicRequestModel:
+        return MusicRequestModel(**lookup, user=user_id)
+
+
+class BulkVideos:
+    """Bulk request handling for movies or shows, unique by imdb id."""
+
+    def __init__(self, model: type) -> None:
+        self.model = model
+
+    @staticmethod
+    def parse(item: dict) -> Tuple[Hashable, tuple]:
+        imdb_id = item.get('imdb_id')
+        if not imdb_id:
+            raise ValueError('imdb_id required.')
+        return str(imdb_id), (str(imdb_id),)
+
+    def existing(self, keys: set) -> set:
+        rows = self.model.query.with_entities(self.model.imdb_id).filter(
+            self.model.imdb_id.in_(list(keys))
+        )
+        return {imdb_id for imdb_id, in rows}
+
+    @staticmethod
+    def lookup(args: tuple) -> dict | None:
+        return VideoLookup.lookup_by_id(args[0])
+
+    @staticmethod
+    def unique_keys(args: tuple, lookup: dict) -> set:
+        return {args[0]}
+
+    def build(self, args: tuple, lookup: dict, user_id: int) -> Any:
+        return self.model(**lookup, imdb_id=args[0], user=user_id)
+
+
+class BulkRequest(Resource):
+    parser = reqparse.RequestParser()
+    parser.add_argument(
+        'items',
+        type=dict,
+        action='append',
+        required=True,
+        location='json',
+        help='List of items to request required.',
+    )
+
+    media = {
+        'book': BulkBooks(),
+        'movie': BulkVideos(MovieRequestModel),
+        'music': BulkMusic(),
+        'show': BulkVideos(ShowRequestModel),
+    }
+
+    def __init__(self, media_type: str) -> None:
+        self.handler = self.media[media_type]
+
+    @jwt_required()
+    def post(self) -> Tuple[dict, int]:
+        """POST HTTP method, Adds requests for many items at once.
+
+        Items already requested are skipped with one query, new items are
+        looked up concurrently and all found items are inserted in a
+        single transaction. Items requested concurrently by someone else
+        are reported as existing.
+
+        Returns:
+            Tuple[dict, int]: Result of each item, HTTP status code
+        """
+        items = BulkRequest.parser.parse_args()['items']
+        if len(items) > Config.BULK_MAX_ITEMS:
+            abort(
+                400,
+                message=f'At most {Config.BULK_MAX_ITEMS} items per request.',
+            )
+
+        handler, user_id = self.handler, get_jwt_identity()
+        results = [{'item': item} for item in items]
+
+        pending = {}  # key -> (index, lookup args)
+        for index, item in enumerate(items):
+            try:
+                key, args = handler.parse(item)
+            except ValueError as error:
+                results[index].update(status='invalid', message=str(error))
+                continue
+            if key in pending:
+                results[index]['status'] = 'duplicate'
+            else:
+                pending[key] = (index, args)
+
+        if pending:
+            for key in handler.existing(set(pending)):
+                index, _ = pending.pop(key)
+                results[index]['status'] = 'exists'
+
+        release_connection()
+        keys = list(pending)
+        lookups = lookup_all(
+            handler.lookup,
+            [pending[key][1] for key in keys],
+            Config.BULK_LOOKUP_CONCURRENCY,
+        )
+
+        found, claimed = [], set()
+        for key, lookup in zip(keys, lookups):
+            index, args = pending[key]
+            if isinstance(lookup, Exception):
+                results[index].update(status='error', message='Lookup failed.')
+            elif not lookup:
+                results[index]['status'] = 'not_found'
+            else:
+                unique = handler.unique_keys(args, lookup)
+                if unique & claimed:
+                    results[index]['status'] = 'duplicate'
+                else:
+                    claimed |= unique
+                    found.append((index, unique, args, lookup))
+
+        # A lookup can resolve to a key other than the requested one,
+        # e.g. the isbn_13 of a book requested by isbn_10.
+        unchecked = claimed - set(keys)
+        taken = handler.existing(unchecked) if unchecked else set()
+
+        created = []
+        for index, unique, args, lookup in found:
+            if unique & taken:
+                results[index]['status'] = 'exists'
+            else:
+                created.append((index, args, lookup))
+
+        created = self._insert(created, results, user_id)
+        if created:
+            requests = [request for _, request in created]
+            # Read before the commit expires the requests, which would
+            # reload each of them.
+            media_type = requests[0].media_type
+            suggestions = suggestion_index.request_values(requests)
+            for index, request in created:
+                results[index].update(status='created', request=request.json())
+            db.session.commit()
+            change_versions.bump(media_type, user_id)
+            suggestion_index.add_request_values(suggestions)
+
+        return {'results': results}, 200
+
+    def _insert(
+        self, found: list[tuple], results: list[dict], user_id: int
+    ) -> list[tuple[int, Any]]:
+        """Inserts the found items, in one savepoint unless some of them
+        were requested concurrently. Those are then left out by inserting
+        each item in its own savepoint, and reported as existing.
+
+        Args:
+            found (list[tuple]): (result index, lookup args, lookup) of the
+                items to insert
+            results (list[dict]): Result of each item
+            user_id (int): Requesting user
+
+        Returns:
+            list[tuple[int, Any]]: Result index and request of each
+                inserted item
+        """
+        if not found:
+            return []
+
+        handler = self.handler
+        try:
+            with db.session.begin_nested():
+                created = [
+                    (index, handler.build(args, lookup, user_id))
+                    for index, args, lookup in found
+                ]
+                db.session.add_all([request for _, request in created])
+            return created
+        except IntegrityError:
+            pass
+
+        created = []
+        for index, args, lookup in found:
+            request = handler.build(args, lookup, user_id)
+            try:
+                with db.session.begin_nested():
+                    db.session.add(request)
+            except IntegrityError:
+                results[index]['status'] = 'exists'
+            else:
+                created.append((index, request))
+        return created
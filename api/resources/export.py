@@ -0,0 +1,177 @@
+import csv
+import io
+import json
+from datetime import date
+from typing import Any, Iterator
+
+from flask import Response, stream_with_context
+from flask_jwt_extended import jwt_required
+from flask_restful import Resource, abort, reqparse
+
+from api.config import Config
+from api.models.media import MEDIA_TYPES, MediaRequestModel
+from api.resources.util import is_admin
+
+_COMMON_FIELDS = ('id', 'media_type', 'user_id', 'request_date')
+FIELDS = {
+    'book': _COMMON_FIELDS + (
+        'title', 'subtitle', 'authors', 'release_date', 'isbn_13',
+        'isbn_10', 'book_format',
+    ),
+    'movie': _COMMON_FIELDS + ('title', 'year', 'imdb_id'),
+    'music': _COMMON_FIELDS + (
+        'track', 'artist', 'album', 'release_date', 'deezer_id',
+        'music_type', 'cover',
+    ),
+    'show': _COMMON_FIELDS + ('title', 'year', 'imdb_id'),
+}
+
+
+def export_rows(media_types: list[str]) -> Iterator[dict]:
+    """Yields every request of the given media types as a flat dictionary.
+
+    Rows are read as plain column tuples in batches from a server-side
+    cursor where the database supports one, so neither the rows nor ORM
+    objects accumulate in memory.
+
+    Args:
+        media_types (list[str]): Media types to export, in order
+
+    Yields:
+        dict: The columns that apply to the request's media type
+    """
+    model = MediaRequestModel
+    for media_type in media_types:
+        names = FIELDS[media_type]
+        query = (
+            model.query.with_entities(
+                *(model.__table__.columns[name] for name in names)
+            )
+            .filter(model.media_type == media_type)
+            .order_by(model.request_date, model.id)
+            .yield_per(Config.EXPORT_BATCH_SIZE)
+        )
+        for row in query:
+            yield dict(zip(names, row))
+
+
+def export_fields(media_types: list[str]) -> list[str]:
+    """Returns the CSV header covering the fields of every media type."""
+    return list(
+        dict.fromkeys(
+            name for media_type in media_types for name in FIELDS[media_type]
+        )
+    )
+
+
+def _serialize(value: Any) -> Any:
+    """Formats dates as iso strings for json and CSV.
+
+    Args:
+        value (Any): Column value
+
+    Returns:
+        Any: The iso formatted date, or the value unchanged
+    """
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def ndjson_lines(rows: Iterator[dict]) -> Iterator[str]:
+    """Formats rows as newline delimited json.
+
+    Args:
+        rows (Iterator[dict]): Exported rows
+
+    Returns:
+        Iterator[str]: One json line per row
+    """
+    for row in rows:
+        yield json.dumps(row, default=_serialize) + '\n'
+
+
+def csv_lines(rows: Iterator[dict], fields: list[str]) -> Iterator[str]:
+    """Formats rows as CSV, starting with the header.
+
+    Args:
+        rows (Iterator[dict]): Exported rows
+        fields (list[str]): CSV columns, in order
+
+    Returns:
+        Iterator[str]: The header line, then one line per row
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fields, lineterminator='\n')
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({key: _serialize(value) for key, value in row.items()})
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def chunked(lines: Iterator[str], size: int = 64 * 1024) -> Iterator[str]:
+    """Joins lines into chunks of about size characters, so the server
+    does not write each row to the socket separately.
+    """
+    chunk, length = [], 0
+    for line in lines:
+        chunk.append(line)
+        length += len(line)
+        if length >= size:
+            yield ''.join(chunk)
+            chunk, length = [], 0
+    if chunk:
+        yield ''.join(chunk)
+
+
+class RequestExport(Resource):
+    parser = reqparse.RequestParser()
+    parser.add_argument(
+        'format',
+        type=str,
+        location='args',
+        choices=('ndjson', 'csv'),
+        default='ndjson',
+        help='Export format, ndjson or csv.',
+    )
+    parser.add_argument(
+        'media',
+        type=str,
+        location='args',
+        action='append',
+        choices=MEDIA_TYPES,
+        help='Media type to export, repeat for several.',
+    )
+
+    @jwt_required()
+    def get(self) -> Response:
+        """GET HTTP method, Streams every request as newline delimited json
+        or CSV. Admin only.
+
+        Returns:
+            Response: Streamed export
+        """
+        if not is_admin():
+            abort(401, message='Only admin can export requests.')
+
+        data = RequestExport.parser.parse_args()
+        media_types = list(dict.fromkeys(data.get('media') or MEDIA_TYPES))
+        rows = export_rows(media_types)
+
+        if data['format'] == 'csv':
+            body = csv_lines(rows, export_fields(media_types))
+            mimetype, extension = 'text/csv', 'csv'
+        else:
+            body = ndjson_lines(rows)
+            mimetype, extension = 'application/x-ndjson', 'ndjson'
+
+        return Response(
+            stream_with_context(chunked(body)),
+            mimetype=mimetype,
+            headers={
+                'Content-Disposition': (
+                    f'attachment; filename=requests.{extension}'
+                )
+            },
+        )
@@ -0,0 +1,62 @@
+from typing import Tuple
+
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_restful import Resource, abort
+
+from api.models.media import MEDIA_TYPES, MediaRequestModel
+from api.resources.util import (
+    LIST_CACHE_CONTROL,
+    cache_headers,
+    dated_page_parser,
+    is_admin,
+    list_etag,
+    not_modified,
+)
+
+
+class MediaRequests(Resource):
+    parser = dated_page_parser.copy()
+    parser.add_argument(
+        'media',
+        type=str,
+        location='args',
+        choices=MEDIA_TYPES,
+        help='Media type filter.',
+    )
+
+    @jwt_required()
+    def get(self) -> Tuple[dict, int]:
+        """GET HTTP method, Retrieves a page of the user's requests of every
+        media type, newest first. Admin retrieves all existing requests,
+        optionally filtered by user.
+
+        Returns:
+            Tuple[dict, int]: User's requests and the next page's cursor,
+                HTTP status code
+        """
+        data = MediaRequests.parser.parse_args()
+
+        user_id = data.get('user') if is_admin() else get_jwt_identity()
+
+        media_types = [data['media']] if data.get('media') else MEDIA_TYPES
+        etag = list_etag(media_types, user_id)
+        response = not_modified(etag, LIST_CACHE_CONTROL)
+        if response is not None:
+            return response
+
+        try:
+            requests, cursor = MediaRequestModel.find_page_json(
+                data['limit'],
+                cursor=data.get('cursor'),
+                user_id=user_id,
+                date_from=data.get('date_from'),
+                date_to=data.get('date_to'),
+                media_type=data.get('media'),
+            )
+        except ValueError as error:
+            abort(400, message=str(error))
+
+        return {
+            'requests': requests,
+            'next_cursor': cursor,
+        }, 200, cache_headers(etag, LIST_CACHE_CONTROL)
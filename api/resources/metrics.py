@@ -0,0 +1,134 @@
+import hmac
+from typing import Optional
+
+from flask import Response, request
+from flask_jwt_extended import verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from flask_restful import Resource, abort
+from jwt import PyJWTError
+
+from api.autocomplete import suggestion_index
+from api.blocklist import token_blocklist
+from api.config import Config
+from api.db import db_pool_stats, redis_pool_stats
+from api.lookup.aggregate import fanout_stats
+from api.lookup.util import (
+    breaker_stats,
+    cache_stats,
+    coalesce_stats,
+    connection_stats,
+    local_cache_stats,
+    rate_limit_stats,
+)
+from api.metrics import format_labels, metrics
+from api.resources.util import is_admin
+from api.versions import change_versions
+
+# Stats reporting a current level rather than counting events.
+GAUGES = {
+    'checked_out',
+    'consecutive_failures',
+    'entries',
+    'idle',
+    'in_flight',
+    'in_use',
+    'max_bytes',
+    'max_connections',
+    'maxsize',
+    'opened',
+    'overflow',
+    'revoked',
+    'seconds_since_sync',
+    'size',
+    'size_bytes',
+    'state',
+    'wait_seconds_max',
+    'wait_seconds_mean',
+}
+
+
+def stat_lines(
+    prefix: str, stats: dict, label: Optional[str] = None
+) -> list[str]:
+    """Renders a stats() dict in the Prometheus text format, one metric per
+    stat named {prefix}_{stat}, counters suffixed with _total.
+
+    Args:
+        prefix (str): Metric name prefix
+        stats (dict): Stats, or stats by label value when label is given
+        label (:obj:'str', optional): Label the stats are keyed by
+
+    Returns:
+        list[str]: Metric lines
+    """
+    series = stats.items() if label is not None else [(None, stats)]
+    samples = {}
+    for value, counts in series:
+        labels = format_labels((label,), (value,)) if label else ''
+        for stat, count in counts.items():
+            if count is not None:
+                samples.setdefault(stat, []).append((labels, count))
+
+    lines = []
+    for stat, values in sorted(samples.items()):
+        name = f'{prefix}_{stat}'
+        if stat in GAUGES:
+            kind = 'gauge'
+        else:
+            kind = 'counter'
+            if not name.endswith('_total'):
+                name += '_total'
+        lines.append(f'# TYPE {name} {kind}')
+        lines.extend(f'{name}{labels} {count}' for labels, count in values)
+    return lines
+
+
+def can_view_metrics() -> bool:
+    """Checks whether the request carries the METRICS_TOKEN bearer token,
+    when one is set, or an admin's access token.
+
+    Returns:
+        bool: True if the metrics may be returned
+    """
+    if Config.METRICS_TOKEN and hmac.compare_digest(
+        request.headers.get('Authorization', ''),
+        f'Bearer {Config.METRICS_TOKEN}',
+    ):
+        return True
+    try:
+        verify_jwt_in_request()
+    except (JWTExtendedException, PyJWTError):
+        return False
+    return is_admin()
+
+
+class Metrics(Resource):
+    def get(self) -> Response:
+        """Returns the process' timings and counters in the Prometheus text
+        format, requires the METRICS_TOKEN bearer token or an admin's
+        access token.
+        """
+        if not can_view_metrics():
+            abort(401, message='Not permitted to view metrics.')
+
+        lines = metrics.render()
+        for prefix, stats, label in (
+            ('lookup_connections', connection_stats(), 'host'),
+            ('lookup_cache', cache_stats(), 'provider'),
+            ('lookup_local_cache', local_cache_stats(), None),
+            ('lookup_coalesce', coalesce_stats(), None),
+            ('lookup_fanout', fanout_stats(), 'provider'),
+            ('lookup_rate_limit', rate_limit_stats(), 'provider'),
+            ('lookup_circuit', breaker_stats(), 'provider'),
+            ('autocomplete', suggestion_index.stats(), None),
+            ('token_blocklist', token_blocklist.stats(), None),
+            ('request_versions', change_versions.stats(), None),
+            ('redis_pool', redis_pool_stats(), None),
+            ('db_pool', db_pool_stats(), None),
+        ):
+            lines.extend(stat_lines(prefix, stats, label))
+        return Response(
+            '\n'.join(lines) + '\n',
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+            headers={'Cache-Control': 'no-store'},
+        )
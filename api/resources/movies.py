@@ -2,10 +2,22 @@ from typing import Tuple
 
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from flask_restful import Resource, abort, reqparse
+from sqlalchemy.exc import IntegrityError
 
+from api.autocomplete import suggestion_index
+from api.db import release_connection
 from api.lookup.video import VideoLookup
 from api.models.movies import MovieRequestModel
-from api.models.user import UserLevels, UserModel
+from api.resources.util import (
+    LIST_CACHE_CONTROL,
+    cache_headers,
+    cacheable,
+    can_modify,
+    dated_page_parser,
+    is_admin,
+    list_etag,
+    not_modified,
+)
 
 
 class MovieRequest(Resource):
@@ -20,6 +32,7 @@ class MovieRequest(Resource):
         'imdb_id', type=str, required=True, help="Movie's IMDB id Required."
     )
 
+    @cacheable
     def get(self) -> Tuple[dict, int]:
         """GET HTTP method. Retrieves list of movies based on given arguments.
 
@@ -39,6 +52,7 @@ class MovieRequest(Resource):
         else:
             movies = VideoLookup.search_by_title(title, 'movie')
 
+        suggestion_index.add_results('movie', title, movies)
         return {'movies': movies}, 200
 
     @jwt_required()
@@ -57,6 +71,7 @@ class MovieRequest(Resource):
                 400, message=f'Movie with imdb_id {imdb_id} already requested.'
             )
 
+        release_connection()
         movie = VideoLookup.lookup_by_id(imdb_id)
         if not movie:
             abort(404, message=f'Movie with imdb_id {imdb_id} not found.')
@@ -65,7 +80,12 @@ class MovieRequest(Resource):
             **movie, imdb_id=imdb_id, user=int(get_jwt_identity())
         )
 
-        movie.save_to_db()
+        try:
+            movie.save_to_db()
+        except IntegrityError:
+            abort(
+                400, message=f'Movie with imdb_id {imdb_id} already requested.'
+            )
 
         return movie.json(), 200
 
@@ -86,11 +106,7 @@ class MovieRequest(Resource):
         if not movie:
             abort(404, message=f'Request for {imdb_id} does not exist.')
 
-        user = UserModel.find_by_id(get_jwt_identity())
-        if (
-            get_jwt_identity() is not movie.user_id
-            and user.user_type is not UserLevels.ADMIN
-        ):
+        if not can_modify(movie.user_id):
             abort(
                 401,
                 message='Only requesting user or admin can delete.',
@@ -102,26 +118,39 @@ class MovieRequest(Resource):
 
 
 class MovieRequests(Resource):
+    parser = dated_page_parser.copy()
+
     @jwt_required()
     def get(self) -> Tuple[dict, int]:
-        """GET HTTP method, Retrieves a list of the user's movie requests.
-        Admin retrieves all existing movie requests.
+        """GET HTTP method, Retrieves a page of the user's movie requests.
+        Admin retrieves all existing movie requests, optionally filtered
+        by user.
 
         Returns:
-            Tuple[dict, int]: User's movie requests, HTTP status code
+            Tuple[dict, int]: User's movie requests and the next page's
+                cursor, HTTP status code
         """
-        user = UserModel.find_by_id(get_jwt_identity())
+        data = MovieRequests.parser.parse_args()
+
+        user_id = data.get('user') if is_admin() else get_jwt_identity()
+
+        etag = list_etag(('movie',), user_id)
+        response = not_modified(etag, LIST_CACHE_CONTROL)
+        if response is not None:
+            return response
+
+        try:
+            requests, cursor = MovieRequestModel.find_page_json(
+                data['limit'],
+                cursor=data.get('cursor'),
+                user_id=user_id,
+                date_from=data.get('date_from'),
+                date_to=data.get('date_to'),
+            )
+        except ValueError as error:
+            abort(400, message=str(error))
 
-        if user.user_type is UserLevels.ADMIN:
-            requests = [
-                request.json() for request in MovieRequestModel.find_all()
-            ]
-        else:
-            requests = [
-                request.json()
-                for request in MovieRequestModel.find_all_by_user(
-                    get_jwt_identity()
-                )
-            ]
-
-        return {'movie_requests': requests}, 200
+        return {
+            'movie_requests': requests,
+            'next_cursor': cursor,
+        }, 200, cache_headers(etag, LIST_CACHE_CONTROL)
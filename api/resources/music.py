@@ -2,10 +2,22 @@ from typing import Tuple
 
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from flask_restful import Resource, abort, reqparse
+from sqlalchemy.exc import IntegrityError
 
+from api.autocomplete import suggestion_index
+from api.db import release_connection
 from api.lookup.music import MusicLookup
 from api.models.music import MusicRequestModel
-from api.models.user import UserLevels, UserModel
+from api.resources.util import (
+    LIST_CACHE_CONTROL,
+    cache_headers,
+    cacheable,
+    can_modify,
+    dated_page_parser,
+    is_admin,
+    list_etag,
+    not_modified,
+)
 
 
 class MusicRequest(Resource):
@@ -25,6 +37,7 @@ class MusicRequest(Resource):
         help='Music type [album, track] Required.',
     )
 
+    @cacheable
     def get(self) -> Tuple[dict, int]:
         """GET HTTP method. Retrieves list of movies based on given arguments.
 
@@ -71,6 +84,9 @@ class MusicRequest(Resource):
             if not music:
                 abort(404, message=f'Track(s) from - Artist: {artist}')
 
+        suggestion_index.add_results(
+            'music', ' '.join(filter(None, (title, album, artist))), music
+        )
         return {'music': music}, 200
 
     @jwt_required()
@@ -87,6 +103,7 @@ class MusicRequest(Resource):
         if MusicRequestModel.find_by_deezer_id(deezer_id):
             abort(400, message=f'Request for {deezer_id} already exists.')
 
+        release_connection()
         music = MusicLookup.lookup_by_deezer_id(deezer_id, music_type)
 
         if not music:
@@ -94,7 +111,10 @@ class MusicRequest(Resource):
 
         music = MusicRequestModel(**music, user=get_jwt_identity())
 
-        music.save_to_db()
+        try:
+            music.save_to_db()
+        except IntegrityError:
+            abort(400, message=f'Request for {deezer_id} already exists.')
 
         return music.json(), 200
 
@@ -115,11 +135,7 @@ class MusicRequest(Resource):
         if not music:
             abort(404, message='Request does not exist.')
 
-        user = UserModel.find_by_id(get_jwt_identity())
-        if (
-            get_jwt_identity() is not music.user_id
-            and user.user_type is not UserLevels.ADMIN
-        ):
+        if not can_modify(music.user_id):
             abort(
                 401,
                 message='Only requesting user or admin can'
@@ -132,25 +148,43 @@ class MusicRequest(Resource):
 
 
 class MusicRequests(Resource):
+    parser = dated_page_parser.copy()
+    parser.add_argument(
+        'type', type=str, location='args', help='Music type filter.'
+    )
+
     @jwt_required()
     def get(self) -> Tuple[dict, int]:
-        """GET HTTP method, Retrieves a list of the user's music requests.
-        Admin retrieves all existing music requests.
+        """GET HTTP method, Retrieves a page of the user's music requests.
+        Admin retrieves all existing music requests, optionally filtered
+        by user.
 
         Returns:
-            Tuple[dict, int]: User's music requests, HTTP status code
+            Tuple[dict, int]: User's music requests and the next page's
+                cursor, HTTP status code
         """
-        user = UserModel.find_by_id(get_jwt_identity())
-        if user.user_type is UserLevels.ADMIN:
-            requests = [
-                request.json() for request in MusicRequestModel.find_all()
-            ]
-        else:
-            requests = [
-                request.json()
-                for request in MusicRequestModel.find_all_by_user(
-                    get_jwt_identity()
-                )
-            ]
+        data = MusicRequests.parser.parse_args()
+
+        user_id = data.get('user') if is_admin() else get_jwt_identity()
+
+        etag = list_etag(('music',), user_id)
+        response = not_modified(etag, LIST_CACHE_CONTROL)
+        if response is not None:
+            return response
+
+        try:
+            requests, cursor = MusicRequestModel.find_page_json(
+                data['limit'],
+                cursor=data.get('cursor'),
+                user_id=user_id,
+                music_type=data.get('type'),
+                date_from=data.get('date_from'),
+                date_to=data.get('date_to'),
+            )
+        except ValueError as error:
+            abort(400, message=str(error))
 
-        return {'music_requests': requests}, 200
+        return {
+            'music_requests': requests,
+            'next_cursor': cursor,
+        }, 200, cache_headers(etag, LIST_CACHE_CONTROL)
@@ -1,8 +1,15 @@
 from flask_restful import Api
 
+from api.metrics import metrics
+from api.resources.autocomplete import Autocomplete
 from api.resources.books import BookRequest, BookRequests
+from api.resources.bulk import BulkRequest
+from api.resources.export import RequestExport
+from api.resources.media import MediaRequests
+from api.resources.metrics import Metrics
 from api.resources.movies import MovieRequest, MovieRequests
 from api.resources.music import MusicRequest, MusicRequests
+from api.resources.search import RequestSearch
 from api.resources.shows import ShowRequest, ShowRequests
 from api.resources.user import (TokenRefresh, UserLogin, UserLogout,
                                 UserRegister)
@@ -23,6 +30,21 @@ def initialize_routes(api: Api) -> None:
     api.add_resource(ShowRequest, '/show/request')
     api.add_resource(ShowRequests, '/show/requests')
 
+    for media_type in BulkRequest.media:
+        api.add_resource(
+            BulkRequest,
+            f'/{media_type}/request/bulk',
+            endpoint=f'{media_type}_bulk_request',
+            resource_class_kwargs={'media_type': media_type},
+        )
+
+    api.add_resource(MediaRequests, '/requests')
+    api.add_resource(RequestExport, '/export')
+    api.add_resource(RequestSearch, '/search')
+    api.add_resource(Autocomplete, '/autocomplete')
+    if metrics.enabled:
+        api.add_resource(Metrics, '/metrics')
+
     api.add_resource(UserLogin, '/login')
     api.add_resource(UserLogout, '/logout')
     # api.add_resource(User, '/user/<int:user_id>')
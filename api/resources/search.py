@@ -0,0 +1,74 @@
+from typing import Tuple
+
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_restful import Resource, abort
+
+from api.models.media import MEDIA_TYPES
+from api.models.search import search_requests
+from api.resources.util import (
+    LIST_CACHE_CONTROL,
+    cache_headers,
+    is_admin,
+    list_etag,
+    not_modified,
+    page_parser,
+)
+
+
+class RequestSearch(Resource):
+    parser = page_parser.copy()
+    parser.add_argument(
+        'q',
+        type=str,
+        required=True,
+        location='args',
+        help='Search query required.',
+    )
+    parser.add_argument(
+        'media',
+        type=str,
+        location='args',
+        action='append',
+        choices=MEDIA_TYPES,
+        help='Media type to search, repeat for several.',
+    )
+
+    @jwt_required()
+    def get(self) -> Tuple[dict, int]:
+        """GET HTTP method, Searches the user's requests by title, author,
+        artist and album. Admin searches every request, optionally
+        filtered by user.
+
+        Returns:
+            Tuple[dict, int]: Matching requests best first and the next
+                page's cursor, HTTP status code
+        """
+        data = RequestSearch.parser.parse_args()
+        query = data['q'].strip()
+        if not query:
+            abort(400, message='Search query required.')
+
+        user_id = data.get('user') if is_admin() else get_jwt_identity()
+        media_types = list(dict.fromkeys(data.get('media') or MEDIA_TYPES))
+
+        etag = list_etag(media_types, user_id)
+        response = not_modified(etag, LIST_CACHE_CONTROL)
+        if response is not None:
+            return response
+
+        try:
+            results, cursor = search_requests(
+                query,
+                media_types,
+                data['limit'],
+                cursor=data.get('cursor'),
+                user_id=user_id,
+            )
+        except ValueError as error:
+            abort(400, message=str(error))
+
+        return (
+            {'results': results, 'next_cursor': cursor},
+            200,
+            cache_headers(etag, LIST_CACHE_CONTROL),
+        )
@@ -2,10 +2,23 @@ from typing import Tuple
 
 from flask_jwt_extended import get_jwt_identity, jwt_required
 from flask_restful import Resource, abort, reqparse
+from sqlalchemy.exc import IntegrityError
 
+from api.autocomplete import suggestion_index
+from api.db import release_connection
+from api.lookup.aggregate import search_shows
 from api.lookup.video import VideoLookup
 from api.models.shows import ShowRequestModel
-from api.models.user import UserLevels, UserModel
+from api.resources.util import (
+    LIST_CACHE_CONTROL,
+    cache_headers,
+    cacheable,
+    can_modify,
+    dated_page_parser,
+    is_admin,
+    list_etag,
+    not_modified,
+)
 
 
 class ShowRequest(Resource):
@@ -20,6 +33,7 @@ class ShowRequest(Resource):
         'imdb_id', type=str, required=True, help="Show's IMDB id."
     )
 
+    @cacheable
     def get(self) -> Tuple[dict, int]:
         """GET HTTP method. Retrieves list of TV shows
         based on given arguments.
@@ -27,6 +41,7 @@ class ShowRequest(Resource):
         Search Types:
             title & year - Searches by movie title,
                 with optional release year filter
+            title - Searches every TV show provider by title
 
         Returns:
             Tuple[dict, int]: TV shows found in search, HTTP status code
@@ -37,8 +52,9 @@ class ShowRequest(Resource):
         if year:
             shows = VideoLookup.search_by_title_year(title, year, 'series')
         else:
-            shows = VideoLookup.search_by_title(title, 'series')
+            shows = search_shows(title)
 
+        suggestion_index.add_results('show', title, shows)
         return {'shows': shows}, 200
 
     @jwt_required()
@@ -57,6 +73,7 @@ class ShowRequest(Resource):
                 400, message=f'Show with imdb_id {imdb_id} already requested.'
             )
 
+        release_connection()
         show = VideoLookup.lookup_by_id(imdb_id)
         if show is None:
             abort(404, message=f'Unable to find show with IMDB id: {imdb_id}')
@@ -65,7 +82,12 @@ class ShowRequest(Resource):
             **show, imdb_id=imdb_id, user=int(get_jwt_identity())
         )
 
-        show.save_to_db()
+        try:
+            show.save_to_db()
+        except IntegrityError:
+            abort(
+                400, message=f'Show with imdb_id {imdb_id} already requested.'
+            )
 
         return show.json(), 200
 
@@ -86,11 +108,7 @@ class ShowRequest(Resource):
         if not show:
             abort(404, message=f'Request for {imdb_id} does not exists.')
 
-        user = UserModel.find_by_id(get_jwt_identity())
-        if (
-            get_jwt_identity() is not show.user_id
-            and user.user_type is not UserLevels.ADMIN
-        ):
+        if not can_modify(show.user_id):
             abort(
                 401,
                 message='Only requesting user or admin'
@@ -103,25 +121,39 @@ class ShowRequest(Resource):
 
 
 class ShowRequests(Resource):
+    parser = dated_page_parser.copy()
+
     @jwt_required()
     def get(self) -> Tuple[dict, int]:
-        """GET HTTP method, Retrieves a list of the user's TV show requests.
-        Admin retrieves all existing TV show requests.
+        """GET HTTP method, Retrieves a page of the user's TV show requests.
+        Admin retrieves all existing TV show requests, optionally filtered
+        by user.
 
         Returns:
-            Tuple[dict, int]: User's TV show requests, HTTP status code
+            Tuple[dict, int]: User's TV show requests and the next page's
+                cursor, HTTP status code
         """
-        user = UserModel.find_by_id(get_jwt_identity())
-        if user.user_type is UserLevels.ADMIN:
-            requests = [
-                request.json() for request in ShowRequestModel.find_all()
-            ]
-        else:
-            requests = [
-                request.json()
-                for request in ShowRequestModel.find_all_by_user(
-                    get_jwt_identity()
-                )
-            ]
-
-        return {'show_requests': requests}, 200
+        data = ShowRequests.parser.parse_args()
+
+        user_id = data.get('user') if is_admin() else get_jwt_identity()
+
+        etag = list_etag(('show',), user_id)
+        response = not_modified(etag, LIST_CACHE_CONTROL)
+        if response is not None:
+            return response
+
+        try:
+            requests, cursor = ShowRequestModel.find_page_json(
+                data['limit'],
+                cursor=data.get('cursor'),
+                user_id=user_id,
+                date_from=data.get('date_from'),
+                date_to=data.get('date_to'),
+            )
+        except ValueError as error:
+            abort(400, message=str(error))
+
+        return {
+            'show_requests': requests,
+            'next_cursor': cursor,
+        }, 200, cache_headers(etag, LIST_CACHE_CONTROL)
@@ -4,10 +4,11 @@ from typing import Tuple
 from flask_jwt_extended import (create_access_token, create_refresh_token,
                                 get_jwt, get_jwt_identity, jwt_required)
 from flask_restful import Resource, abort, reqparse
+from sqlalchemy.exc import IntegrityError
 
-from api.config import Config
-from api.db import jwt_redis_blocklist
+from api.blocklist import token_blocklist
 from api.models.user import UserModel
+from api.resources.util import role_claims
 
 _create_user_parser = reqparse.RequestParser()
 _create_user_parser.add_argument(
@@ -51,7 +52,13 @@ class UserRegister(Resource):
             )
 
         user = UserModel(**data)
-        user.save_to_db()
+        try:
+            user.save_to_db()
+        except IntegrityError:
+            abort(
+                400,
+                message=f"A user with username {data['username']} exists.",
+            )
 
         return {'message': 'User created successfully.'}, 201
 
@@ -90,7 +97,9 @@ class UserLogin(Resource):
         if not user or not compare_digest(user.password, data['password']):
             abort(401, message='Invalid credentials')
 
-        access_token = create_access_token(identity=user.id, fresh=True)
+        access_token = create_access_token(
+            identity=user.id, fresh=True, additional_claims=role_claims(user)
+        )
         refresh_token = create_refresh_token(user.id)
         return {
             'access_token': access_token,
@@ -107,8 +116,7 @@ class UserLogout(Resource):
         Returns:
             Tuple[dict, int]: Success message, HTTP status code
         """
-        jti = get_jwt()['jti']
-        jwt_redis_blocklist.set(jti, '', ex=Config.ACCESS_EXPIRES)
+        token_blocklist.revoke(get_jwt()['jti'])
         return {'message': 'User logged out.'}, 200
 
 
@@ -116,10 +124,17 @@ class TokenRefresh(Resource):
     @jwt_required(refresh=True)
     def post(self) -> Tuple[dict, int]:
         """POST HTTP method, User jwt token refresh method.
+        The user's role is re-read so role changes apply from the next
+        refresh.
 
         Returns:
             Tuple[dict, int]: new access token, HTTP status code
         """
-        current_user = get_jwt_identity()
-        new_token = create_access_token(identity=current_user, fresh=False)
+        user = UserModel.find_by_id(get_jwt_identity())
+        if not user:
+            abort(401, message='User does not exist.')
+
+        new_token = create_access_token(
+            identity=user.id, fresh=False, additional_claims=role_claims(user)
+        )
         return {'access_token': new_token}, 200
@@ -0,0 +1,221 @@
+import hashlib
+import json
+from datetime import datetime
+from functools import wraps
+from typing import Callable, Iterable, Optional
+
+from flask import Response, current_app, request
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from flask_restful import reqparse
+from werkzeug.http import quote_etag
+
+from api.config import Config
+from api.migrations import latest_version
+from api.models.user import UserLevels, UserModel
+from api.versions import change_versions
+
+
+def role_claims(user: UserModel) -> dict:
+    """Builds the jwt claims carrying the user's role, so that requests
+    can be authorized without querying the user.
+
+    Args:
+        user (UserModel): User the token is issued to
+
+    Returns:
+        dict: Additional jwt claims
+    """
+    return {'user_type': int(user.user_type)}
+
+
+def is_admin() -> bool:
+    """Checks whether the current user is an admin.
+
+    The role is read from the access token's claims. Tokens issued before
+    the role was added to the claims fall back to querying the user.
+
+    Returns:
+        bool: True if the current user is an admin
+    """
+    user_type = get_jwt().get('user_type')
+    if user_type is None:
+        user = UserModel.find_by_id(get_jwt_identity())
+        user_type = user.user_type if user else None
+    return user_type is not None and int(user_type) == UserLevels.ADMIN
+
+
+def can_modify(owner_id: int) -> bool:
+    """Checks whether the current user may modify a user's request.
+
+    Args:
+        owner_id (int): Id of the user that made the request
+
+    Returns:
+        bool: True if the current user made the request or is an admin
+    """
+    return get_jwt_identity() == owner_id or is_admin()
+
+
+def _etag(*parts: object) -> str:
+    """Hashes everything a response body depends on into an ETag. The
+    JSON encoder is included as the body's bytes depend on it.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (*parts, current_app.config['JSON_ENCODER']):
+        digest.update(str(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def cache_headers(etag: Optional[str], cache_control: str) -> dict:
+    """Builds the caching headers of a response, or of the 304 answering a
+    conditional request for it.
+
+    The ETag is always weak, as compression makes it weak whenever the
+    response is compressed, and the response always varies on
+    Accept-Encoding, so that a 304 carries the same validator and Vary as
+    the response it validates.
+
+    Args:
+        etag (str | None): Response's ETag, None for no ETag
+        cache_control (str): Cache-Control directives
+
+    Returns:
+        dict: Response headers
+    """
+    headers = {'Cache-Control': cache_control, 'Vary': 'Accept-Encoding'}
+    if etag is not None:
+        headers['ETag'] = quote_etag(etag, weak=True)
+    return headers
+
+
+def not_modified(
+    etag: Optional[str], cache_control: str
+) -> Optional[Response]:
+    """Answers a conditional GET whose cached copy is still current.
+
+    Args:
+        etag (str | None): Current ETag of the requested resource
+        cache_control (str): Cache-Control directives
+
+    Returns:
+        Response | None: 304 response if If-None-Match matches the ETag,
+            else None
+    """
+    # Weak comparison, the ETags sent to clients are weak.
+    if etag is None or not request.if_none_match.contains_weak(etag):
+        return None
+    return Response(status=304, headers=cache_headers(etag, cache_control))
+
+
+LIST_CACHE_CONTROL = 'private, no-cache'
+
+
+# Migrations can change the listed rows, e.g. their ids, without bumping
+# the change versions, so listing ETags also depend on the schema.
+SCHEMA_VERSION = latest_version()
+
+
+def list_etag(
+    media_types: Iterable[str], user_id: Optional[int]
+) -> Optional[str]:
+    """Builds the ETag of a listing of the user's requests, or of every
+    user's when user_id is None, from the change versions in Redis and the
+    schema version rather than from the listed rows, so it is validated
+    without querying the database.
+
+    Args:
+        media_types (Iterable[str]): Listed media types
+        user_id (int | None): Listed user
+
+    Returns:
+        str | None: ETag, None if the versions are unavailable
+    """
+    versions = change_versions.get(media_types, user_id)
+    if versions is None:
+        return None
+    return _etag(
+        request.full_path,
+        get_jwt_identity(),
+        user_id,
+        SCHEMA_VERSION,
+        *versions,
+    )
+
+
+def cacheable(method: Callable) -> Callable:
+    """Adds an ETag of the response body and a public Cache-Control
+    max-age to a lookup resource's GET, whose results only depend on the
+    query and are served from the lookup cache. Answers 304 when the
+    client's copy is current.
+
+    Args:
+        method (Callable): Resource method returning (body, status)
+
+    Returns:
+        Callable: Wrapped method
+    """
+    cache_control = f'public, max-age={Config.LOOKUP_CACHE_MAX_AGE}'
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        data, code = method(*args, **kwargs)
+        if code != 200:
+            return data, code
+        etag = _etag(json.dumps(data, sort_keys=True, default=str))
+        response = not_modified(etag, cache_control)
+        if response is not None:
+            return response
+        return data, code, cache_headers(etag, cache_control)
+
+    return wrapper
+
+
+def page_limit(value: str) -> int:
+    """Parses and bounds the page size argument of listing endpoints.
+
+    Args:
+        value (str): Requested page size
+
+    Raises:
+        ValueError: The page size is not a positive integer
+
+    Returns:
+        int: Page size, capped at Config.LIST_MAX_PAGE_SIZE
+    """
+    limit = int(value)
+    if limit < 1:
+        raise ValueError('limit must be a positive integer.')
+    return min(limit, Config.LIST_MAX_PAGE_SIZE)
+
+
+page_parser = reqparse.RequestParser()
+page_parser.add_argument(
+    'limit',
+    type=page_limit,
+    default=Config.LIST_PAGE_SIZE,
+    location='args',
+    help='Page size must be a positive integer.',
+)
+page_parser.add_argument(
+    'cursor', type=str, location='args', help='Cursor of the next page.'
+)
+page_parser.add_argument(
+    'user', type=int, location='args', help='Requesting user id (admin only).'
+)
+
+dated_page_parser = page_parser.copy()
+dated_page_parser.add_argument(
+    'from',
+    dest='date_from',
+    type=datetime.fromisoformat,
+    location='args',
+    help='Requested on or after date, ISO 8601.',
+)
+dated_page_parser.add_argument(
+    'to',
+    dest='date_to',
+    type=datetime.fromisoformat,
+    location='args',
+    help='Requested before date, ISO 8601.',
+)
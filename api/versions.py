@@ -0,0 +1,91 @@
+import threading
+import uuid
+from collections import Counter
+from typing import Iterable, Optional
+
+import redis
+
+from api.db import get_many, set_many
+
+
+class ChangeVersions:
+    """Versions of the stored requests, kept in Redis to validate ETags.
+
+    Every media type has a version for the whole table and one per user,
+    both replaced whenever a request of that user and media type is added
+    or removed. A version is a random token rather than a counter, so a
+    version lost with Redis (eviction, flush) is replaced by one no
+    client has seen, never by an old value an outdated ETag matches.
+    """
+
+    prefix = 'version'
+
+    def __init__(self) -> None:
+        self._stats = Counter()
+        self._lock = threading.Lock()
+
+    def key(self, media_type: str, user_id: Optional[int] = None) -> str:
+        if user_id is None:
+            return f'{self.prefix}:{media_type}'
+        return f'{self.prefix}:{media_type}:{user_id}'
+
+    def bump(self, media_type: str, user_id: Optional[int]) -> None:
+        """Marks the user's and the table's requests of a media type as
+        changed. Must be called after the change is committed.
+
+        Args:
+            media_type (str): Media type of the changed requests
+            user_id (int | None): Requesting user of the changed requests
+        """
+        token = uuid.uuid4().hex
+        keys = [self.key(media_type)]
+        if user_id is not None:
+            keys.append(self.key(media_type, user_id))
+        try:
+            set_many(dict.fromkeys(keys, token))
+        except redis.RedisError:
+            self._count('errors')
+            return
+        self._count('bumps')
+
+    def get(
+        self, media_types: Iterable[str], user_id: Optional[int] = None
+    ) -> Optional[list[str]]:
+        """Retrieves the current versions of the media types' requests, of
+        the given user or of every user.
+
+        Args:
+            media_types (Iterable[str]): Listed media types
+            user_id (:obj:'int', optional): Listed user, None for every user
+
+        Returns:
+            list[str] | None: Version of each media type, None if Redis is
+                unavailable
+        """
+        keys = [self.key(media_type, user_id) for media_type in media_types]
+        try:
+            versions = get_many(keys)
+            missing = {
+                key: uuid.uuid4().hex for key in keys if key not in versions
+            }
+            set_many(missing)
+        except redis.RedisError:
+            self._count('errors')
+            return None
+        versions.update(missing)
+        return [versions[key] for key in keys]
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    def stats(self) -> dict:
+        """Retrieves the number of version bumps and of Redis errors."""
+        with self._lock:
+            return {
+                'bumps': self._stats['bumps'],
+                'errors': self._stats['errors'],
+            }
+
+
+change_versions = ChangeVersions()
@@ -1,31 +1,34 @@
+import math
 from typing import Callable, Tuple
 
-from flask import Flask, Response, jsonify, send_from_directory
+from flask import Flask, Response, jsonify
 from flask_jwt_extended import JWTManager
 from flask_restful import Api
 
-from api.db import create_db, initialize_db, jwt_redis_blocklist
+from api.blocklist import token_blocklist
+from api.compression import initialize_compression, send_static
+from api.db import initialize_db
+from api.lookup.breaker import CircuitOpenError
+from api.lookup.ratelimit import RateLimitedError
+from api.metrics import initialize_metrics
+from api.representations import output_json
 from api.resources.routes import initialize_routes
 
 app = Flask(__name__, static_url_path='', static_folder='frontend/build')
 api = Api(app)
+api.representations['application/json'] = output_json
 app.config.from_object('api.config.Config')
 jwt = JWTManager(app)
 
 initialize_db(app)
+initialize_metrics(app)
 initialize_routes(api)
+initialize_compression(app)
 
 
 @jwt.token_in_blocklist_loader
 def check_if_token_is_revoked(jwt_header: dict, jwt_payload: dict) -> bool:
-    jti = jwt_payload['jti']
-    token_in_redis = jwt_redis_blocklist.get(jti)
-    return token_in_redis is not None
-
-
-@app.before_first_request
-def create_tables() -> None:
-    create_db()
+    return token_blocklist.is_revoked(jwt_payload['jti'])
 
 
 @jwt.expired_token_loader
@@ -75,7 +78,9 @@ def needs_fresh_token_callback(callback: Callable) -> Tuple[Response, int]:
 
 
 @jwt.revoked_token_loader
-def revoked_token_callback(callback: Callable) -> Tuple[Response, int]:
+def revoked_token_callback(
+    jwt_header: dict, jwt_payload: dict
+) -> Tuple[Response, int]:
     return (
         jsonify(
             {
@@ -87,9 +92,29 @@ def revoked_token_callback(callback: Callable) -> Tuple[Response, int]:
     )
 
 
+@app.errorhandler(CircuitOpenError)
+@app.errorhandler(RateLimitedError)
+def provider_unavailable_callback(
+    error: CircuitOpenError | RateLimitedError,
+) -> Tuple[Response, int, dict]:
+    headers = {}
+    if error.retry_after is not None:
+        headers['Retry-After'] = str(math.ceil(error.retry_after))
+    return (
+        jsonify(
+            {
+                'message': 'Lookup service is unavailable, try again later.',
+                'provider': error.provider,
+            }
+        ),
+        503,
+        headers,
+    )
+
+
 @app.route('/', defaults={'path': ''})
 def serve(path: str) -> Response:
-    return send_from_directory(app.static_folder, 'index.html')
+    return send_static(app.static_folder, 'index.html')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,93 @@
+"""Measures the per request cost of the jwt revocation check, querying
+Redis on every request versus the process local TokenBlocklist.
+
+Needs a Redis server, BENCH_REDIS_URL defaults to redis://localhost:6379:
+
+    python -m benchmarks.auth_overhead --requests 5000
+"""
+import argparse
+import os
+import time
+import uuid
+from datetime import timedelta
+
+import redis
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required
+
+from api.blocklist import TokenBlocklist
+
+
+def build_app(is_revoked) -> Flask:
+    """Builds a minimal app with one jwt protected route."""
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'benchmark-secret-key-benchmark-secret'
+    jwt = JWTManager(app)
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_is_revoked(jwt_header: dict, jwt_payload: dict):
+        return is_revoked(jwt_payload['jti'])
+
+    @app.route('/')
+    @jwt_required()
+    def index() -> str:
+        return ''
+
+    return app
+
+
+def measure(name: str, app: Flask, requests: int) -> None:
+    """Prints the mean time of a protected request."""
+    with app.app_context():
+        token = create_access_token(identity=1)
+    headers = {'Authorization': f'Bearer {token}'}
+    client = app.test_client()
+    client.get('/', headers=headers)  # warm up
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get('/', headers=headers)
+    elapsed = (time.perf_counter() - start) / requests * 1e6
+    print(f'{name:40} {elapsed:8.1f} us/request')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--revoked', type=int, default=1000)
+    args = parser.parse_args()
+
+    client = redis.Redis.from_url(
+        os.environ.get('BENCH_REDIS_URL', 'redis://localhost:6379'),
+        decode_responses=True,
+    )
+    blocklist = TokenBlocklist(client, timedelta(hours=6), sync_interval=0)
+    blocklist.key = 'benchmark:jwt:revoked'
+    revoked = [str(uuid.uuid4()) for _ in range(args.revoked)]
+    for jti in revoked:
+        blocklist.revoke(jti)
+
+    measure(
+        'no revocation check',
+        build_app(lambda jti: False),
+        args.requests,
+    )
+    measure(
+        'redis GET per request',
+        build_app(lambda jti: client.get(jti) is not None),
+        args.requests,
+    )
+    for interval in (1, 5):
+        local = TokenBlocklist(client, timedelta(hours=6), interval)
+        local.key = blocklist.key
+        measure(
+            f'local blocklist, {interval}s staleness',
+            build_app(local.is_revoked),
+            args.requests,
+        )
+
+    client.delete(blocklist.key, *revoked)
+
+
+if __name__ == '__main__':
+    main()
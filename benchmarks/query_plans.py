@@ -0,0 +1,197 @@
+"""Shows query plans and timings of the request lookups before and after
+the model indexes are created.
+
+Runs against a throwaway SQLite database by default, or the (empty,
+disposable) database in BENCH_DATABASE_URL:
+
+    python -m benchmarks.query_plans --rows 100000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import MetaData, create_engine, text
+
+from api.db import db
+from api.models.media import MediaRequestModel
+from api.models.user import UserModel
+
+MODELS = (UserModel, MediaRequestModel)
+
+QUERIES = {
+    'user by username': (
+        'SELECT * FROM users WHERE username = :username LIMIT 1'
+    ),
+    'book by isbn': (
+        "SELECT * FROM media_requests WHERE media_type = 'book' "
+        'AND book_format = :book_format '
+        'AND (isbn_13 = :isbn OR isbn_10 = :isbn) LIMIT 1'
+    ),
+    'book page by user': (
+        "SELECT * FROM media_requests WHERE media_type = 'book' "
+        'AND user_id = :user_id '
+        'ORDER BY request_date DESC, id DESC LIMIT 51'
+    ),
+    'movie by imdb_id': (
+        "SELECT * FROM media_requests WHERE media_type = 'movie' "
+        'AND imdb_id = :imdb_id LIMIT 1'
+    ),
+    'movie page by user': (
+        "SELECT * FROM media_requests WHERE media_type = 'movie' "
+        'AND user_id = :user_id '
+        'ORDER BY request_date DESC, id DESC LIMIT 51'
+    ),
+    'show by imdb_id': (
+        "SELECT * FROM media_requests WHERE media_type = 'show' "
+        'AND imdb_id = :imdb_id LIMIT 1'
+    ),
+    'music by deezer_id': (
+        "SELECT * FROM media_requests WHERE media_type = 'music' "
+        'AND deezer_id = :deezer_id LIMIT 1'
+    ),
+    'all media page by user': (
+        'SELECT * FROM media_requests WHERE user_id = :user_id '
+        'ORDER BY request_date DESC, id DESC LIMIT 51'
+    ),
+}
+
+
+def create_unindexed_tables(engine) -> None:
+    """Creates the model tables without any of their secondary indexes."""
+    metadata = MetaData()
+    for model in MODELS:
+        table = model.__table__.to_metadata(metadata)
+        table.indexes.clear()
+    metadata.create_all(engine)
+
+
+def create_indexes(engine) -> None:
+    """Creates the indexes declared on the models."""
+    for model in MODELS:
+        for index in model.__table__.indexes:
+            index.create(engine)
+
+
+def populate(engine, rows: int) -> dict:
+    """Fills the tables with generated requests of every media type.
+
+    Returns:
+        dict: Parameters that match a row near the end of each media type
+    """
+    users = max(rows // 100, 1)
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(
+            UserModel.__table__.insert(),
+            [
+                {'id': i, 'username': f'user{i}', 'user_type': '1'}
+                for i in range(1, users + 1)
+            ],
+        )
+        table = MediaRequestModel.__table__
+        for start in range(0, rows, 10000):
+            batch = range(start, min(start + 10000, rows))
+            conn.execute(
+                table.insert(),
+                [
+                    {
+                        'media_type': 'book',
+                        'title': f'book {i}',
+                        'isbn_13': f'{9780000000000 + i}',
+                        'isbn_10': f'{1000000000 + i}',
+                        'book_format': random.choice(('ebook', 'audiobook')),
+                        'user_id': random.randint(1, users),
+                        'request_date': now - timedelta(minutes=i),
+                    }
+                    for i in batch
+                ],
+            )
+            for media_type in ('movie', 'show'):
+                conn.execute(
+                    table.insert(),
+                    [
+                        {
+                            'media_type': media_type,
+                            'title': f'title {i}',
+                            'imdb_id': f'tt{i:07d}',
+                            'user_id': random.randint(1, users),
+                            'request_date': now - timedelta(minutes=i),
+                        }
+                        for i in batch
+                    ],
+                )
+            conn.execute(
+                table.insert(),
+                [
+                    {
+                        'media_type': 'music',
+                        'track': f'track {i}',
+                        'deezer_id': 1000000 + i,
+                        'user_id': random.randint(1, users),
+                        'request_date': now - timedelta(minutes=i),
+                    }
+                    for i in batch
+                ],
+            )
+
+    last = rows - 1
+    return {
+        'username': f'user{users}',
+        'isbn': f'{9780000000000 + last}',
+        'book_format': 'ebook',
+        'user_id': users // 2 or 1,
+        'imdb_id': f'tt{last:07d}',
+        'deezer_id': 1000000 + last,
+    }
+
+
+def explain(engine, params: dict, repeat: int) -> None:
+    """Prints each query's plan and its mean execution time."""
+    postgres = engine.dialect.name == 'postgresql'
+    prefix = 'EXPLAIN ' if postgres else 'EXPLAIN QUERY PLAN '
+    with engine.connect() as conn:
+        for name, query in QUERIES.items():
+            plan = conn.execute(text(prefix + query), params).fetchall()
+            start = time.perf_counter()
+            for _ in range(repeat):
+                conn.execute(text(query), params).fetchall()
+            elapsed = (time.perf_counter() - start) / repeat * 1000
+
+            print(f'{name}: {elapsed:.3f} ms')
+            for row in plan:
+                print(f'    {row[-1]}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    url = os.environ.get('BENCH_DATABASE_URL')
+    if url is None:
+        path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+        url = f'sqlite:///{path}'
+    engine = create_engine(url)
+
+    create_unindexed_tables(engine)
+    params = populate(engine, args.rows)
+
+    print(f'--- without indexes ({args.rows} rows per media type)')
+    explain(engine, params, args.repeat)
+
+    create_indexes(engine)
+    with engine.begin() as conn:
+        conn.execute(text('ANALYZE'))
+
+    print(f'--- with indexes ({args.rows} rows per media type)')
+    explain(engine, params, args.repeat)
+
+    db.metadata.drop_all(engine)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,372 @@
+"""Measures throughput and latency of the api's request flows offline.
+
+Starts a local stub of Google Books, Open Library, Deezer, OMDb and
+TVMaze serving the sample payloads in benchmarks/payloads after --latency
+seconds, and the app under gunicorn (using gunicorn.conf.py) with every
+lookup's base_url pointed at the stub, on a throwaway SQLite database.
+Each flow is then driven by concurrent clients, printing requests per
+second and p50/p95/p99 latency. The payloads can be replaced by recorded
+provider responses of the same shape.
+
+Needs gunicorn and a Redis server, BENCH_REDIS_URL defaults to
+redis://localhost:6379 (use a disposable database, the lookup cache and
+request versions are written to it):
+
+    python -m benchmarks.request_flows --requests 500 --concurrency 20
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from flask import Flask
+
+from api.lookup.books import BookLookup, OpenLibraryLookup
+from api.lookup.music import MusicLookup
+from api.lookup.video import TVMazeLookup, VideoLookup
+from benchmarks.worker_load import free_port
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAYLOADS = os.path.join(ROOT, 'benchmarks', 'payloads')
+
+# Stub path prefix of each provider
+PROVIDERS = {
+    BookLookup: '/google/books/v1/volumes',
+    OpenLibraryLookup: '/openlibrary/search.json',
+    MusicLookup: '/deezer',
+    VideoLookup: '/omdb',
+    TVMazeLookup: '/tvmaze',
+}
+
+# name -> (method, path, body of the i-th request, authenticated)
+FLOWS: dict[str, tuple[str, str, Optional[Callable[[int], dict]], bool]] = {
+    'book search': (
+        'GET', '/book/request', lambda i: {'title': f'book {i}'}, False
+    ),
+    'book request': (
+        'POST',
+        '/book/request',
+        lambda i: {'isbn': f'{9780000000000 + i}', 'book_format': 'ebook'},
+        True,
+    ),
+    'music artist search': (
+        'GET', '/music/request', lambda i: {'artist': f'artist {i}'}, False
+    ),
+    'music request': (
+        'POST',
+        '/music/request',
+        lambda i: {'id': 1000000 + i, 'music_type': 'track'},
+        True,
+    ),
+    'movie search': (
+        'GET', '/movie/request', lambda i: {'title': f'movie {i}'}, False
+    ),
+    'movie request': (
+        'POST', '/movie/request', lambda i: {'imdb_id': f'tt{i:07d}'}, True
+    ),
+    'show search': (
+        'GET', '/show/request', lambda i: {'title': f'show {i}'}, False
+    ),
+    'show request': (
+        'POST', '/show/request', lambda i: {'imdb_id': f'tt{i:07d}'}, True
+    ),
+    'movie requests list': ('GET', '/movie/requests', None, True),
+    'request search': ('GET', '/search?q=night', None, True),
+}
+
+
+def load_payloads() -> dict[str, object]:
+    """Reads the provider payloads, by file name without extension."""
+    payloads = {}
+    for name in os.listdir(PAYLOADS):
+        if name.endswith('.json'):
+            with open(os.path.join(PAYLOADS, name)) as file:
+                payloads[name[:-5]] = json.load(file)
+    return payloads
+
+
+def stub_response(payloads: dict, path: str, query: dict) -> object:
+    """Picks the payload answering a provider request. Lookups by id echo
+    the requested id, so that every request adds a new item.
+    """
+    provider, _, rest = path.strip('/').partition('/')
+    rest = '/'.join(part for part in rest.split('/') if part)
+
+    if provider == 'google':
+        q = query.get('q', '')
+        if not q.startswith('isbn:'):
+            return payloads['google_books']
+        isbn = q[len('isbn:'):]
+        book = json.loads(json.dumps(payloads['google_books']['items'][0]))
+        book['volumeInfo']['industryIdentifiers'] = [
+            {'type': 'ISBN_13', 'identifier': isbn},
+            {'type': 'ISBN_10', 'identifier': isbn[-10:]},
+        ]
+        return {'kind': 'books#volumes', 'totalItems': 1, 'items': [book]}
+    if provider == 'openlibrary':
+        return payloads['open_library']
+    if provider == 'deezer':
+        kind, _, item = rest.partition('/')
+        if kind in ('track', 'album'):
+            return dict(payloads[f'deezer_{kind}'], id=int(item))
+        return payloads['deezer_search']
+    if provider == 'omdb':
+        if 'i' in query:
+            return dict(payloads['omdb_title'], imdbID=query['i'])
+        return payloads['omdb_search']
+    if provider == 'tvmaze':
+        return payloads['tvmaze_search']
+    return None
+
+
+def start_stub(latency: float) -> ThreadingHTTPServer:
+    """Starts the provider stub, answering every request after a delay."""
+    payloads = load_payloads()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self) -> None:
+            super().setup()
+            # Headers and body are written separately, without this the
+            # body waits for the client's delayed ack.
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self) -> None:
+            time.sleep(latency)
+            url = urlsplit(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            data = stub_response(payloads, url.path, query)
+            body = json.dumps(data).encode()
+            self.send_response(200 if data is not None else 404)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def create_app() -> Flask:
+    """Builds the app served by the benchmark's gunicorn workers, with every
+    provider's base_url pointed at the stub in BENCH_STUB_URL.
+    """
+    from app import app
+
+    stub = os.environ['BENCH_STUB_URL']
+    for lookup, path in PROVIDERS.items():
+        lookup.base_url = stub + path
+    return app
+
+
+def start_app(args: argparse.Namespace, stub: str, database: str):
+    """Starts gunicorn serving create_app and waits until it serves."""
+    port = free_port()
+    env = dict(
+        os.environ,
+        BENCH_STUB_URL=stub,
+        DATABASE_URL=database,
+        REDIS_URL=os.environ.get('BENCH_REDIS_URL', 'redis://localhost:6379'),
+        SECRET_KEY='benchmark-secret-key-benchmark-secret',
+        GUNICORN_WORKER_CLASS=args.worker_class,
+        WEB_CONCURRENCY=str(args.workers),
+    )
+    env.pop('GUNICORN_ACCESS_LOG', None)
+    if not args.cache:
+        env.update(LOOKUP_CACHE_ENABLED='0', LOOKUP_LOCAL_CACHE_MAX_BYTES='0')
+    subprocess.run(
+        [sys.executable, '-m', 'api.migrations', 'upgrade'],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    process = subprocess.Popen(
+        [
+            sys.executable, '-m', 'gunicorn',
+            '--config', os.path.join(ROOT, 'gunicorn.conf.py'),
+            '--bind', f'127.0.0.1:{port}',
+            'benchmarks.request_flows:create_app()',
+        ],
+        cwd=ROOT,
+        env=env,
+    )
+    url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            call(url, 'POST', '/login', {'username': '', 'password': ''})
+            return process, url
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError('gunicorn did not start')
+
+
+def call(
+    url: str,
+    method: str,
+    path: str,
+    body: Optional[dict] = None,
+    token: Optional[str] = None,
+) -> tuple[int, bytes]:
+    """Sends a request, returning the status code and the body."""
+    request = urllib.request.Request(
+        url + path,
+        data=json.dumps(body).encode() if body is not None else None,
+        method=method,
+    )
+    if body is not None:
+        request.add_header('Content-Type', 'application/json')
+    if token:
+        request.add_header('Authorization', f'Bearer {token}')
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, error.read()
+
+
+def login(url: str) -> str:
+    """Registers a benchmark user and returns its access token."""
+    user = {
+        'username': 'benchmark',
+        'password': 'benchmark',
+        'first_name': 'Bench',
+        'last_name': 'Mark',
+        'email': 'benchmark@example.com',
+    }
+    call(url, 'POST', '/register', user)
+    status, body = call(url, 'POST', '/login', user)
+    if status != 200:
+        raise RuntimeError(f'login failed: {status} {body[:200]!r}')
+    return json.loads(body)['access_token']
+
+
+def run_flow(
+    url: str,
+    flow: tuple,
+    token: str,
+    requests: int,
+    concurrency: int,
+    distinct: int = 0,
+) -> dict:
+    """Drives one flow with concurrent clients. Lookups cycle through
+    ``distinct`` different queries, 0 for a new query every request.
+
+    Returns:
+        dict: Requests per second, latency percentiles in ms and the
+            number of responses other than 200 or 304
+    """
+    method, path, body, authenticated = flow
+
+    def send(i: int) -> tuple[float, int]:
+        if distinct and method == 'GET':
+            i = i % distinct + 1
+        start = time.perf_counter()
+        status, _ = call(
+            url,
+            method,
+            path,
+            body(i) if body else None,
+            token if authenticated else None,
+        )
+        return time.perf_counter() - start, status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(send, range(1, requests + 1)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _ in results]
+    p50, p95, p99 = (
+        statistics.quantiles(latencies, n=100)[i] * 1000 for i in (49, 94, 98)
+    )
+    return {
+        'rps': requests / elapsed,
+        'p50': p50,
+        'p95': p95,
+        'p99': p99,
+        'errors': sum(status not in (200, 304) for _, status in results),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument(
+        '--worker-class', default='sync', choices=('sync', 'gevent')
+    )
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='enable the lookup cache, repeated lookups then skip the stub',
+    )
+    parser.add_argument(
+        '--distinct',
+        type=int,
+        default=0,
+        help='different queries per lookup flow, default: all different',
+    )
+    parser.add_argument(
+        '--flow', action='append', choices=FLOWS, help='default: every flow'
+    )
+    args = parser.parse_args()
+
+    stub = start_stub(args.latency)
+    stub_url = f'http://127.0.0.1:{stub.server_address[1]}'
+    database = f'sqlite:///{os.path.join(tempfile.mkdtemp(), "bench.db")}'
+    process, url = start_app(args, stub_url, database)
+    try:
+        token = login(url)
+        print(
+            f'{args.worker_class} x{args.workers}, {args.requests} requests, '
+            f'{args.concurrency} clients, {args.latency * 1000:.0f} ms '
+            'provider latency'
+        )
+        print(
+            f'{"flow":22} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} '
+            f'{"p99 ms":>8} {"errors":>6}'
+        )
+        for name in args.flow or FLOWS:
+            result = run_flow(
+                url,
+                FLOWS[name],
+                token,
+                args.requests,
+                args.concurrency,
+                args.distinct,
+            )
+            print(
+                f'{name:22} {result["rps"]:8.1f} {result["p50"]:8.1f} '
+                f'{result["p95"]:8.1f} {result["p99"]:8.1f} '
+                f'{result["errors"]:6}'
+            )
+    finally:
+        process.terminate()
+        process.wait()
+        stub.shutdown()
+
+
+if __name__ == '__main__':
+    main()
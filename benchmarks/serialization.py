@@ -0,0 +1,117 @@
+"""Compares the cost of serializing a large page of requests through model
+instances and json() against the column projection of find_page_json,
+each encoded with the json module and, when installed, orjson.
+
+Runs against a throwaway SQLite database:
+
+    python -m benchmarks.serialization --rows 100000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+from api.db import db
+from api.models.media import MediaRequestModel
+from api.models.movies import MovieRequestModel
+from api.models.user import UserModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def build_app() -> Flask:
+    """Builds an app bound to an empty SQLite database."""
+    app = Flask(__name__)
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def populate(rows: int) -> None:
+    """Fills media_requests with generated movie requests."""
+    db.create_all()
+    users = max(rows // 100, 1)
+    now = datetime.now()
+    db.session.execute(
+        UserModel.__table__.insert(),
+        [
+            {'id': i, 'username': f'user{i}', 'user_type': '1'}
+            for i in range(1, users + 1)
+        ],
+    )
+    db.session.execute(
+        MediaRequestModel.__table__.insert(),
+        [
+            {
+                'media_type': 'movie',
+                'title': f'movie title {i}',
+                'year': str(1950 + i % 70),
+                'imdb_id': f'tt{i:07d}',
+                'user_id': random.randint(1, users),
+                'request_date': now - timedelta(minutes=i),
+            }
+            for i in range(rows)
+        ],
+    )
+    db.session.commit()
+
+
+def timed(repeat: int, function) -> tuple[float, object]:
+    """Returns the best time of repeat calls in ms and the last result."""
+    best = float('inf')
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def measure(rows: int, repeat: int) -> None:
+    """Prints the time to build and to encode one page of every row."""
+    paths = {
+        'orm + json()': lambda: [
+            request.json()
+            for request in MovieRequestModel.find_page(rows)[0]
+        ],
+        'projection': lambda: MovieRequestModel.find_page_json(rows)[0],
+    }
+    encoders = {'json': lambda data: json.dumps(data).encode()}
+    if orjson is not None:
+        encoders['orjson'] = orjson.dumps
+
+    for name, path in paths.items():
+        build, data = timed(repeat, path)
+        for encoder_name, encode in encoders.items():
+            encoding, _ = timed(repeat, lambda: encode({'requests': data}))
+            print(
+                f'{name:14} {encoder_name:7} build {build:8.1f} ms  '
+                f'encode {encoding:7.1f} ms  total {build + encoding:8.1f} ms'
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    app = build_app()
+    with app.app_context():
+        populate(args.rows)
+        print(f'--- one page of {args.rows} rows')
+        measure(args.rows, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
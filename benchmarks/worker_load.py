@@ -0,0 +1,151 @@
+"""Compares request throughput of the sync and gevent gunicorn profiles
+when every request waits on a slow upstream api.
+
+Starts a local upstream stub that answers after --delay seconds and, for
+each worker class, a gunicorn server (using gunicorn.conf.py) whose only
+route looks the item up through api.lookup.util.fetch_data. Needs gunicorn,
+and gevent and psycogreen for the gevent profile:
+
+    python -m benchmarks.worker_load --concurrency 100 --requests 1000
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from flask import Flask
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+app = Flask(__name__)
+
+
+@app.route('/lookup/<int:item>')
+def lookup(item: int) -> dict:
+    # Imported here so the gevent worker has patched the standard library
+    # before the lookup client creates its locks.
+    from api.lookup.util import fetch_data
+
+    upstream = os.environ['BENCH_UPSTREAM_URL']
+    return fetch_data(f'{upstream}/items/{item}')
+
+
+def start_upstream(delay: float) -> ThreadingHTTPServer:
+    """Starts a json api stub answering every request after a delay."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self) -> None:
+            time.sleep(delay)
+            body = json.dumps({'path': self.path, 'totalItems': 1}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(worker_class: str, workers: int, upstream: str):
+    """Starts gunicorn with the given profile and waits until it serves."""
+    port = free_port()
+    env = dict(
+        os.environ,
+        GUNICORN_WORKER_CLASS=worker_class,
+        WEB_CONCURRENCY=str(workers),
+        BENCH_UPSTREAM_URL=upstream,
+        LOOKUP_CACHE_ENABLED='0',
+        LOOKUP_LOCAL_CACHE_MAX_BYTES='0',
+        LOOKUP_POOL_SIZE='1000',
+    )
+    process = subprocess.Popen(
+        [
+            sys.executable, '-m', 'gunicorn',
+            '--config', os.path.join(ROOT, 'gunicorn.conf.py'),
+            '--bind', f'127.0.0.1:{port}',
+            'benchmarks.worker_load:app',
+        ],
+        cwd=ROOT,
+        env=env,
+    )
+    url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f'{url}/lookup/0', timeout=5).read()
+            return process, url
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f'gunicorn ({worker_class}) did not start')
+
+
+def load(url: str, requests: int, concurrency: int) -> None:
+    """Sends requests from concurrent clients and prints the results."""
+
+    def send(item: int) -> float:
+        start = time.perf_counter()
+        urllib.request.urlopen(f'{url}/lookup/{item}', timeout=60).read()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        latencies = sorted(executor.map(send, range(1, requests + 1)))
+    elapsed = time.perf_counter() - start
+
+    p50, p95 = (
+        statistics.quantiles(latencies, n=100)[i] * 1000 for i in (49, 94)
+    )
+    print(
+        f'{requests / elapsed:8.1f} req/s  '
+        f'p50 {p50:7.1f} ms  p95 {p95:7.1f} ms'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--delay', type=float, default=0.2)
+    parser.add_argument(
+        '--worker-class', action='append', choices=('sync', 'gevent')
+    )
+    args = parser.parse_args()
+
+    upstream = start_upstream(args.delay)
+    upstream_url = f'http://127.0.0.1:{upstream.server_address[1]}'
+    for worker_class in args.worker_class or ('sync', 'gevent'):
+        process, url = start_gunicorn(worker_class, args.workers, upstream_url)
+        try:
+            print(f'{worker_class:7} x{args.workers}', end=' ', flush=True)
+            load(url, args.requests, args.concurrency)
+        finally:
+            process.terminate()
+            process.wait()
+    upstream.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""Gunicorn settings, read by ``gunicorn app:app`` from the working
+directory. Every setting can be overridden from the environment.
+
+Two worker profiles are supported:
+
+    sync (default)  one request at a time per worker process. A search
+                    waiting on an upstream api blocks its whole worker.
+    gevent          GUNICORN_WORKER_CLASS=gevent, each worker serves up to
+                    GUNICORN_WORKER_CONNECTIONS requests concurrently and
+                    switches between them while they wait on I/O.
+"""
+import os
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 100))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 0))
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG')
+
+
+def post_fork(server, worker) -> None:
+    """Makes psycopg2 wait on the gevent hub instead of blocking the
+    worker, the gevent worker patches the standard library itself.
+    """
+    if worker_class == 'gevent':
+        from psycogreen.gevent import patch_psycopg
+
+        patch_psycopg()